@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+
+The repository change feed (/api/repositories/<id>/events/) is an async
+streaming view and is only served through this entry point, e.g.
+``daphne DataSenseHub.asgi:application``. With several workers set
+FEAST_CHANGE_FEED_BACKEND=db so changes reach every process.
 """
 
 import os
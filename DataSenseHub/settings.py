@@ -45,6 +45,72 @@ AXES_COOLOFF_TIME = 1  # Lockout duration in hours
 #AXES_LOCKOUT_TEMPLATE = '../SecureGate/templates/noaccess/lockout.html'  # Path to the custom lockout template
 AXES_LOCKOUT_URL = '../blocked-access'  # URL to redirect users when locked out
 
+
+# Repository change feed (SSE, needs ASGI)
+# 'local' fans out within one process; use 'db' when running several workers
+FEAST_CHANGE_FEED_BACKEND = os.environ.get('FEAST_CHANGE_FEED_BACKEND', 'local')
+FEAST_CHANGE_FEED_POLL_INTERVAL = 0.5  # Seconds between polls with the 'db' backend
+FEAST_CHANGE_FEED_RETENTION = 600  # Seconds RepositoryChange rows are kept
+FEAST_CHANGE_FEED_REORDER_WINDOW = 10  # Seconds a change may commit after a higher id and still be delivered
+FEAST_CHANGE_FEED_KEEPALIVE = 15  # Seconds between SSE keep-alive comments
+FEAST_CHANGE_FEED_MAX_AGE = 300  # Seconds before a stream is closed (clients reconnect)
+
+# Per-user repository catalog (list/check_name). Invalidation is signalled
+# through a version stamp in the default cache, so point CACHES at a shared
+# backend (Redis/Memcached) when running several workers.
+FEAST_CATALOG_TTL = 300  # Seconds before a catalog is reloaded regardless
+
+# Audit log writer: rows are queued and bulk-inserted off the request path
+FEAST_AUDIT_ASYNC = True
+FEAST_AUDIT_BATCH_SIZE = 100  # Flush as soon as this many rows are queued
+FEAST_AUDIT_FLUSH_INTERVAL = 2.0  # ...or after this many seconds
+FEAST_AUDIT_MAX_QUEUE = 10000  # Callers flush synchronously beyond this
+
+# Audit retention (python manage.py archive_audit_logs)
+FEAST_AUDIT_RETENTION_DAYS = 90  # Raw rows older than this are rolled up and archived
+FEAST_AUDIT_ARCHIVE_DIR = os.environ.get('FEAST_AUDIT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'audit_archive'))
+
+# Lineage graphs (lineage/ endpoints), cached per json_hash in each process
+FEAST_LINEAGE_CACHE_SIZE = 128  # Graphs kept (LRU)
+
+# Generated feature repo zips (generate_code/), stored in the default cache per json_hash
+FEAST_CODEGEN_CACHE_TTL = 86400  # Seconds
+
+# Architecture validation rules (validate/); reports are cached per json_hash
+FEAST_VALIDATION_CACHE_TTL = 86400  # Seconds
+FEAST_VALIDATION_ENFORCE = os.environ.get('FEAST_VALIDATION_ENFORCE', '').lower() in ('1', 'true', 'yes')  # Reject writes with errors
+
+# LLM chat client: one pooled keep-alive HTTP client per process (llm_client.py)
+FEAST_LLM_TIMEOUT = 60.0  # Seconds per request (read/write/pool)
+FEAST_LLM_CONNECT_TIMEOUT = 5.0  # Seconds to establish a connection
+FEAST_LLM_MAX_CONNECTIONS = 20  # Pool size shared by all threads
+FEAST_LLM_MAX_KEEPALIVE = 10  # Idle connections kept open
+FEAST_LLM_KEEPALIVE_EXPIRY = 30.0  # Seconds an idle connection is kept
+FEAST_LLM_MAX_RETRIES = 2  # Retries on timeouts, connection errors, 429 and 5xx
+FEAST_LLM_RETRY_BUDGET = 30.0  # Seconds per request (attempts + backoff) after which no retry starts
+FEAST_LLM_BACKOFF_BASE = 0.5  # Seconds; backoff is random(0, base * 2^attempt)
+FEAST_LLM_BACKOFF_MAX = 8.0  # Seconds; cap on a single backoff
+FEAST_LLM_STREAM_FLUSH_INTERVAL = 1.0  # Seconds between saves of a streaming answer
+
+# LLM response cache (llm_cache.py): per-process LRU in front of LLMCachedResponse rows
+FEAST_LLM_CACHE_ENABLED = True
+FEAST_LLM_CACHE_SIZE = 256  # Answers kept in memory per process
+FEAST_LLM_CACHE_TTL = 86400  # Seconds an answer is reused
+
+# Background LLM jobs (llm_jobs.py): chat turns run off the request thread
+FEAST_LLM_BACKGROUND = True  # send_message/create answer 202 with a job; False calls Groq in the request
+FEAST_LLM_WORKERS = 4  # Worker threads per process
+FEAST_LLM_QUEUE_SIZE = 100  # Jobs waiting per process before 503
+FEAST_LLM_JOBS_PER_USER = 2  # Queued + running jobs per user before 429
+FEAST_LLM_JOB_TIMEOUT = 300  # Seconds before an unfinished job is marked failed
+FEAST_LLM_JOB_POLL_INTERVAL = 0.25  # Seconds between polls when a stream reads another process's job
+
+# Chat context window (context_window.py): history sent with each turn, in estimated tokens
+FEAST_LLM_CONTEXT_BUDGET = 3000  # Summary + recent turns per request
+FEAST_LLM_CONTEXT_KEEP = 1500  # Newest turns kept verbatim when older ones are summarized
+FEAST_LLM_SUMMARY_MAX_TOKENS = 400  # Cap on the rolling summary
+FEAST_LLM_CONTEXT_CACHE_SIZE = 512  # Sessions whose assembled prefix is cached per process
+
 AUTHENTICATION_BACKENDS = [
     # AxesStandaloneBackend should be the first backend in the AUTHENTICATION_BACKENDS list.
     'axes.backends.AxesStandaloneBackend',
@@ -72,7 +138,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'SecureGate.apps.SecuregateConfig',
     'TicketManager.apps.TicketmanagerConfig',
-    'FeastArchitect',
+    'FeastArchitect.apps.FeastarchitectConfig',
 ]
 
 MIDDLEWARE = [
@@ -4,16 +4,19 @@ Feast Architect Admin Configuration
 from django.contrib import admin
 from .models import (
     FeastRepository, DataSource, Entity, 
-    AuditLog, LLMChatSession, LLMMessage
+    AuditLog, LLMChatSession, LLMMessage,
+    ArchitectureNode, ArchitectureEdge, ArchitectureRevision,
+    AuditLogRollup, AuditArchiveSegment, LLMCachedResponse, LLMJob
 )
 
 
 @admin.register(FeastRepository)
 class FeastRepositoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'location', 'default_owner', 'get_node_count', 'updated_at', 'created_by']
+    list_display = ['name', 'location', 'default_owner', 'node_count', 'edge_count', 'updated_at', 'created_by']
     list_filter = ['created_at', 'updated_at', 'default_owner']
+    list_select_related = ['created_by']
     search_fields = ['name', 'description']
-    readonly_fields = ['created_at', 'updated_at', 'json_hash', 'last_synced_at']
+    readonly_fields = ['created_at', 'updated_at', 'json_hash', 'last_synced_at'] + FeastRepository.COUNT_FIELDS
     
     fieldsets = (
         ('Basic Info', {
@@ -27,15 +30,22 @@ class FeastRepositoryAdmin(admin.ModelAdmin):
             'fields': ('last_synced_at',),
             'classes': ('collapse',)
         }),
+        ('Counts', {
+            'fields': tuple(FeastRepository.COUNT_FIELDS),
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
 
-    def get_node_count(self, obj):
-        return obj.get_node_count()
-    get_node_count.short_description = 'Nodes'
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The changelist only shows stored columns; the change form loads the blob on access
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('architecture_json')
+        return queryset
 
 
 @admin.register(DataSource)
@@ -80,6 +90,27 @@ class EntityAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
 
+@admin.register(ArchitectureNode)
+class ArchitectureNodeAdmin(admin.ModelAdmin):
+    list_display = ['node_id', 'node_type', 'name', 'repository']
+    list_filter = ['node_type', 'repository']
+    search_fields = ['node_id', 'name']
+
+
+@admin.register(ArchitectureEdge)
+class ArchitectureEdgeAdmin(admin.ModelAdmin):
+    list_display = ['edge_id', 'from_node', 'to_node', 'repository']
+    list_filter = ['repository']
+    search_fields = ['from_node', 'to_node']
+
+
+@admin.register(ArchitectureRevision)
+class ArchitectureRevisionAdmin(admin.ModelAdmin):
+    list_display = ['repository', 'number', 'action', 'user', 'nodes_changed', 'edges_changed', 'is_snapshot', 'created_at']
+    list_filter = ['action', 'is_snapshot', 'repository']
+    readonly_fields = ['root_hash', 'base_number', 'meta_hash', 'node_changes', 'edge_changes']
+
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ['timestamp', 'user', 'action', 'resource_type', 'resource_name']
@@ -89,6 +120,20 @@ class AuditLogAdmin(admin.ModelAdmin):
     date_hierarchy = 'timestamp'
 
 
+@admin.register(AuditLogRollup)
+class AuditLogRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'user', 'action', 'count', 'first_at', 'last_at']
+    list_filter = ['action', 'day']
+    list_select_related = ['user']
+    date_hierarchy = 'day'
+
+
+@admin.register(AuditArchiveSegment)
+class AuditArchiveSegmentAdmin(admin.ModelAdmin):
+    list_display = ['path', 'start_at', 'end_at', 'row_count', 'size_bytes', 'created_at']
+    readonly_fields = ['path', 'start_at', 'end_at', 'first_id', 'last_id', 'row_count', 'size_bytes', 'sha256', 'created_at']
+
+
 class LLMMessageInline(admin.TabularInline):
     model = LLMMessage
     extra = 0
@@ -119,3 +164,18 @@ class LLMMessageAdmin(admin.ModelAdmin):
     list_filter = ['role', 'query_type', 'created_at']
     search_fields = ['content']
     readonly_fields = ['created_at', 'session']
+
+
+@admin.register(LLMCachedResponse)
+class LLMCachedResponseAdmin(admin.ModelAdmin):
+    list_display = ['key', 'query_type', 'model', 'hits', 'created_at', 'expires_at']
+    list_filter = ['query_type', 'model']
+    search_fields = ['key', 'response']
+    readonly_fields = ['key', 'model', 'query_type', 'usage', 'hits', 'created_at', 'expires_at']
+
+
+@admin.register(LLMJob)
+class LLMJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'session', 'status', 'query_type', 'created_at', 'finished_at']
+    list_filter = ['status', 'query_type']
+    readonly_fields = ['user', 'session', 'assistant_message', 'result', 'error', 'created_at', 'started_at', 'finished_at']
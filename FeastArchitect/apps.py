@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class FeastarchitectConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'FeastArchitect'
+
+    def ready(self):
+        # Registers the FeastRepository signal handlers that keep the catalog cache fresh
+        from . import catalog  # noqa: F401
@@ -0,0 +1,92 @@
+"""
+Helpers for walking the architecture_json document.
+
+The architect UI saves nodes as ``Array.from(map.entries())``, i.e. a list
+of ``[id, node]`` pairs, while older/hand-written documents use a plain
+``{id: node}`` dict. Everything server-side should go through these helpers
+so both layouts keep working.
+"""
+import re
+
+
+def get_nodes(architecture):
+    """Return the raw nodes container (list of pairs or dict)."""
+    if not isinstance(architecture, dict):
+        return {}
+    return architecture.get('nodes') or {}
+
+
+def get_edges(architecture):
+    """Return the edges list."""
+    if not isinstance(architecture, dict):
+        return []
+    return architecture.get('edges') or []
+
+
+def iter_nodes(architecture):
+    """Yield (node_id, node) for either node layout."""
+    nodes = get_nodes(architecture)
+    if isinstance(nodes, dict):
+        for node_id, node in nodes.items():
+            yield node_id, node
+        return
+    for entry in nodes:
+        if isinstance(entry, (list, tuple)) and len(entry) == 2:
+            yield entry[0], entry[1]
+        elif isinstance(entry, dict) and 'id' in entry:
+            yield entry['id'], entry
+
+
+def edge_id(edge):
+    """Stable identifier for an edge (the UI uses "from->to")."""
+    return edge.get('id') or f"{edge.get('from')}->{edge.get('to')}"
+
+
+# Node types with their own count column on FeastRepository
+COUNTED_NODE_TYPES = ('datasource', 'entity', 'featureview', 'service')
+
+
+def architecture_counts(architecture):
+    """Node, edge and per-type counts, keyed by FeastRepository column name."""
+    counts = {f'{node_type}_count': 0 for node_type in COUNTED_NODE_TYPES}
+    node_count = 0
+    for _, node in iter_nodes(architecture):
+        node_count += 1
+        node_type = node.get('type') if isinstance(node, dict) else None
+        if node_type in COUNTED_NODE_TYPES:
+            counts[f'{node_type}_count'] += 1
+    counts['node_count'] = node_count
+    counts['edge_count'] = len(get_edges(architecture))
+    return counts
+
+
+_TTL_UNITS = {
+    's': 1, 'sec': 1, 'second': 1,
+    'm': 60, 'min': 60, 'minute': 60,
+    'h': 3600, 'hr': 3600, 'hour': 3600,
+    'd': 86400, 'day': 86400,
+    'w': 604800, 'week': 604800,
+}
+_TTL_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([a-z]*?)s?\s*$')
+
+
+def parse_ttl(value):
+    """
+    Feature view ``details.ttl`` in seconds, or None if it can't be parsed.
+    Accepts seconds (the UI default, number or numeric string) and
+    "<n><unit>" strings such as "3h", "90d" or "2 weeks".
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value >= 0 else None
+    if not isinstance(value, str):
+        return None
+    match = _TTL_RE.match(value.lower())
+    if not match:
+        return None
+    amount, unit = match.groups()
+    multiplier = _TTL_UNITS.get(unit or 's')
+    if multiplier is None:
+        return None
+    return int(float(amount) * multiplier)
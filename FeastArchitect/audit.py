@@ -0,0 +1,129 @@
+"""
+Batched, asynchronous AuditLog writer.
+
+Request handlers call audit_log(); the entry is queued in-process (after
+the surrounding transaction commits) and a background thread writes
+queued entries with one bulk_create when FEAST_AUDIT_BATCH_SIZE entries
+are waiting or every FEAST_AUDIT_FLUSH_INTERVAL seconds. Pending entries
+are flushed at interpreter exit.
+
+Actions in DURABLE_ACTIONS, or calls with durable=True, are written
+synchronously in the caller's transaction, so they commit or roll back
+with the change they describe. FEAST_AUDIT_ASYNC = False makes every
+call synchronous.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+# Actions whose audit row must exist as soon as the request returns
+DURABLE_ACTIONS = {'FORCE_UPDATE', 'RESTORE', 'DELETE'}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class AuditWriter:
+    """Queues AuditLog rows and writes them in batches from one thread."""
+
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        self.written = 0
+        self.failed = 0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='feast-audit-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, entry):
+        with self._lock:
+            self._pending.append(entry)
+            pending = len(self._pending)
+            if not self._closed:
+                self._ensure_thread()
+        if self._closed or pending >= _setting('FEAST_AUDIT_MAX_QUEUE', 10000):
+            # No writer thread (shutting down) or it can't keep up: write here
+            self.flush()
+        elif pending >= _setting('FEAST_AUDIT_BATCH_SIZE', 100):
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Write everything queued so far. Safe to call from any thread."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                AuditLog.objects.bulk_create(batch, batch_size=500)
+                self.written += len(batch)
+            except Exception:
+                logger.exception("Audit batch insert failed, retrying row by row")
+                for entry in batch:
+                    try:
+                        entry.save()
+                        self.written += 1
+                    except Exception:
+                        self.failed += 1
+                        logger.error("Dropped audit entry: %s %s %s",
+                                     entry.action, entry.resource_type, entry.resource_name)
+            return len(batch)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(_setting('FEAST_AUDIT_FLUSH_INTERVAL', 2.0))
+            self._wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Audit writer flush failed")
+
+    def close(self):
+        """Stop the writer thread and flush what is left."""
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+
+
+writer = AuditWriter()
+atexit.register(writer.close)
+
+
+def audit_log(user, action, resource_type, resource_name, details=None, ip_address=None, durable=False):
+    """Record an audit event; queued unless durable or the action requires it."""
+    entry = AuditLog(
+        timestamp=timezone.now(),
+        user=user if user is not None and user.is_authenticated else None,
+        action=action,
+        resource_type=resource_type,
+        resource_name=resource_name,
+        details=details or {},
+        ip_address=ip_address
+    )
+    if durable or action in DURABLE_ACTIONS or not _setting('FEAST_AUDIT_ASYNC', True):
+        entry.save()
+        return entry
+    # Only queue once the change being audited has committed
+    transaction.on_commit(lambda: writer.enqueue(entry))
+    return entry
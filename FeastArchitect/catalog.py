@@ -0,0 +1,163 @@
+"""
+Per-user in-memory catalog of repositories.
+
+The repository list and name checks (the UI calls check_name on every
+keystroke of a new repo name) are served from a small per-user snapshot:
+id, name, hash, counts and the list-serializer row, loaded with one query
+that defers architecture_json.
+
+FeastRepository post_save/post_delete signals drop the owner's snapshot,
+both immediately and again on commit, so a reader that raced the write
+cannot keep a pre-commit copy. A per-user version stamp in the Django
+cache lets other processes notice the invalidation when CACHES points at
+a shared backend; FEAST_CATALOG_TTL bounds staleness otherwise.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+
+def _ttl():
+    return getattr(settings, 'FEAST_CATALOG_TTL', 300)
+
+
+@dataclass
+class CatalogEntry:
+    """One repository as seen by list/name checks."""
+    id: int
+    name: str
+    json_hash: str
+    created_at: datetime
+    updated_at: datetime
+    created_by_username: Optional[str]
+    data: Dict = field(default_factory=dict)
+
+
+@dataclass
+class UserCatalog:
+    entries: List[CatalogEntry]
+    by_name: Dict[str, CatalogEntry]
+    version: int
+    loaded_at: float
+
+
+class RepositoryCatalog:
+    """Thread-safe per-user catalog with hit/miss counters."""
+
+    def __init__(self):
+        self._catalogs: Dict[int, UserCatalog] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _version_key(self, user_id):
+        return f'feast:catalog:version:{user_id}'
+
+    def _load(self, user_id, version):
+        from .models import FeastRepository
+        from .serializers import FeastRepositoryListSerializer
+
+        repos = list(
+            FeastRepository.objects.filter(created_by_id=user_id)
+            .defer('architecture_json', 'settings')
+            .select_related('created_by')
+        )
+        rows = FeastRepositoryListSerializer(repos, many=True).data
+        entries = [
+            CatalogEntry(
+                id=repo.id,
+                name=repo.name,
+                json_hash=repo.json_hash,
+                created_at=repo.created_at,
+                updated_at=repo.updated_at,
+                created_by_username=repo.created_by.username if repo.created_by else None,
+                data=dict(row)
+            )
+            for repo, row in zip(repos, rows)
+        ]
+        return UserCatalog(
+            entries=entries,
+            by_name={entry.name: entry for entry in entries},
+            version=version,
+            loaded_at=time.monotonic()
+        )
+
+    def get(self, user):
+        """The user's catalog, loading it on a miss."""
+        version = cache.get(self._version_key(user.id), 0)
+        with self._lock:
+            catalog = self._catalogs.get(user.id)
+            fresh = (
+                catalog is not None
+                and catalog.version == version
+                and time.monotonic() - catalog.loaded_at < _ttl()
+            )
+            if fresh:
+                self.hits += 1
+                return catalog
+            self.misses += 1
+
+        catalog = self._load(user.id, version)
+        with self._lock:
+            self._catalogs[user.id] = catalog
+        return catalog
+
+    def rows(self, user):
+        """List-serializer rows, newest first."""
+        return [entry.data for entry in self.get(user).entries]
+
+    def find(self, user, name, exclude_id=None):
+        entry = self.get(user).by_name.get(name)
+        if entry is None or (exclude_id is not None and entry.id == exclude_id):
+            return None
+        return entry
+
+    def invalidate(self, user_id):
+        if user_id is None:
+            return
+        with self._lock:
+            self._catalogs.pop(user_id, None)
+            self.invalidations += 1
+        key = self._version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+    def clear(self):
+        with self._lock:
+            self._catalogs.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'users_cached': len(self._catalogs),
+                'ttl_seconds': _ttl()
+            }
+
+
+catalog = RepositoryCatalog()
+
+
+def _invalidate_owner(sender, instance, **kwargs):
+    user_id = instance.created_by_id
+    catalog.invalidate(user_id)
+    # Again after commit, in case a reader reloaded the pre-commit state meanwhile
+    transaction.on_commit(lambda: catalog.invalidate(user_id))
+
+
+post_save.connect(_invalidate_owner, sender='FeastArchitect.FeastRepository', dispatch_uid='feast_catalog_save')
+post_delete.connect(_invalidate_owner, sender='FeastArchitect.FeastRepository', dispatch_uid='feast_catalog_delete')
@@ -0,0 +1,184 @@
+"""
+Chat turns: send a user message to the LLM and persist the exchange.
+
+Shared by LLMChatSessionViewSet (direct requests) and the background job
+workers in llm_jobs.py. Callers save the user message first
+(save_user_message) and then either block on send() or consume
+open_stream(), which writes the assistant message as tokens arrive.
+Earlier turns are sent as history from context_window.py; callers run
+compact() once the turn is saved.
+"""
+import logging
+import time
+
+from django.conf import settings
+
+from .context_window import context_windows
+from .llm_client import LLMContext, get_llm_client
+from .models import LLMMessage
+
+logger = logging.getLogger(__name__)
+
+
+def llm_context(session):
+    return LLMContext(
+        repo_name=session.context_json.get('repo_name', 'Unknown'),
+        node_count=session.context_json.get('node_count', 0),
+        edge_count=session.context_json.get('edge_count', 0),
+        json_hash=session.repository.json_hash if session.repository_id else ''
+    )
+
+
+def save_user_message(session, message, query_type):
+    return LLMMessage.objects.create(
+        session=session,
+        role='user',
+        content=message,
+        query_type=query_type
+    )
+
+
+def save_error(session, error):
+    """Save error as system message."""
+    LLMMessage.objects.create(
+        session=session,
+        role='system',
+        content=f'Error: {str(error)}',
+        query_type='error'
+    )
+
+
+def send(session, user_msg, query_type, use_cache=True):
+    """
+    Blocking turn: query Groq with the conversation so far and save the
+    assistant message. Returns the result dict of GroqLLMClient.query.
+    """
+    try:
+        result = get_llm_client().query(
+            message=user_msg.content,
+            context=llm_context(session),
+            query_type=query_type,
+            stream=False,
+            use_cache=use_cache,
+            history=context_windows.history(session, exclude_id=user_msg.id)
+        )
+
+        LLMMessage.objects.create(
+            session=session,
+            role='assistant',
+            content=result['response'],
+            query_type=query_type,
+            prompt_tokens=result['usage']['prompt_tokens'],
+            completion_tokens=result['usage']['completion_tokens'],
+            total_tokens=result['usage']['total_tokens'],
+            model=result['model']
+        )
+
+        # Update session timestamp
+        session.save(update_fields=['updated_at'])
+
+        logger.info(f"LLM response saved: session={session.id}, tokens={result['usage']['total_tokens']}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"LLM query failed: {str(e)}")
+        save_error(session, e)
+        raise
+
+
+def open_stream(session, user_msg, query_type, use_cache=True):
+    """
+    Streaming turn. The completion is requested before this returns (errors
+    raise here, like send()); returns (assistant_message, events) where
+    events is the client's event iterator, persisted as it is consumed.
+    """
+    try:
+        client = get_llm_client()
+        stream = client.stream_query(
+            user_msg.content, llm_context(session), query_type, use_cache,
+            history=context_windows.history(session, exclude_id=user_msg.id)
+        )
+    except Exception as e:
+        logger.error(f"LLM query failed: {str(e)}")
+        save_error(session, e)
+        raise
+
+    assistant_msg = LLMMessage.objects.create(
+        session=session,
+        role='assistant',
+        content='',
+        query_type=query_type,
+        model=client.DEFAULT_MODEL,
+        # Not cached as conversation history until _persist_stream() is done with it
+        is_complete=False
+    )
+    return assistant_msg, _persist_stream(session, assistant_msg, stream)
+
+
+def _persist_stream(session, assistant_msg, stream):
+    """
+    Pass events through while saving them: content every
+    FEAST_LLM_STREAM_FLUSH_INTERVAL seconds, usage when the stream ends.
+    On failure the partial answer and an error message are saved and the
+    exception propagates. The message is marked complete either way.
+    """
+    messages = LLMMessage.objects.filter(pk=assistant_msg.pk)
+    flush_interval = getattr(settings, 'FEAST_LLM_STREAM_FLUSH_INTERVAL', 1.0)
+    parts = []
+    done = False
+    last_flush = time.monotonic()
+    try:
+        for event in stream:
+            if 'delta' in event:
+                parts.append(event['delta'])
+                yield event
+                if time.monotonic() - last_flush >= flush_interval:
+                    messages.update(content=''.join(parts))
+                    last_flush = time.monotonic()
+                continue
+
+            usage = event['usage']
+            messages.update(
+                content=''.join(parts),
+                prompt_tokens=usage['prompt_tokens'],
+                completion_tokens=usage['completion_tokens'],
+                total_tokens=usage['total_tokens'],
+                model=event['model'],
+                is_complete=True
+            )
+            done = True
+            session.save(update_fields=['updated_at'])
+            logger.info(f"LLM stream saved: session={session.id}, tokens={usage['total_tokens']}")
+            yield event
+    except Exception as e:
+        logger.error(f"LLM stream failed: {str(e)}")
+        save_error(session, e)
+        raise
+    finally:
+        # Error or consumer gone: keep what was received so far
+        if not done:
+            messages.update(content=''.join(parts), is_complete=True)
+
+
+def compact(session):
+    """Fold old turns into the session summary if the window is over budget; never raises."""
+    try:
+        try:
+            client = get_llm_client()
+        except Exception:
+            client = None  # Turns are condensed without the LLM
+        context_windows.compact(session, client)
+    except Exception as e:
+        logger.error(f"Context compaction failed: session={session.id}: {str(e)}")
+
+
+def reply_summary(assistant_msg, final_event):
+    """Result fields of a finished streaming turn."""
+    return {
+        'message_id': assistant_msg.id,
+        'usage': final_event['usage'],
+        'model': final_event['model'],
+        'query_type': final_event['query_type'],
+        'cached': final_event['cached']
+    }
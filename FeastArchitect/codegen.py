@@ -0,0 +1,367 @@
+"""
+Server-side Feast feature repo generator.
+
+generate_feature_repo() turns architecture_json into the files of a
+complete feature repo (feature_store.yaml, entities, data sources,
+feature views and feature services) that ``feast apply`` can load, and
+iter_zip() streams them as a zip archive.
+
+The output is a pure function of the architecture plus the repository
+name and location, so finished archives are cached (Django cache) under
+a key derived from json_hash; a repeated download of an unchanged
+repository is served from the cache without reading architecture_json.
+Zip entries carry a fixed timestamp so the same input always produces
+the same bytes.
+"""
+import hashlib
+import keyword
+import re
+import zipfile
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .architecture import iter_nodes, parse_ttl
+from .datasource_sync import infer_connection_type
+
+
+# Bump when the generated code changes so cached archives are not reused
+GENERATOR_VERSION = '2'
+
+DEFAULT_TTL_SECONDS = 86400
+
+FEAST_TYPES = ('Float32', 'Float64', 'Int32', 'Int64', 'String', 'Bool', 'Bytes', 'UnixTimestamp')
+
+# Batch kinds with a native Feast source class; everything else is read from files
+NATIVE_BATCH_SOURCES = {
+    'bigquery': ('BigQuerySource', 'table'),
+    'snowflake': ('SnowflakeSource', 'table'),
+    'redshift': ('RedshiftSource', 'table'),
+}
+
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _lit(value):
+    """Python literal for a JSON scalar."""
+    return repr(value)
+
+
+def _tags(tags):
+    if isinstance(tags, dict):
+        return {str(k): str(v) for k, v in tags.items()}
+    return {str(tag): '' for tag in tags or []}
+
+
+class _Names:
+    """Unique, valid Python identifiers for node variables."""
+
+    def __init__(self):
+        self.used = set()
+        self.by_node = {}
+
+    def assign(self, node_id, name, suffix=''):
+        base = re.sub(r'\W+', '_', str(name or node_id)).strip('_').lower() or 'node'
+        if base[0].isdigit():
+            base = f'_{base}'
+        base += suffix
+        ident, n = base, 2
+        while ident in self.used or keyword.iskeyword(ident):
+            ident, n = f'{base}_{n}', n + 1
+        self.used.add(ident)
+        self.by_node[node_id] = ident
+        return ident
+
+
+def project_name(name):
+    """Feast project names are alphanumeric plus underscores."""
+    return re.sub(r'\W+', '_', name or 'feast_project').strip('_').lower() or 'feast_project'
+
+
+def _comment(text):
+    """Document text on one line, safe inside a ``#`` comment."""
+    return ' '.join(re.sub(r'[\x00-\x1f\x7f]', ' ', str(text)).split())
+
+
+def _docstring_text(text):
+    """Document text on one line, safe inside a triple-quoted docstring."""
+    return _comment(text).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _header(title, repo_name):
+    return f'"""\n{title} for {_docstring_text(repo_name)}.\n\nGenerated by Feast Architect from the repository architecture.\n"""\n'
+
+
+def _feature_store_yaml(repo_name):
+    return (
+        f'project: {project_name(repo_name)}\n'
+        'registry: data/registry.db\n'
+        'provider: local\n'
+        'online_store:\n'
+        '  type: sqlite\n'
+        '  path: data/online_store.db\n'
+        'entity_key_serialization_version: 2\n'
+    )
+
+
+def _entities_py(repo_name, entities, names):
+    lines = [_header('Entity definitions', repo_name), 'from feast import Entity, ValueType', '']
+    for node_id, node in entities:
+        var = names.assign(node_id, node.get('name'))
+        lines += [
+            '',
+            f'{var} = Entity(',
+            f"    name={_lit(node.get('name') or node_id)},",
+            f"    join_keys=[{_lit(node.get('joinKey') or 'id')}],",
+            '    value_type=ValueType.STRING,',
+            f"    description={_lit(node.get('description') or '')},",
+            f"    tags={_tags(node.get('tags'))!r},",
+            ')',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def _call(cls, kwargs, indent=''):
+    """Render ``cls(k=v, ...)`` one keyword per line."""
+    inner = indent + '    '
+    return f'{cls}(\n' + ''.join(f'{inner}{key}={value},\n' for key, value in kwargs) + f'{indent})'
+
+
+def _file_source(name, path, indent=''):
+    return _call('FileSource', [
+        ('name', _lit(name)),
+        ('path', _lit(path)),
+        ('timestamp_field', _lit('event_timestamp')),
+    ], indent)
+
+
+def _source_py(repo_name, sources, placeholder_views, names):
+    """data_sources.py; one source per datasource node by its Feast connection type."""
+    imports = {'FileSource'}
+    body = []
+    for node_id, node in sources:
+        name = node.get('name') or node_id
+        var = names.assign(node_id, name, '_source')
+        details = node.get('details') if isinstance(node.get('details'), dict) else {}
+        kind = str(node.get('kind') or '').lower()
+        connection_type = node.get('feastConnectionType') or infer_connection_type(node)
+        slug = project_name(name)
+        batch_source = _file_source(f'{name} (batch)', f'data/{slug}.parquet', '    ')
+
+        body += ['', _comment(f"# {name} ({kind or 'unknown'}), owned by {node.get('ownedBy') or 'n/a'}")]
+        if details.get('connection'):
+            body.append(_comment(f"# Connection: {details['connection']}"))
+
+        if connection_type == 'stream':
+            imports.add('KafkaSource')
+            source = _call('KafkaSource', [
+                ('name', _lit(name)),
+                ('kafka_bootstrap_servers', _lit(details.get('connection') or 'localhost:9092')),
+                ('topic', _lit(details.get('topic') or slug)),
+                ('timestamp_field', _lit('event_timestamp')),
+                ('message_format', "JsonFormat(schema_json='')"),
+                ('batch_source', batch_source),
+            ])
+        elif connection_type == 'push':
+            imports.add('PushSource')
+            source = _call('PushSource', [('name', _lit(slug)), ('batch_source', batch_source)])
+        elif connection_type == 'request':
+            imports.add('RequestSource')
+            source = _call('RequestSource', [('name', _lit(name)), ('schema', '[]')])
+        elif kind in NATIVE_BATCH_SOURCES:
+            cls, arg = NATIVE_BATCH_SOURCES[kind]
+            imports.add(cls)
+            source = _call(cls, [
+                ('name', _lit(name)),
+                (arg, _lit(details.get('table') or slug)),
+                ('timestamp_field', _lit('event_timestamp')),
+            ])
+        else:
+            source = _file_source(name, f'data/{slug}.parquet')
+        body.append(f'{var} = {source}')
+
+    for node_id, node in placeholder_views:
+        name = node.get('name') or node_id
+        var = names.assign(f'{node_id}:source', name, '_source')
+        body += ['', _comment(f'# {name} has no upstream data source in the architecture')]
+        body.append(f"{var} = {_file_source(f'{name} source', f'data/{project_name(name)}.parquet')}")
+
+    header = [_header('Data source definitions', repo_name), f"from feast import {', '.join(sorted(imports))}"]
+    if 'KafkaSource' in imports:
+        header.append('from feast.data_format import JsonFormat')
+    return '\n'.join(header + [''] + body) + '\n'
+
+
+def _feature_views_py(repo_name, views, names, view_sources, entity_vars):
+    lines = [
+        _header('Feature view definitions', repo_name),
+        'from datetime import timedelta',
+        '',
+        'from feast import FeatureView, Field',
+        f"from feast.types import {', '.join(FEAST_TYPES)}",
+        '',
+        'from data_sources import *  # noqa: F401,F403',
+        'from entities import *  # noqa: F401,F403',
+        '',
+    ]
+    for node_id, node in views:
+        var = names.assign(node_id, node.get('name'))
+        details = node.get('details') if isinstance(node.get('details'), dict) else {}
+        ttl = parse_ttl(details.get('ttl'))
+        refs = node.get('entities') if isinstance(node.get('entities'), list) else []
+        entities = [entity_vars[e] for e in refs if isinstance(e, (str, int)) and e in entity_vars]
+        schema = []
+        for feature in node.get('features') or []:
+            if not isinstance(feature, dict) or not feature.get('name'):
+                continue
+            dtype = feature.get('type') if feature.get('type') in FEAST_TYPES else 'String'
+            schema.append(f"        Field(name={_lit(feature['name'])}, dtype={dtype}),")
+        lines += [
+            '',
+            f'{var} = FeatureView(',
+            f"    name={_lit(node.get('name') or node_id)},",
+            f"    entities=[{', '.join(entities)}],",
+            f'    ttl=timedelta(seconds={ttl if ttl is not None else DEFAULT_TTL_SECONDS}),',
+            '    schema=[',
+            *schema,
+            '    ],',
+            '    online=True,',
+            f'    source={view_sources[node_id]},',
+            f"    description={_lit(node.get('description') or '')},",
+            f"    tags={_tags(node.get('tags'))!r},",
+            ')',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def _feature_services_py(repo_name, services, names):
+    lines = [
+        _header('Feature service definitions', repo_name),
+        'from feast import FeatureService',
+        '',
+        'from feature_views import *  # noqa: F401,F403',
+        '',
+    ]
+    for node_id, node in services:
+        var = names.assign(node_id, node.get('name'), '_service')
+        views = [names.by_node[ref] for ref in node.get('features') or [] if ref in names.by_node]
+        lines += [
+            '',
+            f'{var} = FeatureService(',
+            f"    name={_lit(node.get('name') or node_id)},",
+            f"    features=[{', '.join(views)}],",
+            f"    description={_lit(node.get('description') or '')},",
+            f"    tags={_tags(node.get('tags'))!r},",
+            ')',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def generate_feature_repo(architecture, repo_name, location=''):
+    """{relative path: file text} for a Feast feature repo, in archive order."""
+    by_type = {'entity': [], 'datasource': [], 'featureview': [], 'service': []}
+    nodes = {}
+    for node_id, node in iter_nodes(architecture):
+        if isinstance(node, dict) and node.get('type') in by_type:
+            by_type[node['type']].append((node_id, node))
+            nodes[node_id] = node
+
+    names = _Names()
+    entities_py = _entities_py(repo_name, by_type['entity'], names)
+    entity_vars = dict(names.by_node)
+
+    # A view reads from its first upstream datasource; others get a placeholder FileSource
+    source_ids = {node_id for node_id, _ in by_type['datasource']}
+    placeholder_views = []
+    view_sources = {}
+    for node_id, node in by_type['featureview']:
+        upstream = [ref for ref in node.get('inputs') or [] if ref in source_ids]
+        view_sources[node_id] = upstream[0] if upstream else None
+        if not upstream:
+            placeholder_views.append((node_id, node))
+
+    sources_py = _source_py(repo_name, by_type['datasource'], placeholder_views, names)
+    view_sources = {
+        node_id: names.by_node[source_id if source_id else f'{node_id}:source']
+        for node_id, source_id in view_sources.items()
+    }
+    views_py = _feature_views_py(repo_name, by_type['featureview'], names, view_sources, entity_vars)
+    services_py = _feature_services_py(repo_name, by_type['service'], names)
+
+    root = project_name(repo_name)
+    readme = (
+        f'# {repo_name}\n\n'
+        f'Feast feature repo generated by Feast Architect'
+        f'{f" (location: {location})" if location else ""}.\n\n'
+        '```\n'
+        f'cd {root}\n'
+        'feast apply\n'
+        '```\n'
+    )
+    return OrderedDict([
+        (f'{root}/README.md', readme),
+        (f'{root}/feature_store.yaml', _feature_store_yaml(repo_name)),
+        (f'{root}/entities.py', entities_py),
+        (f'{root}/data_sources.py', sources_py),
+        (f'{root}/feature_views.py', views_py),
+        (f'{root}/feature_services.py', services_py),
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return b''.join(chunks)
+
+
+def iter_zip(files):
+    """Yield a deflated zip of {path: text} one entry at a time."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, text in files.items():
+            info = zipfile.ZipInfo(path, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, text.encode('utf-8'))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def cache_key(json_hash, repo_name, location):
+    digest = hashlib.sha256(f'{GENERATOR_VERSION}\0{json_hash}\0{repo_name}\0{location}'.encode('utf-8'))
+    return f'feast:codegen:{digest.hexdigest()}'
+
+
+def cached_zip(key):
+    return cache.get(key)
+
+
+def iter_zip_cached(key, files):
+    """iter_zip() that stores the finished archive under key once fully sent."""
+    chunks = []
+    for chunk in iter_zip(files):
+        chunks.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(chunks), timeout=getattr(settings, 'FEAST_CODEGEN_CACHE_TTL', 86400))
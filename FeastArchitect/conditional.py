@@ -0,0 +1,85 @@
+"""
+ETag and content-negotiation helpers for conditional requests.
+
+Repository ETags are derived from json_hash, so a client holding the
+current hash can be answered with 304 Not Modified without loading
+architecture_json. Last-Modified comes from updated_at, which is also
+part of the detail and export ETags; writes to rows the detail nests
+(data sources, entities) bump it through FeastRepository.touch().
+"""
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def make_etag(json_hash, variant=''):
+    """Weak ETag for a repository representation."""
+    tag = f'{json_hash}-{variant}' if variant else json_hash
+    return f'W/"{tag}"'
+
+
+def _opaque(etag):
+    etag = etag.strip()
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    return etag.strip('"')
+
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match covers ``etag`` (weak comparison)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    target = _opaque(etag)
+    return any(_opaque(candidate) == target for candidate in header.split(','))
+
+
+def if_match_hash(request):
+    """
+    json_hash named by If-Match: a bare hash or any ETag made here for the
+    repository (every variant starts with json_hash). '' if absent or '*'.
+    """
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return ''
+    return _opaque(header.split(',')[0]).split('-', 1)[0]
+
+
+def accepts_gzip(request):
+    """True if Accept-Encoding allows gzip (q=0 counts as refused)."""
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def repository_validators(repo, variant):
+    """(etag, last_modified) for a repository row; needs json_hash and updated_at only."""
+    version = f'{variant}-{int(repo.updated_at.timestamp() * 1_000_000)}'
+    return make_etag(repo.json_hash, version), repo.updated_at
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Evaluate If-None-Match / If-Modified-Since. If-None-Match wins when
+    both are sent, as in RFC 9110.
+    """
+    if request.headers.get('If-None-Match'):
+        return etag_matches(request, etag)
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if since is None or last_modified is None:
+        return False
+    return int(last_modified.timestamp()) <= since
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified_response(etag, last_modified):
+    return set_validators(HttpResponseNotModified(), etag, last_modified)
@@ -0,0 +1,221 @@
+"""
+Token-aware conversation history for chat turns.
+
+Each turn sends the system prompt, then the session's rolling summary (if
+any), then the most recent user/assistant messages, then the new message.
+Summary plus recent turns stay within FEAST_LLM_CONTEXT_BUDGET estimated
+tokens.
+
+The assembled prefix is cached per session in this process (LRU). A new
+turn only loads the messages written since the cached one, so the work
+per turn is O(1); a miss (other process, new summary) reloads the turns
+after the summary, which compaction keeps bounded. Assistant messages
+still being streamed (is_complete False, in any process) are not cached:
+the window stops before the first one, and complete turns after it are
+read fresh on each call until it finishes. One left incomplete for
+longer than FEAST_LLM_JOB_TIMEOUT (its worker died) counts as finished.
+Empty messages are left out.
+
+After a turn, compact() checks the budget. When it is exceeded, all but
+the newest FEAST_LLM_CONTEXT_KEEP tokens of turns are folded into the
+session's summary by the LLM. If that call fails, the turns are
+condensed to one line each instead, so the window stays bounded.
+"""
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Deque, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import LLMChatSession, LLMMessage
+
+logger = logging.getLogger(__name__)
+
+
+# Rough per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def estimate_tokens(text):
+    """About four characters per token; no tokenizer for the served model is available here."""
+    return (len(text or '') + 3) // 4 + MESSAGE_OVERHEAD
+
+
+@dataclass
+class Window:
+    """Cached prefix of one session: turns after the summary, oldest first."""
+    summary_through: Optional[int]
+    last_id: int = 0
+    tokens: int = 0
+    turns: Deque[Tuple[int, str, str, int]] = field(default_factory=deque)  # (id, role, content, tokens)
+
+    def add(self, message_id, role, content):
+        tokens = estimate_tokens(content)
+        self.turns.append((message_id, role, content, tokens))
+        self.tokens += tokens
+        self.last_id = max(self.last_id, message_id)
+
+    def drop_oldest(self):
+        _, _, _, tokens = self.turns.popleft()
+        self.tokens -= tokens
+
+
+def _turns_after(session_id, after_id):
+    queryset = LLMMessage.objects.filter(session_id=session_id, role__in=('user', 'assistant'))
+    if after_id:
+        queryset = queryset.filter(id__gt=after_id)
+    return queryset.order_by('id').values_list('id', 'role', 'content', 'is_complete', 'created_at')
+
+
+class ContextWindowCache:
+    """Thread-safe LRU of Window keyed by session id."""
+
+    def __init__(self):
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _window(self, session):
+        """
+        Up-to-date Window for session plus the uncached tail: complete turns
+        after an unfinished message. Loads only messages newer than the cached ones.
+        """
+        with self._lock:
+            window = self._windows.get(session.id)
+            if window is not None and window.summary_through == session.summary_through:
+                self._windows.move_to_end(session.id)
+                self.hits += 1
+                after = window.last_id or session.summary_through
+            else:
+                window = Window(summary_through=session.summary_through)
+                self.misses += 1
+                after = session.summary_through
+
+        new_turns = list(_turns_after(session.id, after))
+        # Streams older than this were abandoned (worker gone); their partial text is final
+        abandoned = timezone.now() - timedelta(seconds=_setting('FEAST_LLM_JOB_TIMEOUT', 300))
+        tail, blocked = [], False
+        with self._lock:
+            for message_id, role, content, is_complete, created_at in new_turns:
+                if message_id <= window.last_id:
+                    continue
+                if not is_complete and created_at > abandoned:
+                    blocked = True  # Cache nothing from here until it is finished
+                elif not content:
+                    continue
+                elif blocked:
+                    tail.append((message_id, role, content, estimate_tokens(content)))
+                else:
+                    window.add(message_id, role, content)
+            self._windows[session.id] = window
+            self._windows.move_to_end(session.id)
+            while len(self._windows) > _setting('FEAST_LLM_CONTEXT_CACHE_SIZE', 512):
+                self._windows.popitem(last=False)
+        return window, tail
+
+    def history(self, session, exclude_id=None) -> List[dict]:
+        """
+        Messages to send between the system prompt and the new message:
+        the summary, then the newest turns that fit the budget.
+        exclude_id is the new message itself (already saved).
+        """
+        window, tail = self._window(session)
+        budget = _setting('FEAST_LLM_CONTEXT_BUDGET', 3000) - session.summary_tokens
+        with self._lock:
+            turns = [turn for turn in list(window.turns) + tail if turn[0] != exclude_id]
+        # Newest first until the budget is used; compact() normally keeps everything in
+        selected, used = [], 0
+        for turn in reversed(turns):
+            if used + turn[3] > budget:
+                break
+            selected.append(turn)
+            used += turn[3]
+
+        messages = []
+        if session.summary:
+            messages.append({"role": "system", "content": SUMMARY_PREFIX + session.summary})
+        messages.extend({"role": role, "content": content} for _, role, content, _ in reversed(selected))
+        return messages
+
+    def compact(self, session, client=None):
+        """
+        Fold the oldest turns into the session summary once summary plus
+        turns exceed the budget. Returns True if the summary changed.
+        """
+        window, _ = self._window(session)
+        if session.summary_tokens + window.tokens <= _setting('FEAST_LLM_CONTEXT_BUDGET', 3000):
+            return False
+
+        keep = _setting('FEAST_LLM_CONTEXT_KEEP', 1500)
+        with self._lock:
+            turns = list(window.turns)
+        kept = 0
+        split = len(turns)
+        while split > 0 and kept + turns[split - 1][3] <= keep:
+            split -= 1
+            kept += turns[split][3]
+        # Keep whole exchanges: the verbatim part starts with a user message
+        while 0 < split < len(turns) and turns[split][1] != 'user':
+            split -= 1
+        old = turns[:split]
+        if not old:
+            return False
+
+        summary = self._summarize(session.summary, old, client)
+        through = old[-1][0]
+        tokens = estimate_tokens(summary)
+        LLMChatSession.objects.filter(pk=session.pk).update(
+            summary=summary, summary_through=through, summary_tokens=tokens
+        )
+        session.summary, session.summary_through, session.summary_tokens = summary, through, tokens
+
+        # Rebase the cached window on the new summary instead of reloading it
+        with self._lock:
+            while window.turns and window.turns[0][0] <= through:
+                window.drop_oldest()
+            window.summary_through = through
+        return True
+
+    def _summarize(self, previous, turns, client):
+        transcript = '\n'.join(f"{role}: {content}" for _, role, content, _ in turns)
+        max_tokens = _setting('FEAST_LLM_SUMMARY_MAX_TOKENS', 400)
+        if client is not None:
+            prompt = (
+                (f"Current summary:\n{previous}\n\n" if previous else '')
+                + f"New conversation turns:\n{transcript}\n\n"
+                + "Write the updated summary."
+            )
+            try:
+                return client.query(
+                    prompt, query_type='summarize', use_cache=False, max_tokens=max_tokens
+                )['response'].strip()
+            except Exception as e:
+                logger.warning(f"LLM summary failed, condensing turns instead: {str(e)}")
+
+        lines = [previous] if previous else []
+        lines.extend(f"- {role}: {' '.join(content.split())[:200]}" for _, role, content, _ in turns)
+        summary = '\n'.join(lines)
+        # Keep the newest part if the condensed summary is itself too long
+        return summary[-max_tokens * 4:]
+
+    def forget(self, session_id):
+        with self._lock:
+            self._windows.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'sessions_cached': len(self._windows)}
+
+
+context_windows = ContextWindowCache()
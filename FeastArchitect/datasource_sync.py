@@ -0,0 +1,129 @@
+"""
+Diff-aware bulk sync of DataSource rows from architecture source nodes.
+
+Incoming sources are compared column by column with what is stored, and
+only real changes are written: one SELECT, then bulk_create, bulk_update
+and a single DELETE inside one transaction, however many sources there are.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DataSource
+
+
+SYNC_FIELDS = [
+    'kind', 'owned_by', 'access_process', 'connection_string', 'topic',
+    'description', 'tags', 'pos_x', 'pos_y', 'column_security',
+    'feast_connection_type',
+]
+
+
+def infer_connection_type(src):
+    """Infer Feast connection type from source config."""
+    kind = src.get('kind', '')
+    if kind == 'kafka':
+        return 'stream'
+    elif kind in ['dynamodb', 'redis']:
+        return 'push'
+    elif src.get('subtype') == 'on_demand':
+        return 'request'
+    return 'batch'
+
+
+def source_fields(src, default_owner):
+    """Map a UI source node onto DataSource column values."""
+    details = src.get('details') or {}
+    return {
+        'kind': src.get('kind', 'postgres'),
+        'owned_by': src.get('ownedBy', default_owner),
+        'access_process': src.get('accessProcess', ''),
+        'connection_string': details.get('connection', ''),
+        'topic': details.get('topic', ''),
+        'description': src.get('description', ''),
+        'tags': src.get('tags', []),
+        'pos_x': src.get('x', 100),
+        'pos_y': src.get('y', 100),
+        'column_security': src.get('columnSecurity', {}),
+        'feast_connection_type': infer_connection_type(src)
+    }
+
+
+@dataclass
+class SyncPlan:
+    """What a sync would write, computed without touching the database."""
+    to_create: List[DataSource] = field(default_factory=list)
+    to_update: List[DataSource] = field(default_factory=list)
+    to_delete: List[DataSource] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    changes: Dict[str, Dict] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def has_writes(self):
+        return bool(self.to_create or self.to_update or self.to_delete)
+
+    def results(self):
+        return {
+            'created': [ds.name for ds in self.to_create],
+            'updated': [ds.name for ds in self.to_update],
+            'deleted': [ds.name for ds in self.to_delete],
+            'unchanged': self.unchanged,
+            'changes': self.changes,
+            'errors': self.errors
+        }
+
+
+def plan_sync(repository, sources):
+    """Diff incoming sources against the repository's stored DataSources."""
+    plan = SyncPlan()
+    existing = {ds.name: ds for ds in repository.data_sources.all()}
+    seen = set()
+
+    for src in sources:
+        name = src.get('name')
+        if not name:
+            plan.errors.append("Source missing name")
+            continue
+        if name in seen:
+            plan.errors.append(f"Duplicate source name: {name}")
+            continue
+        seen.add(name)
+
+        data = source_fields(src, repository.default_owner)
+        ds = existing.get(name)
+        if ds is None:
+            plan.to_create.append(DataSource(repository=repository, name=name, **data))
+            continue
+
+        changed = {
+            key: {'old': getattr(ds, key), 'new': value}
+            for key, value in data.items()
+            if getattr(ds, key) != value
+        }
+        if not changed:
+            plan.unchanged.append(name)
+            continue
+        for key, diff in changed.items():
+            setattr(ds, key, diff['new'])
+        plan.to_update.append(ds)
+        plan.changes[name] = changed
+
+    plan.to_delete = [ds for name, ds in existing.items() if name not in seen]
+    return plan
+
+
+def apply_sync(plan):
+    """Write a plan with bulk operations in a single transaction."""
+    now = timezone.now()
+    with transaction.atomic():
+        if plan.to_delete:
+            DataSource.objects.filter(id__in=[ds.id for ds in plan.to_delete]).delete()
+        if plan.to_update:
+            for ds in plan.to_update:
+                ds.updated_at = now
+            DataSource.objects.bulk_update(plan.to_update, SYNC_FIELDS + ['updated_at'], batch_size=500)
+        if plan.to_create:
+            DataSource.objects.bulk_create(plan.to_create, batch_size=500)
@@ -0,0 +1,192 @@
+"""
+Repository change feed (pub/sub) behind the SSE endpoint.
+
+Write paths call publish_change() after commit; every open
+/api/repositories/{id}/events/ stream for that repository receives the new
+hash immediately instead of discovering it on the next poll or 409.
+
+Backends (settings.FEAST_CHANGE_FEED_BACKEND):
+
+* ``local`` (default): in-process only. Enough for a single ASGI worker.
+* ``db``: each change is also written to RepositoryChange, and every
+  process with subscribers runs one poller thread that fans new rows out
+  to its local streams. This is the multi-worker stand-in; local
+  subscribers still get their own process's changes immediately.
+
+A change can commit after one with a higher id (ids are allocated at
+insert, rows become visible at commit), so besides rows past the last
+id the poller re-reads the ids created in the last
+FEAST_CHANGE_FEED_REORDER_WINDOW seconds and delivers the ones it has
+not seen yet.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _backend():
+    return getattr(settings, 'FEAST_CHANGE_FEED_BACKEND', 'local')
+
+
+class Subscription:
+    """One open event stream, consumed from an asyncio event loop."""
+
+    def __init__(self, broker, repository_id, maxsize=100):
+        self.broker = broker
+        self.repository_id = repository_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        """Thread-safe: called from request threads and the poller."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            # Slow consumer: only the latest hash matters, drop the oldest
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class ChangeBroker:
+    """Fan-out of repository change events to open subscriptions."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._local_ids = deque(maxlen=1000)
+        self._poller = None
+        # Poller cursor: highest id read, plus ids read recently -> time.monotonic()
+        self._last_id = None
+        self._seen = OrderedDict()
+
+    def subscribe(self, repository_id):
+        subscription = Subscription(self, repository_id)
+        with self._lock:
+            self._subscribers[repository_id].add(subscription)
+        if _backend() == 'db':
+            self._ensure_poller()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.repository_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.repository_id]
+
+    def subscriber_count(self, repository_id=None):
+        with self._lock:
+            if repository_id is None:
+                return sum(len(s) for s in self._subscribers.values())
+            return len(self._subscribers.get(repository_id, ()))
+
+    def publish(self, repository_id, event):
+        if _backend() == 'db':
+            from .models import RepositoryChange
+            change = RepositoryChange.objects.create(
+                repository_id=repository_id,
+                action=event.get('action', ''),
+                json_hash=event.get('hash') or '',
+                payload=event
+            )
+            event = dict(event, seq=change.id)
+            self._local_ids.append(change.id)
+        self.deliver(repository_id, event)
+
+    def deliver(self, repository_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(repository_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put(event)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                self.unsubscribe(subscription)
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll, name='feast-change-feed', daemon=True)
+                self._poller.start()
+
+    def _poll_once(self):
+        """Deliver changes committed since the last call; returns how many."""
+        from .models import RepositoryChange
+
+        window = getattr(settings, 'FEAST_CHANGE_FEED_REORDER_WINDOW', 10)
+        recent = RepositoryChange.objects.filter(created_at__gte=timezone.now() - timedelta(seconds=window))
+        now = time.monotonic()
+        if self._last_id is None:
+            # Start after everything already committed, including recent rows
+            last = RepositoryChange.objects.order_by('-id').values_list('id', flat=True).first()
+            self._last_id = last or 0
+            self._seen = OrderedDict((change_id, now) for change_id in recent.values_list('id', flat=True))
+
+        late = [
+            change_id for change_id in recent.filter(id__lte=self._last_id).values_list('id', flat=True)
+            if change_id not in self._seen
+        ]
+        changes = list(RepositoryChange.objects.filter(id__in=late)) if late else []
+        changes += RepositoryChange.objects.filter(id__gt=self._last_id).order_by('id')[:500]
+        for change in changes:
+            self._last_id = max(self._last_id, change.id)
+            self._seen[change.id] = now
+            if change.id not in self._local_ids:
+                self.deliver(change.repository_id, dict(change.payload, seq=change.id))
+
+        # Ids older than the window can't show up late any more
+        while self._seen and next(iter(self._seen.values())) < now - 2 * window:
+            self._seen.popitem(last=False)
+        return len(changes)
+
+    def _poll(self):
+        from .models import RepositoryChange
+
+        interval = getattr(settings, 'FEAST_CHANGE_FEED_POLL_INTERVAL', 0.5)
+        retention = getattr(settings, 'FEAST_CHANGE_FEED_RETENTION', 600)
+        last_prune = 0
+        while True:
+            try:
+                close_old_connections()
+                self._poll_once()
+                if time.monotonic() - last_prune > retention:
+                    last_prune = time.monotonic()
+                    RepositoryChange.objects.filter(
+                        created_at__lt=timezone.now() - timedelta(seconds=retention)
+                    ).delete()
+            except Exception:
+                logger.exception("Change feed poll failed")
+            time.sleep(interval)
+
+
+broker = ChangeBroker()
+
+
+def publish_change(repo, action, previous_hash=None, user=None):
+    """Publish a repository's new hash once the current transaction commits."""
+    event = {
+        'repository_id': repo.id,
+        'action': action,
+        'hash': repo.json_hash,
+        'previous_hash': previous_hash,
+        'updated_at': repo.updated_at.isoformat() if repo.updated_at else None,
+        'user': user.username if user else None,
+    }
+    transaction.on_commit(lambda: broker.publish(repo.id, event))
@@ -0,0 +1,117 @@
+"""
+Materialized cross-repository feature catalog.
+
+Features only exist as ``{name, type}`` lists inside feature view nodes,
+so FeatureCatalogEntry keeps one row per (repository, feature view,
+feature) with its dtype, the join keys of the view's entities, the
+view's TTL and the services that read it. refresh_feature_catalog() is
+called from sync_architecture_tables(), i.e. on every repository write;
+it diffs the repository's rows against the document and only writes what
+changed.
+
+Lookups go through the (feature_key, id) index: exact matches and prefix
+searches are both range scans on the lowercased name.
+"""
+from django.db import transaction
+
+from .architecture import iter_nodes, parse_ttl
+from .models import FeatureCatalogEntry
+
+
+ENTRY_FIELDS = ['feature_view', 'feature_key', 'dtype', 'join_keys', 'ttl_seconds', 'services']
+
+
+def _is_ref(value):
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def _list(node, key):
+    value = node.get(key)
+    return value if isinstance(value, list) else []
+
+
+def catalog_rows(architecture):
+    """{(feature_view_id, feature): column values} for a document."""
+    nodes = {
+        node_id: node for node_id, node in iter_nodes(architecture)
+        if _is_ref(node_id) and isinstance(node, dict)
+    }
+    views = {node_id: node for node_id, node in nodes.items() if node.get('type') == 'featureview'}
+    views_by_name = {node.get('name'): node_id for node_id, node in views.items() if isinstance(node.get('name'), str)}
+
+    # (view id, feature name or None for the whole view) -> service names
+    consumers = {}
+    for node in nodes.values():
+        if node.get('type') != 'service':
+            continue
+        service_name = node.get('name') if isinstance(node.get('name'), str) else ''
+        for ref in _list(node, 'features'):
+            if not isinstance(ref, str):
+                continue
+            if ref in views:
+                consumers.setdefault((ref, None), set()).add(service_name)
+            elif ':' in ref:
+                view_ref, _, feature_name = ref.partition(':')
+                view_id = view_ref if view_ref in views else views_by_name.get(view_ref)
+                if view_id:
+                    consumers.setdefault((view_id, feature_name), set()).add(service_name)
+
+    rows = {}
+    for view_id, view in views.items():
+        join_keys = [
+            nodes[entity_id].get('joinKey')
+            for entity_id in _list(view, 'entities')
+            if _is_ref(entity_id) and entity_id in nodes and nodes[entity_id].get('joinKey')
+        ]
+        details = view.get('details')
+        ttl = parse_ttl(details.get('ttl') if isinstance(details, dict) else None)
+        whole_view = consumers.get((view_id, None), set())
+        for feature in _list(view, 'features'):
+            if not isinstance(feature, dict) or not feature.get('name'):
+                continue
+            name = str(feature['name'])[:255]
+            rows[(str(view_id)[:255], name)] = {
+                'feature_view': str(view.get('name') or view_id)[:255],
+                'feature_key': name.lower(),
+                'dtype': str(feature.get('type') or '')[:50],
+                'join_keys': join_keys,
+                'ttl_seconds': ttl,
+                'services': sorted(whole_view | consumers.get((view_id, name), set())),
+            }
+    return rows
+
+
+def refresh_feature_catalog(repository):
+    """Bring the repository's catalog rows in line with its architecture_json."""
+    rows = catalog_rows(repository.architecture_json)
+    existing = {
+        (entry.feature_view_id, entry.feature): entry
+        for entry in repository.feature_entries.all()
+    }
+
+    stale = [entry.id for key, entry in existing.items() if key not in rows]
+    to_create, to_update = [], []
+    for (view_id, feature), values in rows.items():
+        entry = existing.get((view_id, feature))
+        if entry is None:
+            to_create.append(FeatureCatalogEntry(
+                repository=repository, feature_view_id=view_id, feature=feature, **values
+            ))
+        elif any(getattr(entry, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(entry, field, value)
+            to_update.append(entry)
+
+    with transaction.atomic():
+        if stale:
+            FeatureCatalogEntry.objects.filter(id__in=stale).delete()
+        FeatureCatalogEntry.objects.bulk_update(to_update, ENTRY_FIELDS, batch_size=500)
+        FeatureCatalogEntry.objects.bulk_create(to_create, batch_size=500)
+
+    return {'created': len(to_create), 'updated': len(to_update), 'deleted': len(stale)}
+
+
+def prefix_range(queryset, prefix):
+    """Filter to feature names starting with prefix (case-insensitive), as an index range."""
+    key = prefix.lower()
+    return queryset.filter(feature_key__gte=key, feature_key__lt=key + '\uffff')
@@ -0,0 +1,141 @@
+"""
+Streaming import of repository export files.
+
+Accepts both export shapes:
+
+* server exports: ``{"repository": {...}, "architecture": {"nodes": ..., "edges": [...]}, "server_hash": ...}``
+* UI / example_repos exports: ``{"repository": {...}, "nodes": [[id, node], ...], "edges": [...], "version": ...}``
+
+and both node layouts (list of ``[id, node]`` pairs or ``{id: node}``).
+Nodes are decoded one at a time from the upload, and DataSource/Entity
+rows are written with batched bulk inserts.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .datasource_sync import source_fields
+from .json_stream import JSONStreamReader, JSONStreamError
+from .models import DataSource, Entity
+
+
+# Top-level keys that describe the export rather than the architecture
+EXPORT_KEYS = ('repository', 'server_hash', 'hash', 'last_updated', 'export_date')
+
+IMPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class ImportDocument:
+    """Parsed export file."""
+    repository: Dict = field(default_factory=dict)
+    architecture: Dict = field(default_factory=dict)
+    import_hash: Optional[str] = None
+    source_nodes: List[Dict] = field(default_factory=list)
+    entity_nodes: List[Dict] = field(default_factory=list)
+
+    def collect(self, node):
+        if not isinstance(node, dict):
+            return
+        if node.get('type') == 'datasource':
+            self.source_nodes.append(node)
+        elif node.get('type') == 'entity':
+            self.entity_nodes.append(node)
+
+
+def _read_nodes(reader, doc):
+    """Read a nodes container in either layout, keeping that layout."""
+    char = reader.peek()
+    if char == '[':
+        nodes = []
+        for entry in reader.iter_array():
+            nodes.append(entry)
+            if isinstance(entry, list) and len(entry) == 2:
+                doc.collect(entry[1])
+            else:
+                doc.collect(entry)
+        return nodes
+    if char == '{':
+        nodes = {}
+        for node_id in reader.iter_keys():
+            nodes[node_id] = reader.read_value()
+            doc.collect(nodes[node_id])
+        return nodes
+    return reader.read_value()
+
+
+def _read_architecture(reader, doc):
+    arch = {}
+    for key in reader.iter_keys():
+        if key == 'nodes':
+            arch['nodes'] = _read_nodes(reader, doc)
+        else:
+            arch[key] = reader.read_value()
+    return arch
+
+
+def read_import(fp):
+    """Parse an export file object. Raises JSONStreamError on bad input."""
+    reader = JSONStreamReader(fp)
+    doc = ImportDocument()
+    top = {}
+    nested = None
+
+    if reader.peek() != '{':
+        raise JSONStreamError('Export must be a JSON object')
+    for key in reader.iter_keys():
+        if key == 'architecture' and reader.peek() == '{':
+            nested = _read_architecture(reader, doc)
+        elif key == 'nodes':
+            top['nodes'] = _read_nodes(reader, doc)
+        else:
+            top[key] = reader.read_value()
+    if reader.peek():
+        raise JSONStreamError('Extra data after the export object')
+
+    doc.repository = top.get('repository') if isinstance(top.get('repository'), dict) else {}
+    doc.import_hash = top.get('server_hash') or top.get('hash')
+    if nested is not None:
+        doc.architecture = nested
+    else:
+        doc.architecture = {k: v for k, v in top.items() if k not in EXPORT_KEYS}
+    return doc
+
+
+def _batched_create(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def _unique_by_name(nodes):
+    seen = set()
+    for node in nodes:
+        name = node.get('name', 'Unknown')
+        if name not in seen:
+            seen.add(name)
+            yield name, node
+
+
+def create_rows(repository, doc):
+    """Bulk-create DataSource and Entity rows for the imported nodes."""
+    _batched_create(DataSource, (
+        DataSource(repository=repository, name=name, **source_fields(node, repository.default_owner))
+        for name, node in _unique_by_name(doc.source_nodes)
+    ))
+    _batched_create(Entity, (
+        Entity(
+            repository=repository,
+            name=name,
+            join_key=node.get('joinKey', 'id'),
+            description=node.get('description', ''),
+            tags=node.get('tags', []),
+            pos_x=node.get('x', 100),
+            pos_y=node.get('y', 100)
+        )
+        for name, node in _unique_by_name(doc.entity_nodes)
+    ))
@@ -0,0 +1,217 @@
+"""
+RFC 6902-style JSON Patch for architecture_json documents.
+
+Paths are JSON pointers with two Feast-specific conveniences:
+
+* ``/nodes/<node_id>/...`` always addresses a node by id, whether nodes are
+  stored as a dict or as the UI's list of ``[id, node]`` pairs.
+* ``/edges/<edge_id>`` addresses an edge by its id ("from->to"), in addition
+  to the usual numeric index and ``-`` (append).
+"""
+import copy
+
+from .architecture import edge_id
+
+
+OPERATIONS = ('add', 'remove', 'replace', 'move', 'copy', 'test')
+
+
+class PatchError(ValueError):
+    """Raised when a patch operation is malformed or cannot be applied."""
+
+
+def parse_pointer(path):
+    """Split a JSON pointer into unescaped reference tokens."""
+    if not isinstance(path, str) or (path and not path.startswith('/')):
+        raise PatchError(f'Invalid JSON pointer: {path!r}')
+    if path == '':
+        return []
+    return [t.replace('~1', '/').replace('~0', '~') for t in path[1:].split('/')]
+
+
+def _kind(container, parent_tokens):
+    if isinstance(container, list):
+        if parent_tokens == ['nodes']:
+            return 'nodes'
+        if parent_tokens == ['edges']:
+            return 'edges'
+        return 'list'
+    if isinstance(container, dict):
+        return 'dict'
+    raise PatchError(f'Cannot traverse into {type(container).__name__} at /{"/".join(parent_tokens)}')
+
+
+def _index(container, kind, token, for_add=False):
+    """Resolve a token to a list position, or None if it does not exist."""
+    if kind == 'nodes':
+        for i, entry in enumerate(container):
+            if isinstance(entry, list) and entry and entry[0] == token:
+                return i
+        return None
+
+    if token == '-':
+        return len(container) if for_add else None
+
+    if token.isdigit() and (token == '0' or not token.startswith('0')):
+        i = int(token)
+        limit = len(container) if for_add else len(container) - 1
+        if i > limit:
+            raise PatchError(f'Array index out of range: {token}')
+        return i
+
+    if kind == 'edges':
+        for i, edge in enumerate(container):
+            if isinstance(edge, dict) and edge_id(edge) == token:
+                return i
+        return len(container) if for_add else None
+
+    raise PatchError(f'Invalid array index: {token!r}')
+
+
+def _child(container, tokens, depth):
+    token = tokens[depth]
+    kind = _kind(container, tokens[:depth])
+    if kind == 'dict':
+        if token not in container:
+            raise PatchError(f'Path not found: /{"/".join(tokens[:depth + 1])}')
+        return container[token]
+    i = _index(container, kind, token)
+    if i is None:
+        raise PatchError(f'Path not found: /{"/".join(tokens[:depth + 1])}')
+    return container[i][1] if kind == 'nodes' else container[i]
+
+
+def _resolve(document, tokens):
+    value = document
+    for depth in range(len(tokens)):
+        value = _child(value, tokens, depth)
+    return value
+
+
+def _parent(document, tokens):
+    parent = _resolve(document, tokens[:-1])
+    return parent, _kind(parent, tokens[:-1]), tokens[-1]
+
+
+def _add(document, tokens, value):
+    if not tokens:
+        return value
+    parent, kind, key = _parent(document, tokens)
+    if kind == 'dict':
+        parent[key] = value
+    elif kind == 'nodes':
+        i = _index(parent, kind, key)
+        if i is None:
+            parent.append([key, value])
+        else:
+            parent[i][1] = value
+    else:
+        parent.insert(_index(parent, kind, key, for_add=True), value)
+    return document
+
+
+def _remove(document, tokens):
+    if not tokens:
+        raise PatchError('Cannot remove the document root')
+    parent, kind, key = _parent(document, tokens)
+    if kind == 'dict':
+        if key not in parent:
+            raise PatchError(f'Path not found: /{"/".join(tokens)}')
+        return parent.pop(key)
+    i = _index(parent, kind, key)
+    if i is None:
+        raise PatchError(f'Path not found: /{"/".join(tokens)}')
+    removed = parent.pop(i)
+    return removed[1] if kind == 'nodes' else removed
+
+
+def _replace(document, tokens, value):
+    if not tokens:
+        return value
+    parent, kind, key = _parent(document, tokens)
+    _resolve(document, tokens)  # must exist
+    if kind == 'dict':
+        parent[key] = value
+    elif kind == 'nodes':
+        parent[_index(parent, kind, key)][1] = value
+    else:
+        parent[_index(parent, kind, key)] = value
+    return document
+
+
+def apply_operation(document, operation):
+    """Apply a single operation and return the (possibly new) document root."""
+    if not isinstance(operation, dict):
+        raise PatchError('Each operation must be an object')
+    op = operation.get('op')
+    if op not in OPERATIONS:
+        raise PatchError(f'Unsupported op: {op!r}')
+    tokens = parse_pointer(operation.get('path'))
+
+    if op in ('add', 'replace', 'test') and 'value' not in operation:
+        raise PatchError(f'"{op}" requires a value')
+
+    if op == 'add':
+        return _add(document, tokens, operation['value'])
+    if op == 'remove':
+        _remove(document, tokens)
+        return document
+    if op == 'replace':
+        return _replace(document, tokens, operation['value'])
+    if op == 'test':
+        if _resolve(document, tokens) != operation['value']:
+            raise PatchError(f'Test failed at {operation["path"]}')
+        return document
+
+    from_tokens = parse_pointer(operation.get('from'))
+    if op == 'move':
+        if tokens[:len(from_tokens)] == from_tokens and tokens != from_tokens:
+            raise PatchError('Cannot move a value into one of its children')
+        value = _remove(document, from_tokens)
+        return _add(document, tokens, value)
+    # copy
+    value = copy.deepcopy(_resolve(document, from_tokens))
+    return _add(document, tokens, value)
+
+
+def apply_patch(document, operations):
+    """
+    Apply operations in order, mutating ``document`` in place.
+
+    Returns the resulting root. On PatchError the document may be partially
+    modified, so callers must discard it rather than persist it.
+    """
+    for index, operation in enumerate(operations):
+        try:
+            document = apply_operation(document, operation)
+        except PatchError as e:
+            raise PatchError(f'Operation {index}: {e}') from e
+    return document
+
+
+def affected_nodes(operations):
+    """
+    Work out what a patch can have modified.
+
+    Returns (node_ids, edges_touched). node_ids is None when an operation
+    replaces the whole nodes container or the document root.
+    """
+    node_ids = set()
+    edges_touched = False
+    for operation in operations:
+        if operation.get('op') == 'test':
+            continue
+        pointers = [operation.get('path')]
+        if operation.get('op') in ('move', 'copy'):
+            pointers.append(operation.get('from'))
+        for pointer in pointers:
+            tokens = parse_pointer(pointer)
+            if not tokens:
+                return None, True
+            if tokens[0] == 'nodes':
+                if len(tokens) == 1:
+                    return None, True
+                node_ids.add(tokens[1])
+            elif tokens[0] == 'edges':
+                edges_touched = True
+    return node_ids, edges_touched
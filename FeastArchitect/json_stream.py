@@ -0,0 +1,182 @@
+"""
+Incremental JSON reading and writing for large imports/exports.
+
+JSONStreamReader walks a document from a file object chunk by chunk, so
+an import never holds the raw bytes, the decoded text and the parsed
+result at the same time. It is cursor-style: iterate an object's keys or
+an array's items and decode only the values you ask for.
+
+    reader = JSONStreamReader(upload)
+    for key in reader.iter_keys():
+        if key == 'nodes':
+            for node in reader.iter_array():
+                ...
+        else:
+            value = reader.read_value()
+
+iter_encode/buffer_chunks/gzip_chunks do the reverse for exports, so a
+response can be streamed without rendering the whole document first.
+"""
+import codecs
+import json
+import zlib
+
+
+class JSONStreamError(ValueError):
+    """Raised when the stream is not valid JSON or is used out of order."""
+
+
+_WHITESPACE = ' \t\n\r'
+
+
+class JSONStreamReader:
+    """Pull-parser over a text or binary file object."""
+
+    def __init__(self, fp, chunk_size=64 * 1024):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    def _fill(self, size=None):
+        """Read more input, dropping the consumed prefix of the buffer."""
+        if self.eof:
+            return False
+        chunk = ''
+        while not chunk:
+            raw = self.fp.read(size or self.chunk_size)
+            try:
+                chunk = self._utf8.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+            except UnicodeDecodeError as e:
+                raise JSONStreamError(f'Input is not UTF-8: {e.reason}') from e
+            if not raw:
+                break
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise JSONStreamError(f'Expected {char!r} but found {found or "end of input"!r}')
+        self.pos += 1
+
+    def read_value(self):
+        """Decode the next complete value."""
+        if not self.peek():
+            raise JSONStreamError('Unexpected end of input')
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Grow geometrically so a huge value isn't re-scanned per chunk
+                if self._fill(max(self.chunk_size, len(self.buffer) - self.pos)):
+                    continue
+                raise JSONStreamError(str(e)) from e
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_keys(self):
+        """
+        Iterate the keys of the next object. The caller must consume each
+        key's value (read_value/iter_array/iter_keys) before advancing.
+        """
+        self._expect('{')
+        first = True
+        while True:
+            char = self.peek()
+            if char == '}':
+                self.pos += 1
+                return
+            if not first:
+                self._expect(',')
+            if self.peek() != '"':
+                raise JSONStreamError('Expected an object key')
+            key = self.read_value()
+            self._expect(':')
+            first = False
+            yield key
+
+    def iter_array(self):
+        """Iterate the decoded items of the next array, one at a time."""
+        self._expect('[')
+        first = True
+        while True:
+            char = self.peek()
+            if char == ']':
+                self.pos += 1
+                return
+            if not first:
+                self._expect(',')
+            first = False
+            yield self.read_value()
+
+
+def iter_encode(value, depth=1, encoder=None):
+    """
+    Encode ``value`` as JSON text in pieces.
+
+    Containers are split element by element down to ``depth`` levels;
+    anything deeper is encoded in one go. Joining the pieces gives the same
+    document as json.dumps(value).
+    """
+    encode = (encoder or json.JSONEncoder(ensure_ascii=False)).encode
+    if depth <= 0 or not isinstance(value, (dict, list)):
+        yield encode(value)
+        return
+    if isinstance(value, dict):
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            yield (', ' if i else '') + encode(str(key)) + ': '
+            yield from iter_encode(item, depth - 1, encoder)
+        yield '}'
+    else:
+        yield '['
+        for i, item in enumerate(value):
+            if i:
+                yield ', '
+            yield from iter_encode(item, depth - 1, encoder)
+        yield ']'
+
+
+def buffer_chunks(chunks, size=64 * 1024):
+    """Coalesce small text pieces into ~size UTF-8 byte chunks."""
+    parts, length = [], 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b''.join(parts)
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a byte stream incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
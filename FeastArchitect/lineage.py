@@ -0,0 +1,214 @@
+"""
+Server-side lineage over a repository's architecture.
+
+The data flow is the union of the ``edges`` list (``from`` -> ``to``) and
+each node's ``inputs``/``outputs``, which the UI keeps in sync with the
+edges but hand-written or imported documents may only carry one of.
+
+LineageGraph indexes the nodes once (integer ids, forward and reverse
+adjacency lists) so every query is a single BFS: O(V+E), no LLM round
+trip. Graphs are immutable and cached per json_hash, which is a content
+address, so unchanged repositories (and identical copies) share one
+graph and an edit simply produces a new cache key.
+"""
+import threading
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+from .architecture import iter_nodes, get_edges
+
+
+def _cache_size():
+    return getattr(settings, 'FEAST_LINEAGE_CACHE_SIZE', 128)
+
+
+def _key(ref):
+    """Node references compare as strings (ids may be stored as numbers); anything else is no reference."""
+    if isinstance(ref, bool) or not isinstance(ref, (str, int, float)):
+        return None
+    return str(ref)
+
+
+def _refs(value):
+    return value if isinstance(value, list) else []
+
+
+class LineageGraph:
+    """Adjacency indexes for one architecture document."""
+
+    def __init__(self, architecture):
+        self.ids = []
+        self.types = []
+        self.names = []
+        self.index = {}
+        for node_id, node in iter_nodes(architecture):
+            node_id = _key(node_id)
+            if node_id is None or node_id in self.index or not isinstance(node, dict):
+                continue
+            self.index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self.types.append(node.get('type') if isinstance(node.get('type'), str) else None)
+            self.names.append(_key(node.get('name')) or node_id)
+
+        self.by_name = {}
+        for i, name in enumerate(self.names):
+            self.by_name.setdefault(name, i)
+
+        forward = [set() for _ in self.ids]
+        backward = [set() for _ in self.ids]
+
+        def link(src, dst):
+            a, b = self.index.get(_key(src)), self.index.get(_key(dst))
+            if a is not None and b is not None and a != b:
+                forward[a].add(b)
+                backward[b].add(a)
+
+        for edge in get_edges(architecture):
+            if isinstance(edge, dict):
+                link(edge.get('from'), edge.get('to'))
+        for node_id, node in iter_nodes(architecture):
+            if not isinstance(node, dict):
+                continue
+            for target in _refs(node.get('outputs')):
+                link(node_id, target)
+            for source in _refs(node.get('inputs')):
+                link(source, node_id)
+
+        # Sorted for stable responses
+        self.forward = [sorted(targets) for targets in forward]
+        self.backward = [sorted(sources) for sources in backward]
+        self.edge_count = sum(len(targets) for targets in self.forward)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def resolve(self, ref):
+        """Node index for an id or (failing that) an exact node name, else None."""
+        ref = _key(ref)
+        if ref in self.index:
+            return self.index[ref]
+        return self.by_name.get(ref)
+
+    def node(self, i, **extra):
+        return {'id': self.ids[i], 'type': self.types[i], 'name': self.names[i], **extra}
+
+    def _bfs(self, starts, adjacency, max_depth=None):
+        """{index: distance} for everything reachable from starts (excluding them)."""
+        seen = {i: 0 for i in starts}
+        queue = deque(starts)
+        while queue:
+            current = queue.popleft()
+            depth = seen[current]
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for nxt in adjacency[current]:
+                if nxt not in seen:
+                    seen[nxt] = depth + 1
+                    queue.append(nxt)
+        for i in starts:
+            seen.pop(i, None)
+        return seen
+
+    def _closure(self, starts, adjacency, max_depth=None):
+        reached = self._bfs(starts, adjacency, max_depth)
+        ordered = sorted(reached.items(), key=lambda item: (item[1], self.ids[item[0]]))
+        return [self.node(i, depth=depth) for i, depth in ordered]
+
+    def upstream(self, i, max_depth=None):
+        return self._closure([i], self.backward, max_depth)
+
+    def downstream(self, i, max_depth=None):
+        return self._closure([i], self.forward, max_depth)
+
+    def _walk_back(self, parents, end):
+        path = [end]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        return [self.node(i) for i in reversed(path)]
+
+    def _parents(self, start):
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for nxt in self.forward[current]:
+                if nxt not in parents:
+                    parents[nxt] = current
+                    queue.append(nxt)
+        return parents
+
+    def path(self, start, end):
+        """Shortest downstream path start -> end as a list of nodes, or None."""
+        parents = self._parents(start)
+        if end not in parents:
+            return None
+        return self._walk_back(parents, end)
+
+    def paths_to_type(self, start, node_type='service'):
+        """Shortest path from start to every reachable node of node_type."""
+        parents = self._parents(start)
+        ends = sorted((i for i in parents if i != start and self.types[i] == node_type), key=lambda i: self.ids[i])
+        return [self._walk_back(parents, end) for end in ends]
+
+    def impact(self, indexes):
+        """Everything downstream of any of the given nodes, grouped by type."""
+        reached = self._bfs(list(indexes), self.forward)
+        by_type = {}
+        for i in sorted(reached, key=lambda i: (reached[i], self.ids[i])):
+            by_type.setdefault(self.types[i] or 'unknown', []).append(self.node(i, depth=reached[i]))
+        return {
+            'nodes': [self.node(i) for i in indexes],
+            'affected_count': len(reached),
+            'affected': by_type,
+            'services': [node['id'] for node in by_type.get('service', [])]
+        }
+
+    def summary(self):
+        return {
+            'node_count': len(self.ids),
+            'edge_count': self.edge_count,
+            'roots': [self.ids[i] for i in range(len(self.ids)) if not self.backward[i]],
+            'sinks': [self.ids[i] for i in range(len(self.ids)) if not self.forward[i]],
+            'adjacency': {self.ids[i]: [self.ids[j] for j in self.forward[i]] for i in range(len(self.ids))}
+        }
+
+
+class LineageCache:
+    """Thread-safe LRU of LineageGraph keyed by json_hash."""
+
+    def __init__(self):
+        self._graphs = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, json_hash, load_architecture):
+        """Graph for json_hash; load_architecture() is only called on a miss."""
+        if not json_hash:
+            return LineageGraph(load_architecture())
+        with self._lock:
+            graph = self._graphs.get(json_hash)
+            if graph is not None:
+                self._graphs.move_to_end(json_hash)
+                self.hits += 1
+                return graph
+            self.misses += 1
+
+        graph = LineageGraph(load_architecture())
+        with self._lock:
+            self._graphs[json_hash] = graph
+            while len(self._graphs) > _cache_size():
+                self._graphs.popitem(last=False)
+        return graph
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'graphs_cached': len(self._graphs)}
+
+
+lineage_cache = LineageCache()
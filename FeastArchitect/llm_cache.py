@@ -0,0 +1,165 @@
+"""
+Response cache in front of GroqLLMClient.query.
+
+Answers are keyed on SHA-256 of (model, query_type, system prompt,
+normalized message, context fingerprint, conversation history). The
+context includes the repository json_hash, so any edit to the
+architecture misses naturally; follow-up questions only hit within the
+same conversation.
+
+Two tiers:
+
+- memory: per-process LRU (FEAST_LLM_CACHE_SIZE entries)
+- database: LLMCachedResponse rows, shared by every worker
+
+Both expire after FEAST_LLM_CACHE_TTL seconds; expired rows are deleted
+lazily on writes. Callers opt out per request (use_cache=False).
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+# Expired rows are purged at most this often (seconds)
+PURGE_INTERVAL = 300
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enabled():
+    return _setting('FEAST_LLM_CACHE_ENABLED', True)
+
+
+def normalize_message(message):
+    """Case and whitespace differences do not change the key."""
+    return re.sub(r'\s+', ' ', message or '').strip().casefold()
+
+
+def cache_key(model, query_type, system_prompt, message, context=None, history=None):
+    payload = json.dumps(
+        [model, query_type, system_prompt, normalize_message(message), context or {}, history or []],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Thread-safe LRU backed by LLMCachedResponse, with hit/miss counters."""
+
+    def __init__(self):
+        self._entries = OrderedDict()  # key -> (expires_at monotonic, result)
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def _remember(self, key, result, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > _setting('FEAST_LLM_CACHE_SIZE', 256):
+                self._entries.popitem(last=False)
+
+    def _hit(self, result, tier):
+        with self._lock:
+            if tier == 'memory':
+                self.memory_hits += 1
+            else:
+                self.db_hits += 1
+            self.tokens_saved += result['usage'].get('total_tokens', 0)
+        return result
+
+    def get(self, key):
+        """Cached result dict for key, or None."""
+        from django.db.models import F
+        from .models import LLMCachedResponse
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+        if entry is not None:
+            return self._hit(entry[1], 'memory')
+
+        row = LLMCachedResponse.objects.filter(key=key, expires_at__gt=timezone.now()).first()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        LLMCachedResponse.objects.filter(pk=row.pk).update(hits=F('hits') + 1)
+        result = {
+            'response': row.response,
+            'model': row.model,
+            'usage': row.usage,
+            'query_type': row.query_type
+        }
+        self._remember(key, result, (row.expires_at - timezone.now()).total_seconds())
+        return self._hit(result, 'db')
+
+    def set(self, key, result):
+        from .models import LLMCachedResponse
+
+        ttl = _setting('FEAST_LLM_CACHE_TTL', 86400)
+        self._remember(key, result, ttl)
+        LLMCachedResponse.objects.update_or_create(key=key, defaults={
+            'model': result['model'],
+            'query_type': result.get('query_type', ''),
+            'response': result['response'],
+            'usage': result['usage'],
+            'hits': 0,
+            'expires_at': timezone.now() + timedelta(seconds=ttl)
+        })
+        self.purge_expired()
+
+    def purge_expired(self, force=False):
+        """Delete expired rows; rate-limited to once per PURGE_INTERVAL unless forced."""
+        from .models import LLMCachedResponse
+
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_purge < PURGE_INTERVAL:
+                return 0
+            self._last_purge = now
+            for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[key]
+        deleted, _ = LLMCachedResponse.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    def clear(self):
+        from .models import LLMCachedResponse
+
+        with self._lock:
+            self._entries.clear()
+        LLMCachedResponse.objects.all().delete()
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                'enabled': enabled(),
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else None,
+                'tokens_saved': self.tokens_saved,
+                'memory_entries': len(self._entries)
+            }
+
+
+response_cache = LLMResponseCache()
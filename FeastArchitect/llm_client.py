@@ -3,10 +3,18 @@ Simplified Groq LLM Client for Feast Architect
 """
 import os
 import json
-from typing import Dict, Optional
+import random
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 
+from django.conf import settings
 
+from .llm_cache import response_cache, cache_key, enabled as cache_enabled
+
+logger = logging.getLogger(__name__)
 
 
 # Not secured - but since this is a dummy project...
@@ -16,12 +24,17 @@ os.environ['GROQ_API_KEY'] = GROQ_API_KEY
 
 
 try:
-    from groq import Groq
+    import httpx
+    from groq import Groq, APIConnectionError, APIStatusError
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
 
 
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
 @dataclass
 class LLMContext:
     """Context about the repository for LLM queries."""
@@ -32,6 +45,7 @@ class LLMContext:
     entities: int = 0
     feature_views: int = 0
     services: int = 0
+    json_hash: str = ""  # Repository version; part of the response cache key
     
     def to_dict(self) -> Dict:
         return asdict(self)
@@ -47,10 +61,16 @@ class GroqLLMClient:
         "generate_code": "You are a Feast code generation expert. Output valid Python code.",
         "optimize": "You are a Feast performance expert. Focus on TTL, materialization, and serving.",
         "lineage": "You are a data lineage expert. Trace data flow from source to service.",
-        "validate": "You are a Feast validator. Check for errors and anti-patterns."
+        "validate": "You are a Feast validator. Check for errors and anti-patterns.",
+        "summarize": "You maintain a running summary of a conversation about a Feast feature store. "
+                     "Merge the new turns into the summary. Keep decisions, names, numbers and open questions; "
+                     "drop pleasantries. Reply with the summary only."
     }
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Status codes worth retrying (rate limited, overloaded, upstream errors)
+    RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+    
+    def __init__(self, api_key: Optional[str] = None, http_client=None):
         if not GROQ_AVAILABLE:
             raise RuntimeError("Install groq: pip install groq")
         
@@ -58,60 +78,217 @@ class GroqLLMClient:
         if not self.api_key:
             raise RuntimeError("Set GROQ_API_KEY environment variable")
         
-        self.client = Groq(api_key=self.api_key)
+        # Retries are done here, under a time budget, not by the SDK
+        self.client = Groq(api_key=self.api_key, http_client=http_client, max_retries=0)
+    
+    def _retry_delay(self, error, attempt):
+        """Seconds to wait before retrying error, or None if it is not retryable."""
+        if isinstance(error, APIConnectionError):  # Includes timeouts
+            retry_after = None
+        elif isinstance(error, APIStatusError) and error.status_code in self.RETRY_STATUS:
+            try:
+                retry_after = float(error.response.headers.get('retry-after'))
+            except (TypeError, ValueError):
+                retry_after = None
+        else:
+            return None
+        if retry_after is not None:
+            return retry_after
+        # Exponential backoff with full jitter
+        cap = min(_setting('FEAST_LLM_BACKOFF_MAX', 8.0), _setting('FEAST_LLM_BACKOFF_BASE', 0.5) * 2 ** attempt)
+        return random.uniform(0, cap)
+    
+    def _create(self, **kwargs):
+        """chat.completions.create() with jittered retries within the retry budget."""
+        max_retries = _setting('FEAST_LLM_MAX_RETRIES', 2)
+        deadline = time.monotonic() + _setting('FEAST_LLM_RETRY_BUDGET', 30.0)
+        attempt = 0
+        while True:
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt) if GROQ_AVAILABLE else None
+                if delay is None or attempt >= max_retries or time.monotonic() + delay > deadline:
+                    raise
+                attempt += 1
+                logger.warning(f"LLM request failed ({e.__class__.__name__}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+    
+    def _system_prompt(self, context: Optional[LLMContext], query_type: str) -> str:
+        system = self.SYSTEM_PROMPTS.get(query_type, self.SYSTEM_PROMPTS["default"])
+        if context:
+            system += f"\n\nRepository: {context.repo_name} ({context.node_count} nodes, {context.edge_count} edges)"
+        return system
+    
+    def _cache_key(self, message, context, query_type, system, history=None):
+        return cache_key(self.DEFAULT_MODEL, query_type, system, message, context.to_dict() if context else None, history)
     
     def query(
         self,
         message: str,
         context: Optional[LLMContext] = None,
         query_type: str = "default",
-        stream: bool = False
+        stream: bool = False,
+        use_cache: bool = True,
+        history: Optional[List[Dict]] = None,
+        max_tokens: int = 2048
     ) -> Dict:
-        """Send query to Groq API."""
+        """
+        Send query to Groq API. history holds earlier messages (role/content
+        dicts) sent between the system prompt and this message.
+        Non-streaming answers go through the response cache (llm_cache.py)
+        unless use_cache is False; cache hits report zero usage and
+        "cached": True.
+        """
         
         # Build system prompt
-        system = self.SYSTEM_PROMPTS.get(query_type, self.SYSTEM_PROMPTS["default"])
-        if context:
-            system += f"\n\nRepository: {context.repo_name} ({context.node_count} nodes, {context.edge_count} edges)"
+        system = self._system_prompt(context, query_type)
+        
+        key = None
+        if use_cache and not stream and cache_enabled():
+            key = self._cache_key(message, context, query_type, system, history)
+            cached = response_cache.get(key)
+            if cached is not None:
+                return {**cached, "usage": self._usage(None), "cached": True}
         
         messages = [
             {"role": "system", "content": system},
+            *(history or []),
             {"role": "user", "content": message}
         ]
         
-        completion = self.client.chat.completions.create(
+        completion = self._create(
             model=self.DEFAULT_MODEL,
             messages=messages,
             temperature=0.7,
-            max_completion_tokens=2048,
+            max_completion_tokens=max_tokens,
             stream=stream
         )
         
         if stream:
             return completion  # Generator
         
-        return {
+        result = {
             "response": completion.choices[0].message.content,
             "model": self.DEFAULT_MODEL,
-            "usage": {
-                "prompt_tokens": completion.usage.prompt_tokens if completion.usage else 0,
-                "completion_tokens": completion.usage.completion_tokens if completion.usage else 0,
-                "total_tokens": completion.usage.total_tokens if completion.usage else 0
-            },
+            "usage": self._usage(completion.usage),
             "query_type": query_type
         }
+        if key:
+            response_cache.set(key, result)
+        return {**result, "cached": False}
+    
+    @staticmethod
+    def _usage(usage) -> Dict:
+        return {
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0,
+            "total_tokens": usage.total_tokens if usage else 0
+        }
+    
+    def stream_query(
+        self,
+        message: str,
+        context: Optional[LLMContext] = None,
+        query_type: str = "default",
+        use_cache: bool = True,
+        history: Optional[List[Dict]] = None
+    ):
+        """
+        Streaming query. The request is sent (and retried) before this
+        returns, so API errors raise here; the iterator then yields
+        {"delta": text} per chunk and finally one {"usage", "model",
+        "query_type", "cached"} dict. A cache hit is replayed as one delta.
+        """
+        key = None
+        if use_cache and cache_enabled():
+            key = self._cache_key(message, context, query_type, self._system_prompt(context, query_type), history)
+            cached = response_cache.get(key)
+            if cached is not None:
+                return iter([
+                    {"delta": cached["response"]},
+                    {"usage": self._usage(None), "model": cached["model"], "query_type": query_type, "cached": True}
+                ])
+        return self._iter_stream(
+            self.query(message, context, query_type, stream=True, history=history), query_type, key
+        )
+    
+    def _iter_stream(self, completion, query_type, key=None):
+        usage = None
+        parts = []
+        try:
+            for chunk in completion:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield {"delta": delta}
+                # Groq reports usage on the last chunk, under x_groq
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+        finally:
+            close = getattr(completion, "close", None)
+            if close:
+                close()  # Return the connection to the pool
+        result = {"usage": self._usage(usage), "model": self.DEFAULT_MODEL, "query_type": query_type}
+        if key:
+            # Only complete streams get here; interrupted ones raise above
+            response_cache.set(key, {**result, "response": "".join(parts)})
+        yield {**result, "cached": False}
     
     def quick_query(self, message: str) -> str:
         """Simple query returning just text."""
         return self.query(message, stream=False)["response"]
 
 
-# Singleton instance
-_llm_client = None
+class LLMClientManager:
+    """
+    Process-wide GroqLLMClient over one pooled httpx.Client, so chat turns
+    reuse keep-alive connections instead of paying a handshake each time.
+    httpx clients are thread-safe; the lock only guards construction.
+    The client is rebuilt after a fork (gunicorn --preload) since pooled
+    sockets must not be shared across processes.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+    
+    def _build(self):
+        timeout = _setting('FEAST_LLM_TIMEOUT', 60.0)
+        http_client = httpx.Client(
+            timeout=httpx.Timeout(timeout, connect=_setting('FEAST_LLM_CONNECT_TIMEOUT', 5.0)),
+            limits=httpx.Limits(
+                max_connections=_setting('FEAST_LLM_MAX_CONNECTIONS', 20),
+                max_keepalive_connections=_setting('FEAST_LLM_MAX_KEEPALIVE', 10),
+                keepalive_expiry=_setting('FEAST_LLM_KEEPALIVE_EXPIRY', 30.0),
+            ),
+        )
+        return GroqLLMClient(http_client=http_client)
+    
+    def get(self) -> GroqLLMClient:
+        client = self._client
+        if client is not None and self._pid == os.getpid():
+            return client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                if not GROQ_AVAILABLE:
+                    raise RuntimeError("Install groq: pip install groq")
+                self._client = self._build()
+                self._pid = os.getpid()
+            return self._client
+    
+    def close(self):
+        """Close pooled connections; the next get() builds a new client."""
+        with self._lock:
+            client, self._client = self._client, None
+            if client is not None and self._pid == os.getpid():
+                client.client.close()
+
+
+llm_clients = LLMClientManager()
+
 
 def get_llm_client():
-    """Get or create singleton client."""
-    global _llm_client
-    if _llm_client is None:
-        _llm_client = GroqLLMClient()
-    return _llm_client
+    """Shared pooled client for this process."""
+    return llm_clients.get()
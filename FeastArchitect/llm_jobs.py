@@ -0,0 +1,249 @@
+"""
+Background chat turns (LLMJob).
+
+With FEAST_LLM_BACKGROUND on, send_message and create with an
+initial_message save the user message, store an LLMJob and answer 202
+with the job id; request workers never wait on Groq. A bounded pool of
+FEAST_LLM_WORKERS threads in the same process runs queued jobs, always
+through the streaming path, so the assistant LLMMessage fills in while
+the job runs. Turns answered in the request (FEAST_LLM_BACKGROUND off)
+hand their context compaction to the same pool with compact_later().
+
+Clients poll GET /api/jobs/{id}/ or open the SSE stream
+/api/jobs/{id}/stream/: in the process running the job, tokens are relayed
+live from its JobStream; anywhere else the stream falls back to polling
+the job row and the flushed assistant message.
+
+Admission: at most FEAST_LLM_QUEUE_SIZE jobs waiting in this process (503
+beyond) and FEAST_LLM_JOBS_PER_USER active jobs per user (429 beyond).
+Jobs still queued or running after FEAST_LLM_JOB_TIMEOUT seconds (e.g. the
+worker process died) are marked failed so they stop counting; the check
+runs on submit and whenever a job is read through /api/jobs/, so clients
+waiting on a dead job see it fail.
+"""
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from . import chat
+from .models import LLMChatSession, LLMJob, LLMMessage
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class JobRejected(APIException):
+    """Admission refused; DRF renders it with the given status."""
+
+    def __init__(self, status_code, error, detail):
+        self.status_code = status_code
+        self.detail = {'error': error, 'detail': detail}
+
+
+class JobStream:
+    """Live answer text of one job, read by SSE streams in this process."""
+
+    def __init__(self):
+        self._text = ''
+        self._waiters = []
+        self._lock = threading.Lock()
+        self.finished = False
+
+    def _notify(self):
+        waiters, self._waiters = self._waiters, []
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Reader's event loop is gone
+
+    def append(self, text):
+        with self._lock:
+            self._text += text
+            self._notify()
+
+    def finish(self):
+        with self._lock:
+            self.finished = True
+            self._notify()
+
+    async def wait(self, sent, timeout):
+        """
+        Text after the first ``sent`` characters, waiting up to timeout for
+        some to arrive. Returns (text, finished).
+        """
+        event = asyncio.Event()
+        with self._lock:
+            ready = len(self._text) > sent or self.finished
+            if not ready:
+                self._waiters.append((asyncio.get_running_loop(), event))
+        if not ready:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        with self._lock:
+            return self._text[sent:], self.finished
+
+
+class LLMJobRunner:
+    """Bounded in-process worker pool for LLMJob rows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._streams = {}
+        self._waiting = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def _executor(self):
+        with self._lock:
+            # Threads do not survive a fork; start a fresh pool in the child
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(
+                    max_workers=_setting('FEAST_LLM_WORKERS', 4),
+                    thread_name_prefix='feast-llm-job'
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def reap_stale(self, **filters):
+        """
+        Fail jobs (optionally only those matching filters) that outlived
+        FEAST_LLM_JOB_TIMEOUT; returns how many.
+        """
+        cutoff = timezone.now() - timedelta(seconds=_setting('FEAST_LLM_JOB_TIMEOUT', 300))
+        stale = LLMJob.objects.filter(status__in=LLMJob.ACTIVE_STATUSES, created_at__lt=cutoff, **filters)
+        # Read first: readers call this on every poll and most find nothing to write
+        if not stale.exists():
+            return 0
+        return stale.update(status='failed', error='Job timed out or its worker stopped', finished_at=timezone.now())
+
+    def submit(self, session, message, query_type='default', use_cache=True):
+        """Save the user message and queue the turn; raises JobRejected."""
+        self.reap_stale()
+        with self._lock:
+            if self._waiting >= _setting('FEAST_LLM_QUEUE_SIZE', 100):
+                raise JobRejected(503, 'LLM queue full', 'Too many pending LLM requests. Please try again shortly.')
+
+        limit = _setting('FEAST_LLM_JOBS_PER_USER', 2)
+        with transaction.atomic():
+            # Serialize a user's submits so two requests can't both pass the count
+            User.objects.select_for_update().only('id').get(pk=session.user_id)
+            active = LLMJob.objects.filter(user_id=session.user_id, status__in=LLMJob.ACTIVE_STATUSES).count()
+            if active >= limit:
+                raise JobRejected(429, 'Too many LLM requests',
+                                  f'{active} request(s) still running; at most {limit} at a time.')
+
+            user_msg = chat.save_user_message(session, message, query_type)
+            job = LLMJob.objects.create(
+                user_id=session.user_id,
+                session=session,
+                user_message=user_msg,
+                message=message,
+                query_type=query_type,
+                use_cache=use_cache
+            )
+            with self._lock:
+                self._streams[job.id] = JobStream()
+                self._waiting += 1
+                self.submitted += 1
+            # Workers must see the committed row
+            transaction.on_commit(lambda: self._executor().submit(self._run, job.id))
+        return job
+
+    def compact_later(self, session):
+        """Run chat.compact() for the session on the pool instead of the caller's thread."""
+        # After commit, so the worker sees the turn that was just saved
+        transaction.on_commit(lambda: self._executor().submit(self._compact, session.pk))
+
+    def _compact(self, session_id):
+        close_old_connections()
+        try:
+            session = LLMChatSession.objects.filter(pk=session_id).first()
+            if session is not None:
+                chat.compact(session)
+        except Exception:
+            logger.exception(f"Compaction of session {session_id} crashed")
+        finally:
+            close_old_connections()
+
+    def stream(self, job_id):
+        """JobStream of a job queued in this process, or None."""
+        with self._lock:
+            return self._streams.get(job_id)
+
+    def _run(self, job_id):
+        with self._lock:
+            self._waiting -= 1
+            live = self._streams.get(job_id) or JobStream()
+        close_old_connections()
+        try:
+            started = LLMJob.objects.filter(pk=job_id, status='queued').update(
+                status='running', started_at=timezone.now()
+            )
+            if not started:
+                return  # Reaped while waiting
+            job = LLMJob.objects.select_related('session__repository', 'user_message').get(pk=job_id)
+            user_msg = job.user_message or LLMMessage(content=job.message)
+            try:
+                assistant_msg, events = chat.open_stream(job.session, user_msg, job.query_type, job.use_cache)
+                LLMJob.objects.filter(pk=job_id).update(assistant_message=assistant_msg)
+                result = None
+                for event in events:
+                    if 'delta' in event:
+                        live.append(event['delta'])
+                    else:
+                        result = chat.reply_summary(assistant_msg, event)
+                # A job reap_stale() already failed stays failed
+                finished = LLMJob.objects.filter(pk=job_id, status='running').update(
+                    status='succeeded', result=result, finished_at=timezone.now()
+                )
+                if finished:
+                    with self._lock:
+                        self.succeeded += 1
+                # After the job is reported done: summarizing may call the LLM again
+                chat.compact(job.session)
+            except Exception as e:
+                failed = LLMJob.objects.filter(pk=job_id, status='running').update(
+                    status='failed', error=str(e), finished_at=timezone.now()
+                )
+                if failed:
+                    with self._lock:
+                        self.failed += 1
+        except Exception:
+            logger.exception(f"LLM job {job_id} crashed")
+        finally:
+            live.finish()
+            with self._lock:
+                self._streams.pop(job_id, None)
+            close_old_connections()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': _setting('FEAST_LLM_WORKERS', 4),
+                'waiting': self._waiting,
+                'running': len(self._streams) - self._waiting,
+                'submitted': self.submitted,
+                'succeeded': self.succeeded,
+                'failed': self.failed
+            }
+
+
+runner = LLMJobRunner()
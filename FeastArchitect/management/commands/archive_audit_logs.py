@@ -0,0 +1,33 @@
+"""
+Roll up, archive and purge old AuditLog rows.
+
+    python manage.py archive_audit_logs --days 90 --batch-size 5000 --max-batches 200
+
+Safe to run from cron; each batch commits on its own, so an interrupted
+run simply continues next time.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from FeastArchitect.retention import archive_audit_logs, archive_dir
+
+
+class Command(BaseCommand):
+    help = 'Roll up AuditLog rows older than the retention window into daily summaries and archive them to gzipped JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'FEAST_AUDIT_RETENTION_DAYS', 90),
+                            help='Keep this many days of raw rows in the database')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per segment/transaction')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        result = archive_audit_logs(cutoff, batch_size=options['batch_size'], max_batches=options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result['rows']} rows older than {cutoff:%Y-%m-%d %H:%M} "
+            f"in {result['batches']} segment(s) under {archive_dir()}"
+        ))
@@ -0,0 +1,124 @@
+"""
+Merkle-style hashing of architecture_json.
+
+Each node and edge gets its own content hash; the repository hash
+(json_hash) is a root hash over those plus the small top-level metadata
+(version, exportDate, ...). Node and edge order do not affect the root.
+
+Because node hashes are stored on ArchitectureNode.content_hash, a write
+that touches a few nodes only needs to re-hash those nodes, and clients
+can compare per-node hashes to see exactly what diverged.
+
+There are no intermediate levels: the root is one hash over all node
+hashes and one over all edge hashes, so every write still combines n
+short leaf hashes (cheap next to serializing node bodies, but O(n)), and
+any edge change re-hashes every edge. Edge hashes are sorted before they
+are combined, so reordering edges (or nodes) leaves json_hash unchanged
+and is not reported as a conflict.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .architecture import iter_nodes, get_edges, edge_id
+
+
+def hash_value(value):
+    """MD5 of the canonical JSON form of a value."""
+    json_str = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.md5(json_str.encode('utf-8')).hexdigest()
+
+
+def hash_meta(architecture):
+    """Hash of everything in the document except nodes and edges."""
+    if not isinstance(architecture, dict):
+        return hash_value(architecture)
+    return hash_value({k: v for k, v in architecture.items() if k not in ('nodes', 'edges')})
+
+
+def hash_nodes(architecture, only: Optional[Set[str]] = None) -> Dict[str, str]:
+    """Per-node hashes keyed by node id, optionally limited to ``only``."""
+    hashes = {}
+    for node_id, node in iter_nodes(architecture):
+        node_id = str(node_id)
+        if only is None or node_id in only:
+            hashes[node_id] = hash_value(node)
+    return hashes
+
+
+def hash_edges(architecture) -> List[Tuple[str, str]]:
+    """(edge_id, hash) pairs aligned with the dict edges in document order."""
+    return [
+        (str(edge_id(edge)), hash_value(edge))
+        for edge in get_edges(architecture)
+        if isinstance(edge, dict)
+    ]
+
+
+def _combine(lines):
+    return hashlib.md5('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ArchitectureDigest:
+    """Per-node, per-edge and metadata hashes of one architecture document."""
+    nodes: Dict[str, str] = field(default_factory=dict)
+    edges: List[Tuple[str, str]] = field(default_factory=list)
+    meta: str = ''
+
+    @property
+    def nodes_hash(self):
+        return _combine(f'{node_id}:{h}' for node_id, h in sorted(self.nodes.items()))
+
+    @property
+    def edges_hash(self):
+        return _combine(sorted(h for _, h in self.edges))
+
+    @property
+    def root(self):
+        return _combine([self.nodes_hash, self.edges_hash, self.meta])
+
+    def edge_map(self):
+        """Edge hashes keyed by edge id (duplicate ids collapse)."""
+        return dict(self.edges)
+
+
+def compute_digest(architecture):
+    """Hash every node and edge from scratch."""
+    return ArchitectureDigest(
+        nodes=hash_nodes(architecture),
+        edges=hash_edges(architecture),
+        meta=hash_meta(architecture)
+    )
+
+
+def update_digest(architecture, previous, touched_nodes, edges_touched):
+    """
+    Re-hash only what changed.
+
+    ``previous`` is the digest before the change (usually loaded from the
+    stored content hashes), ``touched_nodes`` the node ids that may have
+    changed. Returns None if ``previous`` does not cover the untouched
+    nodes, in which case the caller should use compute_digest().
+    """
+    current_ids = {str(node_id) for node_id, _ in iter_nodes(architecture)}
+    if current_ids - touched_nodes != set(previous.nodes) - touched_nodes:
+        return None
+
+    nodes = {k: v for k, v in previous.nodes.items() if k not in touched_nodes}
+    nodes.update(hash_nodes(architecture, only=touched_nodes & current_ids))
+    return ArchitectureDigest(
+        nodes=nodes,
+        edges=hash_edges(architecture) if edges_touched else list(previous.edges),
+        meta=hash_meta(architecture)
+    )
+
+
+def diff_hashes(old: Dict[str, str], new: Dict[str, str]):
+    """Ids that were added, removed or changed between two hash maps."""
+    return {
+        'added': sorted(k for k in new if k not in old),
+        'removed': sorted(k for k in old if k not in new),
+        'changed': sorted(k for k in new if k in old and old[k] != new[k]),
+    }
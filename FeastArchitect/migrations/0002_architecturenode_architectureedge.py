@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:26
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+from ._helpers import edge_id, get_edges, iter_nodes
+
+
+def _coord(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def node_fields(node_id, node):
+    """ArchitectureNode columns as of this migration."""
+    return {
+        'node_id': str(node_id)[:255],
+        'node_type': str(node.get('type', ''))[:50],
+        'name': str(node.get('name', ''))[:255],
+        'data': node,
+        'pos_x': _coord(node.get('x')),
+        'pos_y': _coord(node.get('y')),
+    }
+
+
+def edge_fields(edge):
+    return {
+        'edge_id': str(edge_id(edge))[:255],
+        'from_node': str(edge.get('from', ''))[:255],
+        'to_node': str(edge.get('to', ''))[:255],
+        'data': edge,
+    }
+
+
+def backfill_tables(apps, schema_editor):
+    FeastRepository = apps.get_model('FeastArchitect', 'FeastRepository')
+    ArchitectureNode = apps.get_model('FeastArchitect', 'ArchitectureNode')
+    ArchitectureEdge = apps.get_model('FeastArchitect', 'ArchitectureEdge')
+
+    for repo in FeastRepository.objects.all().iterator():
+        nodes = {
+            str(node_id): ArchitectureNode(repository=repo, **node_fields(node_id, node))
+            for node_id, node in iter_nodes(repo.architecture_json)
+            if isinstance(node, dict)
+        }
+        ArchitectureNode.objects.bulk_create(nodes.values(), batch_size=500)
+        ArchitectureEdge.objects.bulk_create([
+            ArchitectureEdge(repository=repo, **edge_fields(edge))
+            for edge in get_edges(repo.architecture_json)
+            if isinstance(edge, dict)
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchitectureNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.CharField(max_length=255)),
+                ('node_type', models.CharField(help_text='datasource, entity, featureview, service', max_length=50)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('pos_x', models.FloatField(default=0)),
+                ('pos_y', models.FloatField(default=0)),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nodes', to='FeastArchitect.feastrepository')),
+            ],
+            options={
+                'ordering': ['node_id'],
+                'indexes': [models.Index(fields=['repository', 'node_type'], name='FeastArchit_reposit_ff870d_idx'), models.Index(fields=['node_type', 'name'], name='FeastArchit_node_ty_4384b8_idx')],
+                'unique_together': {('repository', 'node_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchitectureEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('edge_id', models.CharField(max_length=255)),
+                ('from_node', models.CharField(max_length=255)),
+                ('to_node', models.CharField(max_length=255)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='edges', to='FeastArchitect.feastrepository')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['repository', 'from_node', 'to_node'], name='FeastArchit_reposit_445eb1_idx'), models.Index(fields=['repository', 'to_node'], name='FeastArchit_reposit_213c44_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_tables, migrations.RunPython.noop),
+    ]
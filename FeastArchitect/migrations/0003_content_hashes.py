@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:29
+
+from django.db import migrations, models
+
+from ._helpers import edge_hashes, hash_meta, hash_value, node_hashes, root_hash
+
+
+def compute_hashes(apps, schema_editor):
+    FeastRepository = apps.get_model('FeastArchitect', 'FeastRepository')
+    ArchitectureNode = apps.get_model('FeastArchitect', 'ArchitectureNode')
+    ArchitectureEdge = apps.get_model('FeastArchitect', 'ArchitectureEdge')
+
+    for repo in FeastRepository.objects.all().iterator():
+        arch = repo.architecture_json
+        repo.json_hash = root_hash(node_hashes(arch), edge_hashes(arch), hash_meta(arch))
+        repo.save(update_fields=['json_hash'])
+
+    for model in (ArchitectureNode, ArchitectureEdge):
+        rows = list(model.objects.only('id', 'data'))
+        for row in rows:
+            row.content_hash = hash_value(row.data)
+        model.objects.bulk_update(rows, ['content_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0002_architecturenode_architectureedge'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='architectureedge',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='MD5 of the edge body', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='architecturenode',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='MD5 of the node body', max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='feastrepository',
+            name='json_hash',
+            field=models.CharField(blank=True, help_text='Merkle root hash of last saved JSON', max_length=64),
+        ),
+        migrations.RunPython(compute_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:36
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0003_content_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepositoryChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=50)),
+                ('json_hash', models.CharField(blank=True, max_length=64)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='FeastArchitect.feastrepository')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:40
+
+from collections import Counter
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+from ._helpers import edge_hashes, get_edges, get_nodes, hash_meta, iter_nodes, node_hashes, root_hash
+
+
+def snapshot_payload(arch):
+    """Column values and blob bodies of a first (snapshot) revision, as revisions.py did here."""
+    nodes = node_hashes(arch)
+    edges = edge_hashes(arch)
+    meta = hash_meta(arch)
+    edges_added = Counter(h for _, h in edges)
+
+    bodies = {}
+    for node_id, node in iter_nodes(arch):
+        bodies[nodes[str(node_id)]] = node
+    edge_bodies = [edge for edge in get_edges(arch) if isinstance(edge, dict)]
+    for edge, (_, h) in zip(edge_bodies, edges):
+        bodies[h] = edge
+    bodies[meta] = {k: v for k, v in arch.items() if k not in ('nodes', 'edges')}
+
+    fields = {
+        'root_hash': root_hash(nodes, edges, meta),
+        'is_snapshot': True,
+        'layout': 'dict' if isinstance(get_nodes(arch), dict) else 'pairs',
+        'meta_hash': meta,
+        'node_changes': dict(nodes),
+        'edge_changes': {'added': sorted(edges_added.elements()), 'removed': []},
+        'node_count': len(nodes),
+        'edge_count': sum(edges_added.values()),
+        'nodes_changed': len(nodes),
+        'edges_changed': sum(edges_added.values()),
+    }
+    return fields, bodies
+
+
+def store_blobs(bodies, blob_model):
+    hashes = list(bodies)
+    existing = set()
+    for i in range(0, len(hashes), 500):
+        existing.update(blob_model.objects.filter(hash__in=hashes[i:i + 500]).values_list('hash', flat=True))
+    blob_model.objects.bulk_create(
+        [blob_model(hash=h, body=body) for h, body in bodies.items() if h not in existing],
+        batch_size=500,
+        ignore_conflicts=True
+    )
+
+
+def initial_revisions(apps, schema_editor):
+    FeastRepository = apps.get_model('FeastArchitect', 'FeastRepository')
+    ArchitectureBlob = apps.get_model('FeastArchitect', 'ArchitectureBlob')
+    ArchitectureRevision = apps.get_model('FeastArchitect', 'ArchitectureRevision')
+
+    for repo in FeastRepository.objects.all().iterator():
+        arch = repo.architecture_json if isinstance(repo.architecture_json, dict) else {}
+        fields, bodies = snapshot_payload(arch)
+        store_blobs(bodies, blob_model=ArchitectureBlob)
+        ArchitectureRevision.objects.create(
+            repository=repo, number=1, base_number=1, action='INITIAL',
+            message='History starts here', user=repo.created_by, **fields
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('FeastArchitect', '0004_repositorychange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchitectureBlob',
+            fields=[
+                ('hash', models.CharField(help_text='MD5 of the canonical JSON body', max_length=32, primary_key=True, serialize=False)),
+                ('body', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchitectureRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('root_hash', models.CharField(help_text='json_hash of this revision', max_length=64)),
+                ('action', models.CharField(max_length=50)),
+                ('message', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('base_number', models.PositiveIntegerField(help_text='Number of the snapshot this delta chain starts at')),
+                ('layout', models.CharField(default='pairs', help_text='pairs or dict node layout', max_length=10)),
+                ('meta_hash', models.CharField(max_length=32)),
+                ('node_changes', models.JSONField(default=dict, help_text='node_id -> blob hash (null when removed)')),
+                ('edge_changes', models.JSONField(default=dict, help_text='Edge blob hashes added/removed')),
+                ('node_count', models.IntegerField(default=0)),
+                ('edge_count', models.IntegerField(default=0)),
+                ('nodes_changed', models.IntegerField(default=0)),
+                ('edges_changed', models.IntegerField(default=0)),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='FeastArchitect.feastrepository')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-number'],
+                'unique_together': {('repository', 'number')},
+            },
+        ),
+        migrations.RunPython(initial_revisions, migrations.RunPython.noop),
+    ]
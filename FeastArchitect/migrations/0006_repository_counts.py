@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:42
+
+from django.db import migrations, models
+
+from ._helpers import get_edges, iter_nodes
+
+
+COUNTED_NODE_TYPES = ('datasource', 'entity', 'featureview', 'service')
+
+
+def architecture_counts(architecture):
+    """Node, edge and per-type counts, as architecture.py computed them here."""
+    counts = {f'{node_type}_count': 0 for node_type in COUNTED_NODE_TYPES}
+    node_count = 0
+    for _, node in iter_nodes(architecture):
+        node_count += 1
+        node_type = node.get('type') if isinstance(node, dict) else None
+        if node_type in COUNTED_NODE_TYPES:
+            counts[f'{node_type}_count'] += 1
+    counts['node_count'] = node_count
+    counts['edge_count'] = len(get_edges(architecture))
+    return counts
+
+
+def backfill_counts(apps, schema_editor):
+    FeastRepository = apps.get_model('FeastArchitect', 'FeastRepository')
+    repos = list(FeastRepository.objects.all())
+    for repo in repos:
+        for field, value in architecture_counts(repo.architecture_json).items():
+            setattr(repo, field, value)
+    FeastRepository.objects.bulk_update(repos, [
+        'node_count', 'edge_count', 'datasource_count',
+        'entity_count', 'featureview_count', 'service_count'
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0005_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feastrepository',
+            name='datasource_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='feastrepository',
+            name='edge_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='feastrepository',
+            name='entity_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='feastrepository',
+            name='featureview_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='feastrepository',
+            name='node_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='feastrepository',
+            name='service_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0006_repository_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='auditlog_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='llmchatsession',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='chat_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('FeastArchitect', '0008_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(help_text='Relative to FEAST_AUDIT_ARCHIVE_DIR', max_length=500, unique=True)),
+                ('start_at', models.DateTimeField(help_text='Earliest row timestamp in the segment')),
+                ('end_at', models.DateTimeField(help_text='Latest row timestamp in the segment')),
+                ('first_id', models.BigIntegerField()),
+                ('last_id', models.BigIntegerField()),
+                ('row_count', models.IntegerField()),
+                ('size_bytes', models.BigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['start_at'],
+                'indexes': [models.Index(fields=['start_at', 'end_at'], name='FeastArchit_start_a_144bc8_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuditLogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('action', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('resource_types', models.JSONField(default=dict, help_text='resource_type -> count')),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day', 'action'],
+                'indexes': [models.Index(fields=['user', '-day'], name='auditrollup_user_day_idx')],
+                'unique_together': {('day', 'user', 'action')},
+            },
+        ),
+    ]
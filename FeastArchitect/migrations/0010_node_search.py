@@ -0,0 +1,128 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:55
+
+from django.db import migrations, models
+
+
+NODE_TABLE = 'FeastArchitect_architecturenode'
+FTS_TABLE = 'FeastArchitect_architecturenode_fts'
+
+SQLITE_CREATE = [
+    f'''CREATE VIRTUAL TABLE "{FTS_TABLE}" USING fts5(
+        name, search_text, content='{NODE_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )''',
+    f'''CREATE TRIGGER "{FTS_TABLE}_ai" AFTER INSERT ON "{NODE_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"(rowid, name, search_text) VALUES (new.id, new.name, new.search_text);
+    END''',
+    f'''CREATE TRIGGER "{FTS_TABLE}_ad" AFTER DELETE ON "{NODE_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, name, search_text)
+        VALUES ('delete', old.id, old.name, old.search_text);
+    END''',
+    f'''CREATE TRIGGER "{FTS_TABLE}_au" AFTER UPDATE OF name, search_text ON "{NODE_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, name, search_text)
+        VALUES ('delete', old.id, old.name, old.search_text);
+        INSERT INTO "{FTS_TABLE}"(rowid, name, search_text) VALUES (new.id, new.name, new.search_text);
+    END''',
+    f'''INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}") VALUES ('rebuild')''',
+]
+
+SQLITE_DROP = [
+    f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_ai"',
+    f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_ad"',
+    f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_au"',
+    f'DROP TABLE IF EXISTS "{FTS_TABLE}"',
+]
+
+POSTGRES_CREATE = [
+    f'''ALTER TABLE "{NODE_TABLE}" ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(search_text, '')), 'B')
+    ) STORED''',
+    f'CREATE INDEX "architecturenode_search_gin" ON "{NODE_TABLE}" USING GIN (search_vector)',
+]
+
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS "architecturenode_search_gin"',
+    f'ALTER TABLE "{NODE_TABLE}" DROP COLUMN IF EXISTS search_vector',
+]
+
+
+# search.py's node text as of this migration; later changes must not alter the backfill
+_TEXT_KEYS = ('description', 'kind', 'subtype', 'joinKey', 'ownedBy', 'sparkPattern', 'accessProcess')
+
+
+def _strings(value, out):
+    if isinstance(value, str):
+        if value:
+            out.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _strings(item, out)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _strings(item, out)
+
+
+def node_search_text(node):
+    parts = []
+    for key in _TEXT_KEYS:
+        _strings(node.get(key), parts)
+    _strings(node.get('tags'), parts)
+    for feature in node.get('features') or []:
+        if isinstance(feature, dict):
+            _strings([feature.get('name'), feature.get('type'), feature.get('description')], parts)
+        else:
+            _strings(feature, parts)
+    _strings(node.get('columnSecurity'), parts)
+    _strings(node.get('details'), parts)
+    return '\n'.join(parts)
+
+
+def backfill_search_text(apps, schema_editor):
+    ArchitectureNode = apps.get_model('FeastArchitect', 'ArchitectureNode')
+    nodes = list(ArchitectureNode.objects.only('id', 'data'))
+    for node in nodes:
+        node.search_text = node_search_text(node.data if isinstance(node.data, dict) else {})
+    ArchitectureNode.objects.bulk_update(nodes, ['search_text'], batch_size=500)
+
+
+def _fts5_supported(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and _fts5_supported(connection):
+        statements = SQLITE_CREATE
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_CREATE
+    else:
+        return  # search.py falls back to LIKE
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0009_audit_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='architecturenode',
+            name='search_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
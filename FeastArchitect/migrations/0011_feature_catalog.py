@@ -0,0 +1,138 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:57
+
+import re
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+from ._helpers import iter_nodes
+
+
+# architecture.parse_ttl and feature_catalog.catalog_rows as of this migration
+
+_TTL_UNITS = {
+    's': 1, 'sec': 1, 'second': 1,
+    'm': 60, 'min': 60, 'minute': 60,
+    'h': 3600, 'hr': 3600, 'hour': 3600,
+    'd': 86400, 'day': 86400,
+    'w': 604800, 'week': 604800,
+}
+_TTL_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([a-z]*?)s?\s*$')
+
+
+def parse_ttl(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value >= 0 else None
+    if not isinstance(value, str):
+        return None
+    match = _TTL_RE.match(value.lower())
+    if not match:
+        return None
+    amount, unit = match.groups()
+    multiplier = _TTL_UNITS.get(unit or 's')
+    if multiplier is None:
+        return None
+    return int(float(amount) * multiplier)
+
+
+def _is_ref(value):
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def _list(node, key):
+    value = node.get(key)
+    return value if isinstance(value, list) else []
+
+
+def catalog_rows(architecture):
+    """{(feature_view_id, feature): column values} for a document."""
+    nodes = {
+        node_id: node for node_id, node in iter_nodes(architecture)
+        if _is_ref(node_id) and isinstance(node, dict)
+    }
+    views = {node_id: node for node_id, node in nodes.items() if node.get('type') == 'featureview'}
+    views_by_name = {node.get('name'): node_id for node_id, node in views.items() if isinstance(node.get('name'), str)}
+
+    consumers = {}
+    for node in nodes.values():
+        if node.get('type') != 'service':
+            continue
+        service_name = node.get('name') if isinstance(node.get('name'), str) else ''
+        for ref in _list(node, 'features'):
+            if not isinstance(ref, str):
+                continue
+            if ref in views:
+                consumers.setdefault((ref, None), set()).add(service_name)
+            elif ':' in ref:
+                view_ref, _, feature_name = ref.partition(':')
+                view_id = view_ref if view_ref in views else views_by_name.get(view_ref)
+                if view_id:
+                    consumers.setdefault((view_id, feature_name), set()).add(service_name)
+
+    rows = {}
+    for view_id, view in views.items():
+        join_keys = [
+            nodes[entity_id].get('joinKey')
+            for entity_id in _list(view, 'entities')
+            if _is_ref(entity_id) and entity_id in nodes and nodes[entity_id].get('joinKey')
+        ]
+        details = view.get('details')
+        ttl = parse_ttl(details.get('ttl') if isinstance(details, dict) else None)
+        whole_view = consumers.get((view_id, None), set())
+        for feature in _list(view, 'features'):
+            if not isinstance(feature, dict) or not feature.get('name'):
+                continue
+            name = str(feature['name'])[:255]
+            rows[(str(view_id)[:255], name)] = {
+                'feature_view': str(view.get('name') or view_id)[:255],
+                'feature_key': name.lower(),
+                'dtype': str(feature.get('type') or '')[:50],
+                'join_keys': join_keys,
+                'ttl_seconds': ttl,
+                'services': sorted(whole_view | consumers.get((view_id, name), set())),
+            }
+    return rows
+
+
+def backfill_catalog(apps, schema_editor):
+    FeastRepository = apps.get_model('FeastArchitect', 'FeastRepository')
+    FeatureCatalogEntry = apps.get_model('FeastArchitect', 'FeatureCatalogEntry')
+    for repo in FeastRepository.objects.all().iterator():
+        FeatureCatalogEntry.objects.bulk_create([
+            FeatureCatalogEntry(repository=repo, feature_view_id=view_id, feature=feature, **values)
+            for (view_id, feature), values in catalog_rows(repo.architecture_json).items()
+        ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0010_node_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeatureCatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature_view_id', models.CharField(help_text='Feature view node id', max_length=255)),
+                ('feature_view', models.CharField(max_length=255)),
+                ('feature', models.CharField(max_length=255)),
+                ('feature_key', models.CharField(max_length=255)),
+                ('dtype', models.CharField(blank=True, max_length=50)),
+                ('join_keys', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('ttl_seconds', models.IntegerField(blank=True, null=True)),
+                ('services', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Names of services reading this feature')),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feature_entries', to='FeastArchitect.feastrepository')),
+            ],
+            options={
+                'ordering': ['feature_key', 'id'],
+                'indexes': [models.Index(fields=['feature_key', 'id'], name='featurecatalog_key_idx')],
+                'unique_together': {('repository', 'feature_view_id', 'feature')},
+            },
+        ),
+        migrations.RunPython(backfill_catalog, migrations.RunPython.noop),
+    ]
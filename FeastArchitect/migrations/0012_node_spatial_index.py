@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0011_feature_catalog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='architecturenode',
+            index=models.Index(fields=['repository', 'pos_x', 'pos_y', 'node_type'], name='archnode_spatial_idx'),
+        ),
+    ]
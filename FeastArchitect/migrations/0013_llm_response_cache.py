@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0012_node_spatial_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCachedResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of model, query type, message and context', max_length=64, unique=True)),
+                ('model', models.CharField(max_length=100)),
+                ('query_type', models.CharField(blank=True, max_length=50)),
+                ('response', models.TextField()),
+                ('usage', models.JSONField(default=dict, help_text='Token usage of the original call')),
+                ('hits', models.IntegerField(default=0, help_text='Reads served from this row (memory-tier hits are not counted)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:09
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('FeastArchitect', '0013_llm_response_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('message', models.TextField()),
+                ('query_type', models.CharField(default='default', max_length=50)),
+                ('use_cache', models.BooleanField(default=True)),
+                ('result', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='usage, model, cached')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('assistant_message', models.ForeignKey(blank=True, help_text='Answer being written; content is partial while running', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='FeastArchitect.llmmessage')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='FeastArchitect.llmchatsession')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='llm_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', 'status'], name='llmjob_user_status_idx'), models.Index(fields=['user', '-created_at', '-id'], name='llmjob_user_created_idx'), models.Index(fields=['status', 'created_at'], name='llmjob_status_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0014_llm_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmchatsession',
+            name='summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='llmchatsession',
+            name='summary_through',
+            field=models.BigIntegerField(blank=True, help_text='Last message id covered by the summary', null=True),
+        ),
+        migrations.AddField(
+            model_name='llmchatsession',
+            name='summary_tokens',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='llmjob',
+            name='user_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='FeastArchitect.llmmessage'),
+        ),
+        migrations.AddIndex(
+            model_name='llmmessage',
+            index=models.Index(fields=['session', 'id'], name='llmmessage_session_id_idx'),
+        ),
+    ]
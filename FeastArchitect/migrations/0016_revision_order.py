@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0015_context_window'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='architecturerevision',
+            name='order',
+            field=models.JSONField(blank=True, help_text='Key, node and edge order when not implied by the parent', null=True),
+        ),
+    ]
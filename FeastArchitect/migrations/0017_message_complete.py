@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FeastArchitect', '0016_revision_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmmessage',
+            name='is_complete',
+            field=models.BooleanField(default=True, help_text='False while the answer is still being streamed'),
+        ),
+    ]
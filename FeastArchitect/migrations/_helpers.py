@@ -0,0 +1,78 @@
+"""
+Frozen helpers for data migrations.
+
+Migrations must keep doing what they did when they shipped, so they never
+import live app modules (architecture.py, structure.py, ...), which change
+and pull in models, signals and caches. The functions here are copies as
+of the migration that first used them. Don't edit them: when a later
+migration needs different behaviour, add a new function (or keep it in
+that migration file). Django skips modules starting with "_" when it
+loads migrations.
+"""
+import hashlib
+import json
+
+
+def get_nodes(architecture):
+    """Raw nodes container: the UI's list of [id, node] pairs, or a dict."""
+    if not isinstance(architecture, dict):
+        return {}
+    return architecture.get('nodes') or {}
+
+
+def get_edges(architecture):
+    if not isinstance(architecture, dict):
+        return []
+    return architecture.get('edges') or []
+
+
+def iter_nodes(architecture):
+    """Yield (node_id, node) for either node layout."""
+    nodes = get_nodes(architecture)
+    if isinstance(nodes, dict):
+        for node_id, node in nodes.items():
+            yield node_id, node
+        return
+    for entry in nodes:
+        if isinstance(entry, (list, tuple)) and len(entry) == 2:
+            yield entry[0], entry[1]
+        elif isinstance(entry, dict) and 'id' in entry:
+            yield entry['id'], entry
+
+
+def edge_id(edge):
+    return edge.get('id') or f"{edge.get('from')}->{edge.get('to')}"
+
+
+# Content hashing as of 0003_content_hashes (merkle.py)
+
+def hash_value(value):
+    """MD5 of the canonical JSON form of a value."""
+    json_str = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.md5(json_str.encode('utf-8')).hexdigest()
+
+
+def _combine(lines):
+    return hashlib.md5('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+def hash_meta(architecture):
+    if not isinstance(architecture, dict):
+        return hash_value(architecture)
+    return hash_value({k: v for k, v in architecture.items() if k not in ('nodes', 'edges')})
+
+
+def node_hashes(architecture):
+    return {str(node_id): hash_value(node) for node_id, node in iter_nodes(architecture)}
+
+
+def edge_hashes(architecture):
+    """(edge_id, hash) pairs in document order."""
+    return [(str(edge_id(edge)), hash_value(edge)) for edge in get_edges(architecture) if isinstance(edge, dict)]
+
+
+def root_hash(nodes, edges, meta):
+    """json_hash from node_hashes(), edge_hashes() and hash_meta()."""
+    nodes_hash = _combine(f'{node_id}:{h}' for node_id, h in sorted(nodes.items()))
+    edges_hash = _combine(sorted(h for _, h in edges))
+    return _combine([nodes_hash, edges_hash, meta])
@@ -4,8 +4,11 @@ Feast Architect - Simplified Django Models
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 import json
 
+from .architecture import architecture_counts
+
 
 class FeastRepository(models.Model):
     """Main repository container for Feast architecture."""
@@ -26,7 +29,15 @@ class FeastRepository(models.Model):
     
     # Sync tracking
     last_synced_at = models.DateTimeField(null=True, blank=True)
-    json_hash = models.CharField(max_length=64, blank=True, help_text="MD5 hash of last saved JSON")
+    json_hash = models.CharField(max_length=64, blank=True, help_text="Merkle root hash of last saved JSON")
+    
+    # Denormalized from architecture_json on save, so lists never load the blob
+    node_count = models.IntegerField(default=0, db_index=True)
+    edge_count = models.IntegerField(default=0, db_index=True)
+    datasource_count = models.IntegerField(default=0, db_index=True)
+    entity_count = models.IntegerField(default=0, db_index=True)
+    featureview_count = models.IntegerField(default=0, db_index=True)
+    service_count = models.IntegerField(default=0, db_index=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -40,17 +51,42 @@ class FeastRepository(models.Model):
     class Meta:
         ordering = ['-updated_at']
 
+    COUNT_FIELDS = [
+        'node_count', 'edge_count', 'datasource_count',
+        'entity_count', 'featureview_count', 'service_count'
+    ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Refresh the count columns whenever architecture_json is written."""
+        update_fields = kwargs.get('update_fields')
+        writes_architecture = update_fields is None or 'architecture_json' in update_fields
+        if writes_architecture and 'architecture_json' not in self.get_deferred_fields():
+            for field, value in architecture_counts(self.architecture_json).items():
+                setattr(self, field, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.COUNT_FIELDS)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def touch(cls, pk):
+        """
+        Bump updated_at after a write to rows the detail view nests (data
+        sources, entities), so its ETag and Last-Modified change too.
+        """
+        repo = cls.objects.only('id', 'created_by_id', 'updated_at').filter(pk=pk).first()
+        if repo is not None:
+            repo.save(update_fields=['updated_at'])
+
     def get_node_count(self):
-        """Count nodes from stored JSON."""
-        nodes = self.architecture_json.get('nodes', {})
-        return len(nodes) if isinstance(nodes, dict) else len(nodes)
+        """Node count (stored column, kept in sync by save())."""
+        return self.node_count
 
     def get_edge_count(self):
-        """Count edges from stored JSON."""
-        return len(self.architecture_json.get('edges', []))
+        """Edge count (stored column, kept in sync by save())."""
+        return self.edge_count
 
 
 class DataSource(models.Model):
@@ -219,9 +255,164 @@ class Entity(models.Model):
         return f"{self.name} (join: {self.join_key})"
 
 
+class ArchitectureNode(models.Model):
+    """Node row derived from architecture_json, for indexed queries."""
+    repository = models.ForeignKey(
+        FeastRepository,
+        on_delete=models.CASCADE,
+        related_name='nodes'
+    )
+    node_id = models.CharField(max_length=255)
+    node_type = models.CharField(max_length=50, help_text="datasource, entity, featureview, service")
+    name = models.CharField(max_length=255, blank=True)
+    
+    # Full node body as stored in architecture_json
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    
+    pos_x = models.FloatField(default=0)
+    pos_y = models.FloatField(default=0)
+    
+    content_hash = models.CharField(max_length=32, blank=True, help_text="MD5 of the node body")
+    
+    # Body text for full-text search (see search.py); name is indexed separately
+    search_text = models.TextField(blank=True, default='')
+
+    class Meta:
+        unique_together = ['repository', 'node_id']
+        ordering = ['node_id']
+        indexes = [
+            models.Index(fields=['repository', 'node_type']),
+            models.Index(fields=['node_type', 'name']),
+            # Viewport (bounding box) and grid cluster queries, see spatial.py
+            models.Index(fields=['repository', 'pos_x', 'pos_y', 'node_type'], name='archnode_spatial_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.node_id} ({self.node_type})"
+
+
+class ArchitectureEdge(models.Model):
+    """Edge row derived from architecture_json, for indexed queries."""
+    repository = models.ForeignKey(
+        FeastRepository,
+        on_delete=models.CASCADE,
+        related_name='edges'
+    )
+    edge_id = models.CharField(max_length=255)
+    from_node = models.CharField(max_length=255)
+    to_node = models.CharField(max_length=255)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    content_hash = models.CharField(max_length=32, blank=True, help_text="MD5 of the edge body")
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['repository', 'from_node', 'to_node']),
+            models.Index(fields=['repository', 'to_node']),
+        ]
+
+    def __str__(self):
+        return f"{self.from_node} -> {self.to_node}"
+
+
+class FeatureCatalogEntry(models.Model):
+    """One feature of one feature view, derived from architecture_json for cross-repo lookups."""
+    repository = models.ForeignKey(
+        FeastRepository,
+        on_delete=models.CASCADE,
+        related_name='feature_entries'
+    )
+    feature_view_id = models.CharField(max_length=255, help_text="Feature view node id")
+    feature_view = models.CharField(max_length=255)
+    feature = models.CharField(max_length=255)
+    # Lowercased feature name; exact and prefix lookups are range scans on it
+    feature_key = models.CharField(max_length=255)
+    dtype = models.CharField(max_length=50, blank=True)
+    join_keys = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    ttl_seconds = models.IntegerField(null=True, blank=True)
+    services = models.JSONField(default=list, encoder=DjangoJSONEncoder, help_text="Names of services reading this feature")
+
+    class Meta:
+        unique_together = ['repository', 'feature_view_id', 'feature']
+        ordering = ['feature_key', 'id']
+        indexes = [
+            models.Index(fields=['feature_key', 'id'], name='featurecatalog_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.feature_view}:{self.feature}"
+
+
+class RepositoryChange(models.Model):
+    """Change feed entry, used to fan events out across worker processes."""
+    repository = models.ForeignKey(
+        FeastRepository,
+        on_delete=models.CASCADE,
+        related_name='changes'
+    )
+    action = models.CharField(max_length=50)
+    json_hash = models.CharField(max_length=64, blank=True)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.repository_id}: {self.action} {self.json_hash}"
+
+
+class ArchitectureBlob(models.Model):
+    """Immutable node/edge/metadata body, stored once per content hash."""
+    hash = models.CharField(max_length=32, primary_key=True, help_text="MD5 of the canonical JSON body")
+    body = models.JSONField(encoder=DjangoJSONEncoder)
+
+    def __str__(self):
+        return self.hash
+
+
+class ArchitectureRevision(models.Model):
+    """
+    One saved state of a repository's architecture_json.
+    Stores only what changed against the previous revision; every few
+    revisions is a full snapshot (see revisions.py).
+    """
+    repository = models.ForeignKey(
+        FeastRepository,
+        on_delete=models.CASCADE,
+        related_name='revisions'
+    )
+    number = models.PositiveIntegerField()
+    root_hash = models.CharField(max_length=64, help_text="json_hash of this revision")
+    action = models.CharField(max_length=50)  # CREATE, UPDATE, PATCH, FORCE_UPDATE, SYNC, IMPORT, RESTORE
+    message = models.CharField(max_length=255, blank=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    is_snapshot = models.BooleanField(default=False)
+    base_number = models.PositiveIntegerField(help_text="Number of the snapshot this delta chain starts at")
+    layout = models.CharField(max_length=10, default='pairs', help_text="pairs or dict node layout")
+    meta_hash = models.CharField(max_length=32)
+    node_changes = models.JSONField(default=dict, help_text="node_id -> blob hash (null when removed)")
+    edge_changes = models.JSONField(default=dict, help_text="Edge blob hashes added/removed")
+    order = models.JSONField(null=True, blank=True, help_text="Key, node and edge order when not implied by the parent")
+    node_count = models.IntegerField(default=0)
+    edge_count = models.IntegerField(default=0)
+    nodes_changed = models.IntegerField(default=0)
+    edges_changed = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-number']
+        unique_together = ['repository', 'number']
+
+    def __str__(self):
+        return f"{self.repository_id}@{self.number} ({self.action})"
+
+
 class AuditLog(models.Model):
     """Audit trail for all changes."""
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the batched writer inserts it
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     action = models.CharField(max_length=50)  # CREATE, UPDATE, DELETE, EXPORT, IMPORT
     resource_type = models.CharField(max_length=50)  # repository, datasource, entity, etc.
@@ -231,11 +422,57 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', '-timestamp', '-id'], name='auditlog_user_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.timestamp}: {self.user} {self.action} {self.resource_type}"
 
 
+class AuditLogRollup(models.Model):
+    """Per-day, per-user, per-action count of archived AuditLog rows."""
+    day = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    action = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    resource_types = models.JSONField(default=dict, help_text="resource_type -> count")
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-day', 'action']
+        unique_together = ['day', 'user', 'action']
+        indexes = [
+            models.Index(fields=['user', '-day'], name='auditrollup_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.user} {self.action} x{self.count}"
+
+
+class AuditArchiveSegment(models.Model):
+    """Gzipped JSONL file holding raw AuditLog rows moved out of the database."""
+    path = models.CharField(max_length=500, unique=True, help_text="Relative to FEAST_AUDIT_ARCHIVE_DIR")
+    start_at = models.DateTimeField(help_text="Earliest row timestamp in the segment")
+    end_at = models.DateTimeField(help_text="Latest row timestamp in the segment")
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    row_count = models.IntegerField()
+    size_bytes = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['start_at']
+        indexes = [
+            models.Index(fields=['start_at', 'end_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.path} ({self.row_count} rows)"
+
+
 class LLMChatSession(models.Model):
     """Chat session for LLM conversations."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='llm_sessions')
@@ -253,11 +490,20 @@ class LLMChatSession(models.Model):
         encoder=DjangoJSONEncoder
     )
     is_active = models.BooleanField(default=True)
+    
+    # Rolling summary of turns that no longer fit the context window (see context_window.py)
+    summary = models.TextField(blank=True)
+    summary_through = models.BigIntegerField(null=True, blank=True, help_text="Last message id covered by the summary")
+    summary_tokens = models.IntegerField(default=0)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-updated_at', '-id'], name='chat_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
@@ -280,6 +526,7 @@ class LLMMessage(models.Model):
     ])
     content = models.TextField()
     query_type = models.CharField(max_length=50, blank=True, help_text="generate_code, optimize, etc.")
+    is_complete = models.BooleanField(default=True, help_text="False while the answer is still being streamed")
     
     # Token usage from Groq API
     prompt_tokens = models.IntegerField(default=0)
@@ -293,6 +540,77 @@ class LLMMessage(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Context window: turns after a given message id
+            models.Index(fields=['session', 'id'], name='llmmessage_session_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
+
+
+class LLMCachedResponse(models.Model):
+    """Stored LLM answer, shared across processes (see llm_cache.py)."""
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of model, query type, message and context")
+    model = models.CharField(max_length=100)
+    query_type = models.CharField(max_length=50, blank=True)
+    response = models.TextField()
+    usage = models.JSONField(default=dict, help_text="Token usage of the original call")
+    hits = models.IntegerField(default=0, help_text="Reads served from this row (memory-tier hits are not counted)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.query_type} {self.key[:12]} (x{self.hits})"
+
+
+class LLMJob(models.Model):
+    """Chat turn run in the background (see llm_jobs.py)."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='llm_jobs')
+    session = models.ForeignKey(LLMChatSession, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    message = models.TextField()
+    query_type = models.CharField(max_length=50, default='default')
+    use_cache = models.BooleanField(default=True)
+    user_message = models.ForeignKey(
+        LLMMessage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    assistant_message = models.ForeignKey(
+        LLMMessage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Answer being written; content is partial while running"
+    )
+    result = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, help_text="usage, model, cached")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', 'status'], name='llmjob_user_status_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='llmjob_user_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='llmjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status})"
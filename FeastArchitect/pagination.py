@@ -0,0 +1,44 @@
+"""
+Keyset (cursor) pagination for the growing list endpoints.
+
+Each page is a range scan from the previous page's last ordering value,
+so page 10,000 costs the same as page 1, unlike LIMIT/OFFSET. The
+orderings match composite indexes on the models (see Meta.indexes).
+
+The page size is ``?limit=`` (the UI sends ``/api/audit-logs/?limit=10``);
+responses are ``{"next": url, "previous": url, "results": [...]}``.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class FeastCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+
+class AuditLogPagination(FeastCursorPagination):
+    # (user, -timestamp, -id) index
+    ordering = ('-timestamp', '-id')
+
+
+class NamePagination(FeastCursorPagination):
+    # (repository, name) unique index on DataSource/Entity
+    ordering = ('name', 'id')
+    page_size = 100
+
+
+class ChatSessionPagination(FeastCursorPagination):
+    # (user, -updated_at, -id) index
+    ordering = ('-updated_at', '-id')
+
+
+class FeatureCatalogPagination(FeastCursorPagination):
+    # (feature_key, id) index
+    ordering = ('feature_key', 'id')
+    page_size = 100
+
+
+class LLMJobPagination(FeastCursorPagination):
+    # (user, -created_at, -id) index
+    ordering = ('-created_at', '-id')
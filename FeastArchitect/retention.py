@@ -0,0 +1,173 @@
+"""
+AuditLog retention: rollup, cold archive and bounded purge.
+
+archive_audit_logs() moves rows older than a cutoff out of the database
+in batches of ``batch_size`` (oldest ids first). For each batch it:
+
+1. writes the raw rows to a gzipped JSONL segment under
+   FEAST_AUDIT_ARCHIVE_DIR (temp file + fsync + rename),
+2. in one transaction, adds the rows to AuditLogRollup (per local day,
+   user and action), records an AuditArchiveSegment and deletes the rows.
+
+A crash between 1 and 2 leaves an unreferenced file that the next run
+overwrites (segment names are derived from the batch's first id). Each
+batch is a short transaction, and ``max_batches`` bounds one run, so
+purging never holds long locks on the table.
+
+iter_archived() reads segments back for a time range; only segments
+whose [start_at, end_at] overlaps the range are opened.
+"""
+import gzip
+import hashlib
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog, AuditLogRollup, AuditArchiveSegment
+
+
+def archive_dir():
+    return Path(getattr(settings, 'FEAST_AUDIT_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'audit_archive'))
+
+
+def _row(entry):
+    return {
+        'id': entry.id,
+        'timestamp': entry.timestamp,
+        'user_id': entry.user_id,
+        'username': entry.user.username if entry.user else None,
+        'action': entry.action,
+        'resource_type': entry.resource_type,
+        'resource_name': entry.resource_name,
+        'details': entry.details,
+        'ip_address': entry.ip_address,
+    }
+
+
+def _write_segment(batch):
+    """Write one gzipped JSONL segment; returns (relative path, size, sha256)."""
+    first = batch[0]
+    relative = Path(timezone.localdate(first.timestamp).strftime('%Y/%m')) / f'audit-{first.id:012d}.jsonl.gz'
+    target = archive_dir() / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix('.tmp')
+
+    with open(tmp, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz:
+            for entry in batch:
+                line = json.dumps(_row(entry), cls=DjangoJSONEncoder, separators=(',', ':'))
+                gz.write(line.encode('utf-8') + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, target)
+
+    digest = hashlib.sha256()
+    with open(target, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return str(relative), target.stat().st_size, digest.hexdigest()
+
+
+def _rollup(batch):
+    """Fold a batch into AuditLogRollup rows (create or increment)."""
+    groups = defaultdict(lambda: {'count': 0, 'resource_types': defaultdict(int), 'first_at': None, 'last_at': None})
+    for entry in batch:
+        group = groups[(timezone.localdate(entry.timestamp), entry.user_id, entry.action)]
+        group['count'] += 1
+        group['resource_types'][entry.resource_type] += 1
+        if group['first_at'] is None or entry.timestamp < group['first_at']:
+            group['first_at'] = entry.timestamp
+        if group['last_at'] is None or entry.timestamp > group['last_at']:
+            group['last_at'] = entry.timestamp
+
+    days = {day for day, _, _ in groups}
+    existing = {
+        (rollup.day, rollup.user_id, rollup.action): rollup
+        for rollup in AuditLogRollup.objects.select_for_update().filter(day__in=days)
+    }
+    to_create, to_update = [], []
+    for (day, user_id, action), group in groups.items():
+        rollup = existing.get((day, user_id, action))
+        if rollup is None:
+            to_create.append(AuditLogRollup(
+                day=day, user_id=user_id, action=action, count=group['count'],
+                resource_types=dict(group['resource_types']),
+                first_at=group['first_at'], last_at=group['last_at']
+            ))
+            continue
+        rollup.count += group['count']
+        for resource_type, count in group['resource_types'].items():
+            rollup.resource_types[resource_type] = rollup.resource_types.get(resource_type, 0) + count
+        rollup.first_at = min(rollup.first_at, group['first_at'])
+        rollup.last_at = max(rollup.last_at, group['last_at'])
+        to_update.append(rollup)
+
+    AuditLogRollup.objects.bulk_create(to_create, batch_size=500)
+    AuditLogRollup.objects.bulk_update(to_update, ['count', 'resource_types', 'first_at', 'last_at'], batch_size=500)
+
+
+def archive_audit_logs(cutoff, batch_size=5000, max_batches=None):
+    """
+    Archive and purge AuditLog rows older than ``cutoff``.
+    Returns {'batches', 'rows', 'segments': [paths]}.
+    """
+    result = {'batches': 0, 'rows': 0, 'segments': []}
+    while max_batches is None or result['batches'] < max_batches:
+        batch = list(
+            AuditLog.objects.filter(timestamp__lt=cutoff)
+            .select_related('user')
+            .order_by('id')[:batch_size]
+        )
+        if not batch:
+            break
+
+        path, size, sha256 = _write_segment(batch)
+        ids = [entry.id for entry in batch]
+        with transaction.atomic():
+            _rollup(batch)
+            AuditArchiveSegment.objects.update_or_create(path=path, defaults={
+                'start_at': min(entry.timestamp for entry in batch),
+                'end_at': max(entry.timestamp for entry in batch),
+                'first_id': ids[0],
+                'last_id': ids[-1],
+                'row_count': len(batch),
+                'size_bytes': size,
+                'sha256': sha256,
+            })
+            AuditLog.objects.filter(id__in=ids).delete()
+
+        result['batches'] += 1
+        result['rows'] += len(batch)
+        result['segments'].append(path)
+    return result
+
+
+def iter_archived(start=None, end=None, user_id=None, action=None):
+    """Yield archived rows (dicts) with start <= timestamp < end, oldest segment first."""
+    segments = AuditArchiveSegment.objects.all()
+    if start is not None:
+        segments = segments.filter(end_at__gte=start)
+    if end is not None:
+        segments = segments.filter(start_at__lt=end)
+
+    for segment in segments.order_by('start_at', 'first_id'):
+        with gzip.open(archive_dir() / segment.path, 'rt', encoding='utf-8') as fh:
+            for line in fh:
+                row = json.loads(line)
+                if user_id is not None and row['user_id'] != user_id:
+                    continue
+                if action is not None and row['action'] != action:
+                    continue
+                timestamp = parse_datetime(row['timestamp'])
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp >= end:
+                    continue
+                yield row
@@ -0,0 +1,261 @@
+"""
+Content-addressed revision history for architecture_json.
+
+Node, edge and metadata bodies are stored once in ArchitectureBlob, keyed
+by their merkle.py content hash, so unchanged nodes are never stored again.
+A revision only records what changed against its parent:
+
+* node_changes: {node_id: hash} for added/changed nodes, None for removed
+* edge_changes: {"added": [hash, ...], "removed": [hash, ...]}
+* meta_hash: hash of the top-level metadata (version, exportDate, ...)
+* order: top-level keys, node ids and edge hashes in document order, or
+  None when that is the parent's order minus removals plus additions
+  (sorted) appended, the common case for UI edits
+
+Every REVISION_SNAPSHOT_INTERVAL revisions the full manifest is stored
+instead, so rebuilding any revision reads at most that many rows plus the
+blobs it references.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .architecture import get_nodes, get_edges, iter_nodes, edge_id
+from .merkle import ArchitectureDigest, diff_hashes
+from .models import FeastRepository, ArchitectureBlob, ArchitectureRevision
+
+
+REVISION_SNAPSHOT_INTERVAL = 50
+
+_IN_BATCH = 500
+
+
+class RevisionError(ValueError):
+    """Raised when a revision cannot be rebuilt from its blobs."""
+
+
+@dataclass
+class Manifest:
+    """Content hashes that make up one revision."""
+    nodes: Dict[str, str] = field(default_factory=dict)
+    edges: Counter = field(default_factory=Counter)
+    meta: str = ''
+    layout: str = 'pairs'
+    # Document order; None for revisions recorded before order was kept
+    keys: Optional[List[str]] = None
+    node_order: Optional[List[str]] = None
+    edge_order: Optional[List[str]] = None
+
+    def order(self):
+        return {'keys': self.keys, 'nodes': self.node_order, 'edges': self.edge_order}
+
+
+def node_layout(architecture):
+    return 'dict' if isinstance(get_nodes(architecture), dict) else 'pairs'
+
+
+def manifest_from_digest(architecture, digest):
+    node_order = list(dict.fromkeys(str(node_id) for node_id, _ in iter_nodes(architecture)))
+    return Manifest(
+        nodes=dict(digest.nodes),
+        edges=Counter(h for _, h in digest.edges),
+        meta=digest.meta,
+        layout=node_layout(architecture),
+        keys=list(architecture),
+        node_order=node_order,
+        edge_order=[h for _, h in digest.edges]
+    )
+
+
+def next_order(previous, node_changes, edge_changes):
+    """
+    Order implied by a delta when the revision stores none: the parent's
+    order without removed entries, then added ones (sorted). None if the
+    parent's order is unknown.
+    """
+    if previous.node_order is None:
+        return None
+    known = set(previous.node_order)
+    nodes = [node_id for node_id in previous.node_order if node_changes.get(node_id, '') is not None]
+    nodes += sorted(node_id for node_id, h in node_changes.items() if h is not None and node_id not in known)
+    edges = list(previous.edge_order)
+    for h in edge_changes.get('removed', []):
+        if h in edges:
+            edges.remove(h)
+    edges += edge_changes.get('added', [])
+    return {'keys': previous.keys, 'nodes': nodes, 'edges': edges}
+
+
+def _batches(values):
+    values = list(values)
+    for i in range(0, len(values), _IN_BATCH):
+        yield values[i:i + _IN_BATCH]
+
+
+def revision_payload(architecture, digest, previous: Optional[Manifest] = None):
+    """
+    Column values for a revision of ``architecture`` plus the blob bodies
+    it references ({hash: body}). ``previous`` is the parent manifest, or
+    None for a full snapshot. Pure, so migrations can use it too.
+    """
+    new = manifest_from_digest(architecture, digest)
+    old = previous or Manifest()
+
+    node_changes = {node_id: h for node_id, h in new.nodes.items() if old.nodes.get(node_id) != h}
+    node_changes.update({node_id: None for node_id in old.nodes if node_id not in new.nodes})
+    edges_added = new.edges - old.edges
+    edges_removed = old.edges - new.edges
+
+    bodies = {}
+    for node_id, node in iter_nodes(architecture):
+        h = node_changes.get(str(node_id))
+        if h:
+            bodies[h] = node
+    edge_bodies = [edge for edge in get_edges(architecture) if isinstance(edge, dict)]
+    for edge, (_, h) in zip(edge_bodies, digest.edges):
+        if h in edges_added:
+            bodies[h] = edge
+    if new.meta != old.meta:
+        bodies[new.meta] = {k: v for k, v in architecture.items() if k not in ('nodes', 'edges')}
+
+    edge_changes = {
+        'added': sorted(edges_added.elements()),
+        'removed': sorted(edges_removed.elements())
+    }
+    implied = next_order(previous, node_changes, edge_changes) if previous is not None else None
+    fields = {
+        'root_hash': digest.root,
+        'is_snapshot': previous is None,
+        'layout': new.layout,
+        'meta_hash': new.meta,
+        'node_changes': node_changes,
+        'edge_changes': edge_changes,
+        'order': None if implied == new.order() else new.order(),
+        'node_count': len(new.nodes),
+        'edge_count': sum(new.edges.values()),
+        'nodes_changed': len(node_changes),
+        'edges_changed': sum(edges_added.values()) + sum(edges_removed.values()),
+    }
+    return fields, bodies
+
+
+def store_blobs(bodies, blob_model=ArchitectureBlob):
+    """Insert the bodies whose hashes are not stored yet."""
+    if not bodies:
+        return
+    existing = set()
+    for batch in _batches(bodies):
+        existing.update(blob_model.objects.filter(hash__in=batch).values_list('hash', flat=True))
+    blob_model.objects.bulk_create(
+        [blob_model(hash=h, body=body) for h, body in bodies.items() if h not in existing],
+        batch_size=_IN_BATCH,
+        ignore_conflicts=True
+    )
+
+
+def load_blobs(hashes):
+    blobs = {}
+    for batch in _batches(set(hashes)):
+        blobs.update(ArchitectureBlob.objects.filter(hash__in=batch).values_list('hash', 'body'))
+    return blobs
+
+
+def load_manifest(revision):
+    """Replay the delta chain from the revision's snapshot."""
+    rows = ArchitectureRevision.objects.filter(
+        repository_id=revision.repository_id,
+        number__gte=revision.base_number,
+        number__lte=revision.number
+    ).order_by('number').values_list('node_changes', 'edge_changes', 'order')
+
+    manifest = Manifest(meta=revision.meta_hash, layout=revision.layout)
+    for node_changes, edge_changes, order in rows:
+        order = order or next_order(manifest, node_changes, edge_changes) or {}
+        for node_id, h in node_changes.items():
+            if h is None:
+                manifest.nodes.pop(node_id, None)
+            else:
+                manifest.nodes[node_id] = h
+        manifest.edges.update(edge_changes.get('added', []))
+        manifest.edges.subtract(edge_changes.get('removed', []))
+        manifest.keys, manifest.node_order, manifest.edge_order = order.get('keys'), order.get('nodes'), order.get('edges')
+    manifest.edges = +manifest.edges
+    return manifest
+
+
+def build_architecture(manifest):
+    """Materialize a manifest back into an architecture_json document."""
+    blobs = load_blobs(list(manifest.nodes.values()) + list(manifest.edges) + [manifest.meta])
+    missing = [h for h in set(manifest.nodes.values()) | set(manifest.edges) if h not in blobs]
+    if missing:
+        raise RevisionError(f'{len(missing)} blob(s) missing, e.g. {missing[0]}')
+
+    architecture = dict(blobs.get(manifest.meta) or {})
+    # Recorded order when it is consistent with the content, sorted otherwise
+    if manifest.node_order is not None and sorted(manifest.node_order) == sorted(manifest.nodes):
+        node_items = [(node_id, manifest.nodes[node_id]) for node_id in manifest.node_order]
+    else:
+        node_items = sorted(manifest.nodes.items())
+    if manifest.layout == 'dict':
+        architecture['nodes'] = {node_id: blobs[h] for node_id, h in node_items}
+    else:
+        architecture['nodes'] = [[node_id, blobs[h]] for node_id, h in node_items]
+    if manifest.edge_order is not None and Counter(manifest.edge_order) == manifest.edges:
+        architecture['edges'] = [blobs[h] for h in manifest.edge_order]
+    else:
+        edges = [blobs[h] for h in manifest.edges.elements()]
+        architecture['edges'] = sorted(edges, key=lambda edge: str(edge_id(edge)))
+    if manifest.keys is not None:
+        ordered = {key: architecture[key] for key in manifest.keys if key in architecture}
+        ordered.update(architecture)
+        architecture = ordered
+    return architecture
+
+
+def record_revision(repository, architecture, digest: ArchitectureDigest, action, user=None, message=''):
+    """
+    Append a revision for a write that just saved ``architecture``.
+    Must run inside the write's transaction. Returns (revision, created):
+    the new revision, or the latest one and False if the content did not
+    change.
+    """
+    # Serialize revision numbering per repository
+    FeastRepository.objects.select_for_update().only('id').get(pk=repository.pk)
+    latest = repository.revisions.order_by('-number').first()
+    if latest is not None and latest.root_hash == digest.root and latest.layout == node_layout(architecture):
+        return latest, False
+
+    number = latest.number + 1 if latest else 1
+    snapshot = latest is None or number - latest.base_number >= REVISION_SNAPSHOT_INTERVAL
+    fields, bodies = revision_payload(architecture, digest, None if snapshot else load_manifest(latest))
+    store_blobs(bodies)
+    revision = ArchitectureRevision.objects.create(
+        repository=repository,
+        number=number,
+        base_number=number if snapshot else latest.base_number,
+        action=action,
+        message=message[:255],
+        user=user if user is not None and user.is_authenticated else None,
+        **fields
+    )
+    return revision, True
+
+
+def diff_revisions(old_revision, new_revision):
+    """Nodes, edges and metadata that differ between two revisions."""
+    old = load_manifest(old_revision)
+    new = load_manifest(new_revision)
+    added = new.edges - old.edges
+    removed = old.edges - new.edges
+    blobs = load_blobs(list(added) + list(removed))
+
+    def edge_ids(counter):
+        return sorted(str(edge_id(blobs[h])) if h in blobs else h for h in counter.elements())
+
+    return {
+        'from': old_revision.number,
+        'to': new_revision.number,
+        'nodes': diff_hashes(old.nodes, new.nodes),
+        'edges': {'added': edge_ids(added), 'removed': edge_ids(removed)},
+        'meta_changed': old.meta != new.meta
+    }
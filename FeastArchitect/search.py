@@ -0,0 +1,158 @@
+"""
+Full-text search over architecture nodes across a user's repositories.
+
+Each ArchitectureNode row carries ``search_text``: description, tags,
+feature names and types, join key, owner, column security entries and
+the string values under ``details``. sync_architecture_tables() writes it
+with the rest of the row, so the index follows repository saves node by
+node; only changed nodes are rewritten.
+
+The index itself lives in the database (see migration 0010):
+
+- SQLite: an external-content FTS5 table kept in sync by triggers on the
+  node table, ranked with bm25() (name weighted above body text).
+- PostgreSQL: a stored generated tsvector column with a GIN index,
+  ranked with ts_rank_cd().
+- Anything else (or SQLite without FTS5): case-insensitive LIKE, unranked.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import ArchitectureNode
+
+
+FTS_TABLE = 'FeastArchitect_architecturenode_fts'
+
+# Node keys indexed as body text (name is indexed separately, with more weight)
+_TEXT_KEYS = ('description', 'kind', 'subtype', 'joinKey', 'ownedBy', 'sparkPattern', 'accessProcess')
+
+
+def _strings(value, out):
+    if isinstance(value, str):
+        if value:
+            out.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _strings(item, out)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _strings(item, out)
+
+
+def node_search_text(node):
+    """Searchable body text for a node (everything but its name)."""
+    parts = []
+    for key in _TEXT_KEYS:
+        _strings(node.get(key), parts)
+    _strings(node.get('tags'), parts)
+    for feature in node.get('features') or []:
+        if isinstance(feature, dict):
+            _strings([feature.get('name'), feature.get('type'), feature.get('description')], parts)
+        else:
+            _strings(feature, parts)
+    _strings(node.get('columnSecurity'), parts)
+    _strings(node.get('details'), parts)
+    return '\n'.join(parts)
+
+
+def fts5_available():
+    """True if the FTS5 index exists in this SQLite database."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def search_backend():
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if fts5_available():
+        return 'fts5'
+    return 'like'
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _fts5_query(query):
+    """Each whitespace-separated word as a quoted phrase; the last one is a prefix."""
+    words = [word for word in query.split() if _terms(word)]
+    phrases = ['"' + ' '.join(_terms(word)) + '"' for word in words]
+    if phrases:
+        phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+def _rows(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def search_nodes(user, query, node_type=None, limit=20):
+    """
+    Ranked nodes matching ``query`` in the user's repositories.
+    Returns (backend, rows); rows have repository_id, repository_name,
+    node_id, node_type, name, rank and snippet (lower rank = better).
+    """
+    backend = search_backend()
+    node_table = ArchitectureNode._meta.db_table
+    repo_table = ArchitectureNode._meta.get_field('repository').related_model._meta.db_table
+    type_clause = ' AND n.node_type = %s' if node_type else ''
+    type_params = [node_type] if node_type else []
+
+    if backend == 'fts5':
+        match = _fts5_query(query)
+        if not match:
+            return backend, []
+        sql = f'''
+            SELECT r.id AS repository_id, r.name AS repository_name, n.node_id, n.node_type, n.name,
+                   bm25("{FTS_TABLE}", 10.0, 1.0) AS rank,
+                   snippet("{FTS_TABLE}", 1, '[', ']', '...', 12) AS snippet
+            FROM "{FTS_TABLE}"
+            JOIN "{node_table}" n ON n.id = "{FTS_TABLE}".rowid
+            JOIN "{repo_table}" r ON r.id = n.repository_id
+            WHERE "{FTS_TABLE}" MATCH %s AND r.created_by_id = %s{type_clause}
+            ORDER BY rank
+            LIMIT %s
+        '''
+        return backend, _rows(sql, [match, user.id, *type_params, limit])
+
+    if backend == 'postgresql':
+        sql = f'''
+            SELECT r.id AS repository_id, r.name AS repository_name, n.node_id, n.node_type, n.name,
+                   -ts_rank_cd(n.search_vector, q) AS rank,
+                   ts_headline('simple', n.search_text, q, 'StartSel=[, StopSel=], MaxWords=12, MinWords=4') AS snippet
+            FROM "{node_table}" n
+            JOIN "{repo_table}" r ON r.id = n.repository_id,
+                 websearch_to_tsquery('simple', %s) q
+            WHERE n.search_vector @@ q AND r.created_by_id = %s{type_clause}
+            ORDER BY rank
+            LIMIT %s
+        '''
+        return backend, _rows(sql, [query, user.id, *type_params, limit])
+
+    terms = _terms(query)
+    if not terms:
+        return backend, []
+    queryset = ArchitectureNode.objects.filter(repository__created_by=user)
+    if node_type:
+        queryset = queryset.filter(node_type=node_type)
+    for term in terms:
+        queryset = queryset.filter(Q(search_text__icontains=term) | Q(name__icontains=term))
+    rows = queryset.values(
+        'repository_id', 'repository__name', 'node_id', 'node_type', 'name'
+    ).order_by('repository__name', 'node_id')[:limit]
+    return backend, [
+        {
+            'repository_id': row['repository_id'], 'repository_name': row['repository__name'],
+            'node_id': row['node_id'], 'node_type': row['node_type'], 'name': row['name'],
+            'rank': None, 'snippet': None
+        }
+        for row in rows
+    ]
@@ -5,7 +5,9 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import (
     FeastRepository, DataSource, Entity,
-    AuditLog, LLMChatSession, LLMMessage
+    AuditLog, LLMChatSession, LLMMessage,
+    ArchitectureNode, ArchitectureEdge, ArchitectureRevision,
+    AuditLogRollup, FeatureCatalogEntry, LLMJob
 )
 
 
@@ -16,8 +18,8 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class DataSourceSerializer(serializers.ModelSerializer):
-    category = serializers.CharField(source='category', read_only=True)
-    debezium_supported = serializers.BooleanField(source='debezium_supported', read_only=True)
+    category = serializers.CharField(read_only=True)
+    debezium_supported = serializers.BooleanField(read_only=True)
     icon = serializers.SerializerMethodField()
     
     class Meta:
@@ -57,16 +59,55 @@ class EntitySerializer(serializers.ModelSerializer):
         ]
 
 
+class ArchitectureNodeSerializer(serializers.ModelSerializer):
+    repository_name = serializers.CharField(source='repository.name', read_only=True)
+    
+    class Meta:
+        model = ArchitectureNode
+        fields = [
+            'id', 'repository', 'repository_name', 'node_id', 'node_type',
+            'name', 'pos_x', 'pos_y', 'data'
+        ]
+
+
+class ArchitectureEdgeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchitectureEdge
+        fields = ['id', 'repository', 'edge_id', 'from_node', 'to_node', 'data']
+
+
+class ArchitectureRevisionSerializer(serializers.ModelSerializer):
+    user_username = serializers.CharField(source='user.username', read_only=True, default=None)
+    
+    class Meta:
+        model = ArchitectureRevision
+        fields = [
+            'number', 'root_hash', 'action', 'message', 'user_username', 'created_at',
+            'is_snapshot', 'node_count', 'edge_count', 'nodes_changed', 'edges_changed'
+        ]
+
+
+class FeatureCatalogEntrySerializer(serializers.ModelSerializer):
+    repository_name = serializers.CharField(source='repository.name', read_only=True)
+    
+    class Meta:
+        model = FeatureCatalogEntry
+        fields = [
+            'id', 'feature', 'dtype', 'feature_view', 'feature_view_id', 'join_keys',
+            'ttl_seconds', 'services', 'repository', 'repository_name'
+        ]
+
+
 class FeastRepositoryListSerializer(serializers.ModelSerializer):
-    node_count = serializers.IntegerField(source='get_node_count', read_only=True)
-    edge_count = serializers.IntegerField(source='get_edge_count', read_only=True)
+    """Reads only stored columns, so list querysets can defer architecture_json."""
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     
     class Meta:
         model = FeastRepository
         fields = [
             'id', 'name', 'location', 'description', 'default_owner',
-            'node_count', 'edge_count', 'created_by_username',
+            'node_count', 'edge_count', 'datasource_count', 'entity_count',
+            'featureview_count', 'service_count', 'created_by_username',
             'created_at', 'updated_at'
         ]
 
@@ -74,8 +115,6 @@ class FeastRepositoryListSerializer(serializers.ModelSerializer):
 class FeastRepositoryDetailSerializer(serializers.ModelSerializer):
     data_sources = DataSourceSerializer(many=True, read_only=True)
     entities = EntitySerializer(many=True, read_only=True)
-    node_count = serializers.IntegerField(source='get_node_count', read_only=True)
-    edge_count = serializers.IntegerField(source='get_edge_count', read_only=True)
     created_by = UserSerializer(read_only=True)
     
     class Meta:
@@ -83,7 +122,8 @@ class FeastRepositoryDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'location', 'description', 'default_owner',
             'architecture_json', 'settings', 'data_sources', 'entities',
-            'node_count', 'edge_count', 'json_hash', 'last_synced_at',
+            'node_count', 'edge_count', 'datasource_count', 'entity_count',
+            'featureview_count', 'service_count', 'json_hash', 'last_synced_at',
             'created_by', 'created_at', 'updated_at'
         ]
 
@@ -113,11 +153,17 @@ class AuditLogSerializer(serializers.ModelSerializer):
         ]
 
 
+class AuditLogRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditLogRollup
+        fields = ['day', 'action', 'count', 'resource_types', 'first_at', 'last_at']
+
+
 class LLMMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = LLMMessage
         fields = [
-            'id', 'role', 'content', 'query_type',
+            'id', 'role', 'content', 'query_type', 'is_complete',
             'prompt_tokens', 'completion_tokens', 'total_tokens',
             'model', 'created_at'
         ]
@@ -147,6 +193,30 @@ class LLMChatSessionDetailSerializer(serializers.ModelSerializer):
         ]
 
 
+class LLMJobSerializer(serializers.ModelSerializer):
+    """Background chat turn; content is the answer so far."""
+    content = serializers.SerializerMethodField()
+    poll_url = serializers.SerializerMethodField()
+    stream_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = LLMJob
+        fields = [
+            'id', 'session', 'status', 'query_type', 'message', 'use_cache',
+            'assistant_message', 'content', 'result', 'error',
+            'created_at', 'started_at', 'finished_at', 'poll_url', 'stream_url'
+        ]
+    
+    def get_content(self, obj):
+        return obj.assistant_message.content if obj.assistant_message_id else ''
+    
+    def get_poll_url(self, obj):
+        return f'/api/jobs/{obj.id}/'
+    
+    def get_stream_url(self, obj):
+        return f'/api/jobs/{obj.id}/stream/'
+
+
 class LLMChatCreateSerializer(serializers.Serializer):
     """For creating new chat sessions."""
     repository_id = serializers.IntegerField(required=False, allow_null=True)
@@ -159,10 +229,27 @@ class LLMQuerySerializer(serializers.Serializer):
     """For sending messages to LLM."""
     message = serializers.CharField(required=True)
     query_type = serializers.CharField(default="default")
-    stream = serializers.BooleanField(default=False)
+    stream = serializers.BooleanField(
+        default=False,
+        help_text="Stream the answer as SSE; ignored while FEAST_LLM_BACKGROUND is on (follow the job's stream_url)"
+    )
+    cache = serializers.BooleanField(default=True, help_text="Set false to bypass the response cache")
 
 
 class DataSourceSyncSerializer(serializers.Serializer):
     """For syncing data sources from JSON."""
     sources = serializers.ListField(child=serializers.DictField())
     dry_run = serializers.BooleanField(default=False, help_text="Preview changes without saving")
+    architecture_json = serializers.DictField(required=False, help_text="Document to save with the sync")
+
+
+class ArchitecturePatchSerializer(serializers.Serializer):
+    """For applying JSON Patch operations to architecture_json."""
+    base_hash = serializers.CharField(required=False, allow_blank=True, help_text="json_hash the operations were made against")
+    operations = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+
+class RevisionRestoreSerializer(serializers.Serializer):
+    """For restoring a repository to an earlier revision."""
+    client_hash = serializers.CharField(required=False, allow_blank=True, help_text="json_hash the restore is based on")
+    message = serializers.CharField(required=False, allow_blank=True, max_length=255)
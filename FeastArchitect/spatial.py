@@ -0,0 +1,127 @@
+"""
+Viewport queries over node positions.
+
+The architect canvas can hold thousands of nodes; instead of loading the
+whole architecture_json, the UI asks for a bounding box. Nodes inside it
+come from a range scan on the (repository, pos_x, pos_y, node_type) index
+on ArchitectureNode, at most ``limit`` of them; edges touching the returned
+nodes from the edge indexes, also capped at ``limit``. Everything
+outside the box is summarised as a coarse grid: one cluster per occupied
+cell with its node count, centroid and per-type counts, aggregated in SQL
+from the same index.
+"""
+import math
+from dataclasses import dataclass
+
+from django.db.models import Avg, Count, F, FloatField, Q, Value
+from django.db.models.functions import Floor
+
+from .models import ArchitectureNode, ArchitectureEdge
+
+
+# Default number of grid cells across the larger side of the viewport
+CLUSTER_CELLS_PER_VIEWPORT = 4
+
+# Finest grid a request may ask for, in cells across the larger side of the viewport
+MAX_CLUSTER_CELLS_PER_VIEWPORT = 256
+
+
+@dataclass
+class BBox:
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+    @classmethod
+    def parse(cls, params):
+        """From x0/y0/x1/y1 query params; raises ValueError."""
+        try:
+            x0, y0, x1, y1 = (float(params[key]) for key in ('x0', 'y0', 'x1', 'y1'))
+        except KeyError as e:
+            raise ValueError(f'{e.args[0]} is required')
+        if not all(math.isfinite(v) for v in (x0, y0, x1, y1)):
+            raise ValueError('coordinates must be finite numbers')
+        if x1 < x0 or y1 < y0:
+            raise ValueError('x1/y1 must not be smaller than x0/y0')
+        return cls(x0, y0, x1, y1)
+
+    def q(self):
+        return Q(pos_x__gte=self.x0, pos_x__lte=self.x1, pos_y__gte=self.y0, pos_y__lte=self.y1)
+
+
+def viewport(repository, bbox, limit=2000, cell=None):
+    """
+    Nodes and incident edges inside bbox plus a cluster summary of the rest.
+    ``cell`` is the cluster grid size; it is widened to at least
+    1/MAX_CLUSTER_CELLS_PER_VIEWPORT of the viewport so a tiny value can't
+    make the grid arbitrarily fine; the size used is returned as cell_size.
+    """
+    nodes = ArchitectureNode.objects.filter(repository=repository)
+    inside = nodes.filter(bbox.q())
+
+    rows = list(
+        inside.order_by('pos_x', 'pos_y', 'id')
+        .values('node_id', 'node_type', 'name', 'pos_x', 'pos_y', 'data')[:limit + 1]
+    )
+    truncated = len(rows) > limit
+    rows = rows[:limit]
+
+    edges = []
+    if rows:
+        # Let the database join against the returned nodes instead of binding thousands of ids
+        visible = inside.order_by('pos_x', 'pos_y', 'id').values('node_id')[:limit]
+        edges = list(
+            ArchitectureEdge.objects.filter(repository=repository)
+            .filter(Q(from_node__in=visible) | Q(to_node__in=visible))
+            .order_by('id')
+            .values('edge_id', 'from_node', 'to_node', 'data')[:limit + 1]
+        )
+    edges_truncated = len(edges) > limit
+    edges = edges[:limit]
+
+    span = max(bbox.x1 - bbox.x0, bbox.y1 - bbox.y0, 1.0)
+    if cell is None:
+        cell = span / CLUSTER_CELLS_PER_VIEWPORT
+    else:
+        cell = max(cell, span / MAX_CLUSTER_CELLS_PER_VIEWPORT)
+    grid = nodes.exclude(bbox.q()).annotate(
+        cx=Floor(F('pos_x') / Value(float(cell), output_field=FloatField())),
+        cy=Floor(F('pos_y') / Value(float(cell), output_field=FloatField())),
+    )
+    clusters = {}
+    for row in grid.values('cx', 'cy', 'node_type').annotate(
+        count=Count('id'), x=Avg('pos_x'), y=Avg('pos_y')
+    ).order_by():
+        key = (int(row['cx']), int(row['cy']))
+        cluster = clusters.setdefault(key, {'cell': list(key), 'count': 0, 'sx': 0.0, 'sy': 0.0, 'types': {}})
+        cluster['count'] += row['count']
+        cluster['sx'] += row['x'] * row['count']
+        cluster['sy'] += row['y'] * row['count']
+        cluster['types'][row['node_type']] = row['count']
+
+    return {
+        'bbox': [bbox.x0, bbox.y0, bbox.x1, bbox.y1],
+        'nodes': [
+            {'id': row['node_id'], 'type': row['node_type'], 'name': row['name'],
+             'x': row['pos_x'], 'y': row['pos_y'], 'data': row['data']}
+            for row in rows
+        ],
+        'edges': [
+            {'id': edge['edge_id'], 'from': edge['from_node'], 'to': edge['to_node'], 'data': edge['data']}
+            for edge in edges
+        ],
+        'truncated': truncated,
+        'edges_truncated': edges_truncated,
+        'cell_size': cell,
+        'clusters': [
+            {
+                'cell': cluster['cell'],
+                'count': cluster['count'],
+                'x': cluster['sx'] / cluster['count'],
+                'y': cluster['sy'] / cluster['count'],
+                'types': cluster['types'],
+            }
+            for _, cluster in sorted(clusters.items())
+        ],
+    }
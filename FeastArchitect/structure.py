@@ -0,0 +1,135 @@
+"""
+Normalized node/edge tables derived from architecture_json.
+
+ArchitectureNode/ArchitectureEdge mirror the blob so structural questions
+("all feature views", "edges into service_1") are indexed SQL instead of
+deserializing every repository. Call sync_architecture_tables() inside the
+same transaction as any write to architecture_json. Rows carry the
+per-node/per-edge content hashes from merkle.py, so re-syncs only write
+what changed. The cross-repo feature catalog (feature_catalog.py) is
+refreshed in the same pass.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from .architecture import iter_nodes, get_edges, edge_id
+from .merkle import ArchitectureDigest, compute_digest, hash_value
+from .models import ArchitectureNode, ArchitectureEdge
+from .search import node_search_text
+from .feature_catalog import refresh_feature_catalog
+
+
+def _coord(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def node_fields(node_id, node):
+    """Column values for one node."""
+    return {
+        'node_id': str(node_id)[:255],
+        'node_type': str(node.get('type', ''))[:50],
+        'name': str(node.get('name', ''))[:255],
+        'data': node,
+        'pos_x': _coord(node.get('x')),
+        'pos_y': _coord(node.get('y')),
+        'search_text': node_search_text(node),
+    }
+
+
+def edge_fields(edge):
+    """Column values for one edge."""
+    return {
+        'edge_id': str(edge_id(edge))[:255],
+        'from_node': str(edge.get('from', ''))[:255],
+        'to_node': str(edge.get('to', ''))[:255],
+        'data': edge,
+    }
+
+
+def stored_digest(repository):
+    """Rebuild the previous digest from stored content hashes (no blob load)."""
+    return ArchitectureDigest(
+        nodes=dict(repository.nodes.values_list('node_id', 'content_hash')),
+        edges=list(repository.edges.values_list('edge_id', 'content_hash')),
+        meta=''
+    )
+
+
+def sync_architecture_tables(repository, digest=None, touched_nodes=None, edges_touched=True):
+    """
+    Bring the repository's node/edge rows in line with its architecture_json.
+
+    Only rows whose content hash changed are written. ``touched_nodes``
+    limits the node pass to those ids (e.g. the targets of a JSON Patch);
+    ``edges_touched=False`` skips the edge pass entirely.
+    """
+    arch = repository.architecture_json
+    if digest is None:
+        digest = compute_digest(arch)
+
+    nodes = {
+        str(node_id): node
+        for node_id, node in iter_nodes(arch)
+        if isinstance(node, dict) and (touched_nodes is None or str(node_id) in touched_nodes)
+    }
+    existing = repository.nodes.only('id', 'repository_id', 'node_id', 'content_hash')
+    if touched_nodes is not None:
+        existing = existing.filter(node_id__in=touched_nodes)
+    existing = {row.node_id: row for row in existing}
+
+    stale_nodes = [row.id for node_id, row in existing.items() if node_id not in nodes]
+    new_nodes, changed_nodes = [], []
+    for node_id, node in nodes.items():
+        content_hash = digest.nodes.get(node_id) or hash_value(node)
+        row = existing.get(node_id)
+        if row is None:
+            new_nodes.append(ArchitectureNode(
+                repository=repository, content_hash=content_hash, **node_fields(node_id, node)
+            ))
+        elif row.content_hash != content_hash:
+            for key, value in node_fields(node_id, node).items():
+                setattr(row, key, value)
+            row.content_hash = content_hash
+            changed_nodes.append(row)
+
+    stale_edges, new_edges = [], []
+    if edges_touched:
+        # Edges are matched by content hash; unchanged edges keep their rows
+        remaining = Counter(h for _, h in digest.edges)
+        for row in repository.edges.only('id', 'content_hash'):
+            if remaining[row.content_hash] > 0:
+                remaining[row.content_hash] -= 1
+            else:
+                stale_edges.append(row.id)
+        edges = [edge for edge in get_edges(arch) if isinstance(edge, dict)]
+        for edge, (_, content_hash) in zip(edges, digest.edges):
+            if remaining[content_hash] > 0:
+                remaining[content_hash] -= 1
+                new_edges.append(ArchitectureEdge(
+                    repository=repository, content_hash=content_hash, **edge_fields(edge)
+                ))
+
+    with transaction.atomic():
+        if stale_nodes:
+            ArchitectureNode.objects.filter(id__in=stale_nodes).delete()
+        if stale_edges:
+            ArchitectureEdge.objects.filter(id__in=stale_edges).delete()
+        ArchitectureNode.objects.bulk_update(
+            changed_nodes, ['node_type', 'name', 'data', 'pos_x', 'pos_y', 'search_text', 'content_hash'], batch_size=500
+        )
+        ArchitectureNode.objects.bulk_create(new_nodes, batch_size=500)
+        ArchitectureEdge.objects.bulk_create(new_edges, batch_size=500)
+        features = refresh_feature_catalog(repository)
+
+    return {
+        'nodes_created': len(new_nodes),
+        'nodes_updated': len(changed_nodes),
+        'nodes_deleted': len(stale_nodes),
+        'edges_created': len(new_edges),
+        'edges_deleted': len(stale_edges),
+        'features': features,
+    }
@@ -0,0 +1,1130 @@
+import copy
+import gzip
+import io
+import json
+import tempfile
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from FeastArchitect import chat
+from FeastArchitect.catalog import catalog
+from FeastArchitect.codegen import generate_feature_repo, iter_zip
+from FeastArchitect.context_window import ContextWindowCache
+from FeastArchitect.datasource_sync import apply_sync, plan_sync
+from FeastArchitect.events import ChangeBroker
+from FeastArchitect.feature_catalog import catalog_rows
+from FeastArchitect.importer import read_import
+from FeastArchitect.json_patch import PatchError, affected_nodes, apply_patch, parse_pointer
+from FeastArchitect.json_stream import JSONStreamError
+from FeastArchitect.lineage import LineageGraph
+from FeastArchitect.llm_jobs import JobRejected, LLMJobRunner, runner as job_runner
+from FeastArchitect.merkle import compute_digest, diff_hashes, update_digest
+from FeastArchitect.models import (
+    AuditLog, DataSource, Entity, FeastRepository, LLMChatSession, LLMJob, LLMMessage, RepositoryChange
+)
+from FeastArchitect.retention import archive_audit_logs
+from FeastArchitect.search import _fts5_query, search_backend
+from FeastArchitect.spatial import MAX_CLUSTER_CELLS_PER_VIEWPORT
+from FeastArchitect.structure import stored_digest, sync_architecture_tables
+from FeastArchitect.validation import validate_architecture
+
+
+def sample_architecture():
+    return {
+        'nodes': [
+            ['source_1', {'type': 'datasource', 'name': 'payments', 'x': 0, 'y': 0}],
+            ['entity_1', {'type': 'entity', 'name': 'customer', 'x': 200, 'y': 0}],
+            ['fv_1', {'type': 'featureview', 'name': 'payment_features', 'x': 400, 'y': 0,
+                      'details': {'features': [{'name': 'amount', 'dtype': 'Float32'}]}}],
+        ],
+        'edges': [
+            {'from': 'source_1', 'to': 'fv_1'},
+            {'from': 'entity_1', 'to': 'fv_1'},
+        ],
+    }
+
+
+@override_settings(FEAST_AUDIT_ASYNC=False)
+class RepositoryAPITestCase(TestCase):
+    """Authenticated client plus a repository created through the API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('architect', password='x')
+        self.client = APIClient()
+        # SecureGate's middleware checks the Django session, not just DRF auth
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        # The in-process catalog outlives each test's rolled-back transaction
+        catalog.clear()
+
+    def create_repository(self, name='payments', architecture=None):
+        response = self.client.post('/api/repositories/', {
+            'name': name,
+            'architecture_json': architecture if architecture is not None else sample_architecture(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return FeastRepository.objects.get(name=name)
+
+
+class JSONPatchTests(TestCase):
+    def test_parse_pointer_unescapes_tokens(self):
+        self.assertEqual(parse_pointer(''), [])
+        self.assertEqual(parse_pointer('/a~1b/c~0d'), ['a/b', 'c~d'])
+        self.assertEqual(parse_pointer('/'), [''])
+        with self.assertRaises(PatchError):
+            parse_pointer('nodes/fv_1')
+        with self.assertRaises(PatchError):
+            parse_pointer(None)
+
+    def test_nodes_are_addressed_by_id_in_both_layouts(self):
+        for layout in ('pairs', 'dict'):
+            arch = sample_architecture()
+            if layout == 'dict':
+                arch['nodes'] = dict(arch['nodes'])
+            arch = apply_patch(arch, [{'op': 'replace', 'path': '/nodes/fv_1/x', 'value': 420}])
+            nodes = dict(arch['nodes'])
+            self.assertEqual(nodes['fv_1']['x'], 420, layout)
+            self.assertEqual(nodes['entity_1']['x'], 200, layout)
+
+    def test_add_and_remove_node(self):
+        arch = apply_patch(sample_architecture(), [
+            {'op': 'add', 'path': '/nodes/service_1', 'value': {'type': 'service', 'name': 'scoring'}},
+            {'op': 'remove', 'path': '/nodes/source_1'},
+        ])
+        self.assertEqual([node_id for node_id, _ in arch['nodes']], ['entity_1', 'fv_1', 'service_1'])
+
+    def test_edges_by_index_id_and_append(self):
+        arch = apply_patch(sample_architecture(), [
+            {'op': 'add', 'path': '/edges/-', 'value': {'from': 'fv_1', 'to': 'service_1'}},
+            {'op': 'remove', 'path': '/edges/source_1->fv_1'},
+            {'op': 'add', 'path': '/edges/0/label', 'value': 'join'},
+        ])
+        self.assertEqual(arch['edges'], [
+            {'from': 'entity_1', 'to': 'fv_1', 'label': 'join'},
+            {'from': 'fv_1', 'to': 'service_1'},
+        ])
+
+    def test_array_index_edge_cases(self):
+        arch = {'list': [1, 2]}
+        self.assertEqual(apply_patch(arch, [{'op': 'add', 'path': '/list/2', 'value': 3}])['list'], [1, 2, 3])
+        for path in ('/list/5', '/list/01', '/list/x', '/list/-'):
+            with self.subTest(path=path), self.assertRaises(PatchError):
+                apply_patch({'list': [1, 2]}, [{'op': 'replace', 'path': path, 'value': 0}])
+
+    def test_move_copy_and_test(self):
+        arch = apply_patch(sample_architecture(), [
+            {'op': 'copy', 'from': '/nodes/fv_1/details', 'path': '/nodes/entity_1/details'},
+            {'op': 'move', 'from': '/nodes/fv_1/x', 'path': '/nodes/fv_1/left'},
+            {'op': 'test', 'path': '/nodes/fv_1/left', 'value': 400},
+        ])
+        nodes = dict(arch['nodes'])
+        self.assertEqual(nodes['entity_1']['details'], nodes['fv_1']['details'])
+        self.assertIsNot(nodes['entity_1']['details'], nodes['fv_1']['details'])
+        self.assertNotIn('x', nodes['fv_1'])
+
+    def test_invalid_operations(self):
+        cases = [
+            {'op': 'frobnicate', 'path': '/a'},
+            {'op': 'add', 'path': '/a'},
+            {'op': 'remove', 'path': ''},
+            {'op': 'remove', 'path': '/missing'},
+            {'op': 'test', 'path': '/a', 'value': 2},
+            {'op': 'move', 'from': '/a', 'path': '/a/b'},
+            'not an object',
+        ]
+        for operation in cases:
+            with self.subTest(operation=operation), self.assertRaises(PatchError):
+                apply_patch({'a': 1}, [operation])
+
+    def test_error_names_the_failing_operation(self):
+        with self.assertRaisesRegex(PatchError, '^Operation 1: '):
+            apply_patch({'a': 1}, [{'op': 'add', 'path': '/b', 'value': 2}, {'op': 'remove', 'path': '/c'}])
+
+    def test_affected_nodes(self):
+        self.assertEqual(affected_nodes([
+            {'op': 'replace', 'path': '/nodes/fv_1/x', 'value': 1},
+            {'op': 'test', 'path': '/nodes/entity_1', 'value': {}},
+        ]), ({'fv_1'}, False))
+        self.assertEqual(affected_nodes([
+            {'op': 'move', 'from': '/nodes/a', 'path': '/nodes/b'},
+            {'op': 'add', 'path': '/edges/-', 'value': {}},
+        ]), ({'a', 'b'}, True))
+        self.assertEqual(affected_nodes([{'op': 'replace', 'path': '/nodes', 'value': {}}]), (None, True))
+
+
+class PatchEndpointTests(RepositoryAPITestCase):
+    def patch(self, repo, operations, base_hash=None):
+        return self.client.patch(f'/api/repositories/{repo.id}/patch/', {
+            'base_hash': repo.json_hash if base_hash is None else base_hash,
+            'operations': operations,
+        }, format='json')
+
+    def test_patch_updates_document_hash_and_node_rows(self):
+        repo = self.create_repository()
+        response = self.patch(repo, [{'op': 'replace', 'path': '/nodes/fv_1/name', 'value': 'renamed'}])
+        self.assertEqual(response.status_code, 200, response.content)
+
+        repo.refresh_from_db()
+        self.assertEqual(response.data['hash'], repo.json_hash)
+        self.assertNotEqual(response.data['previous_hash'], repo.json_hash)
+        self.assertEqual(dict(repo.architecture_json['nodes'])['fv_1']['name'], 'renamed')
+        self.assertEqual(repo.nodes.get(node_id='fv_1').name, 'renamed')
+
+    def test_failed_operation_rolls_back_the_whole_patch(self):
+        repo = self.create_repository()
+        before = (repo.json_hash, repo.architecture_json, repo.revisions.count())
+        response = self.patch(repo, [
+            {'op': 'replace', 'path': '/nodes/fv_1/name', 'value': 'renamed'},
+            {'op': 'remove', 'path': '/nodes/missing'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Operation 1', response.data['detail'])
+
+        repo.refresh_from_db()
+        self.assertEqual((repo.json_hash, repo.architecture_json, repo.revisions.count()), before)
+        self.assertEqual(repo.nodes.get(node_id='fv_1').name, 'payment_features')
+
+    def test_stale_or_missing_base_hash(self):
+        repo = self.create_repository()
+        operations = [{'op': 'replace', 'path': '/nodes/fv_1/x', 'value': 1}]
+        self.assertEqual(self.patch(repo, operations, base_hash='stale').status_code, 409)
+        self.assertEqual(self.patch(repo, operations, base_hash='').status_code, 428)
+
+    def test_if_match_header(self):
+        repo = self.create_repository()
+        url = f'/api/repositories/{repo.id}/patch/'
+        operations = {'operations': [{'op': 'replace', 'path': '/nodes/fv_1/x', 'value': 1}]}
+
+        etag = self.client.get(f'/api/repositories/{repo.id}/')['ETag']
+        response = self.client.patch(url, operations, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        stale = self.client.patch(url, operations, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(stale.status_code, 412)
+        self.assertEqual(stale.data['server_hash'], response.data['hash'])
+        fresh = self.client.patch(url, operations, format='json', HTTP_IF_MATCH=f'"{response.data["hash"]}"')
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(self.client.patch(url, operations, format='json', HTTP_IF_MATCH='*').status_code, 428)
+
+
+class MerkleDigestTests(TestCase):
+    def assertDigestsEqual(self, incremental, full):
+        self.assertEqual(incremental.nodes, full.nodes)
+        self.assertEqual(sorted(incremental.edges), sorted(full.edges))
+        self.assertEqual(incremental.meta, full.meta)
+        self.assertEqual(incremental.root, full.root)
+
+    def patched(self, operations):
+        before = sample_architecture()
+        after = apply_patch(copy.deepcopy(before), operations)
+        touched, edges_touched = affected_nodes(operations)
+        return update_digest(after, compute_digest(before), touched, edges_touched), compute_digest(after)
+
+    def test_update_digest_matches_compute_digest(self):
+        cases = [
+            [{'op': 'replace', 'path': '/nodes/fv_1/x', 'value': 1}],
+            [{'op': 'add', 'path': '/nodes/service_1', 'value': {'type': 'service'}}],
+            [{'op': 'remove', 'path': '/nodes/source_1'}],
+            [{'op': 'add', 'path': '/edges/-', 'value': {'from': 'fv_1', 'to': 'service_1'}}],
+            [{'op': 'replace', 'path': '/nodes/entity_1/name', 'value': 'user'},
+             {'op': 'remove', 'path': '/edges/0'}],
+            [{'op': 'add', 'path': '/version', 'value': '3.0'}],
+        ]
+        for operations in cases:
+            with self.subTest(operations=operations):
+                incremental, full = self.patched(operations)
+                self.assertIsNotNone(incremental)
+                self.assertDigestsEqual(incremental, full)
+
+    def test_untouched_node_changes_force_a_full_hash(self):
+        before = sample_architecture()
+        after = copy.deepcopy(before)
+        after['nodes'].append(['sneaky', {'type': 'entity'}])
+        self.assertIsNone(update_digest(after, compute_digest(before), {'fv_1'}, False))
+
+    def test_root_tracks_content_not_order(self):
+        arch = sample_architecture()
+        reordered = copy.deepcopy(arch)
+        reordered['nodes'].reverse()
+        reordered['edges'].reverse()
+        self.assertEqual(compute_digest(arch).root, compute_digest(reordered).root)
+
+        as_dict = copy.deepcopy(arch)
+        as_dict['nodes'] = dict(as_dict['nodes'])
+        self.assertEqual(compute_digest(arch).nodes, compute_digest(as_dict).nodes)
+
+        changed = apply_patch(copy.deepcopy(arch), [{'op': 'replace', 'path': '/nodes/fv_1/y', 'value': 5}])
+        self.assertNotEqual(compute_digest(arch).root, compute_digest(changed).root)
+        self.assertEqual(diff_hashes(compute_digest(arch).nodes, compute_digest(changed).nodes),
+                         {'added': [], 'removed': [], 'changed': ['fv_1']})
+
+    def test_stored_hashes_are_used_for_patches(self):
+        user = User.objects.create_user('hasher')
+        arch = sample_architecture()
+        digest = compute_digest(arch)
+        repo = FeastRepository.objects.create(name='hashed', architecture_json=arch, json_hash=digest.root,
+                                              created_by=user)
+        sync_architecture_tables(repo, digest)
+
+        stored = stored_digest(repo)
+        self.assertEqual(stored.nodes, digest.nodes)
+        self.assertEqual(sorted(stored.edges), sorted(digest.edges))
+
+
+def source_node(name, **overrides):
+    node = {'name': name, 'kind': 'postgres', 'ownedBy': 'payments-team', 'x': 10, 'y': 20,
+            'details': {'connection': f'postgresql://db/{name}'}}
+    node.update(overrides)
+    return node
+
+
+class DataSourceSyncTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = self.create_repository()
+        apply_sync(plan_sync(self.repo, [source_node('payments'), source_node('refunds'), source_node('chargebacks')]))
+
+    def test_plan_reports_only_real_changes(self):
+        plan = plan_sync(self.repo, [
+            source_node('payments'),
+            source_node('refunds', kind='kafka', details={'connection': 'kafka://broker', 'topic': 'refunds'}),
+            source_node('disputes'),
+            {'kind': 'postgres'},
+            source_node('payments'),
+        ])
+        self.assertEqual(plan.results()['created'], ['disputes'])
+        self.assertEqual(plan.results()['updated'], ['refunds'])
+        self.assertEqual(plan.results()['deleted'], ['chargebacks'])
+        self.assertEqual(plan.unchanged, ['payments'])
+        self.assertEqual(plan.errors, ['Source missing name', 'Duplicate source name: payments'])
+        self.assertEqual(plan.changes['refunds']['feast_connection_type'], {'old': 'batch', 'new': 'stream'})
+        self.assertEqual(set(plan.changes['refunds']), {'kind', 'connection_string', 'topic', 'feast_connection_type'})
+        # Planning never writes
+        self.assertEqual(DataSource.objects.get(name='refunds').kind, 'postgres')
+
+    def test_apply_writes_the_plan(self):
+        apply_sync(plan_sync(self.repo, [
+            source_node('payments', description='card payments'),
+            source_node('disputes', kind='redis'),
+        ]))
+        sources = {ds.name: ds for ds in self.repo.data_sources.all()}
+        self.assertEqual(set(sources), {'payments', 'disputes'})
+        self.assertEqual(sources['payments'].description, 'card payments')
+        self.assertEqual(sources['disputes'].feast_connection_type, 'push')
+
+        again = plan_sync(self.repo, [source_node('payments', description='card payments'),
+                                      source_node('disputes', kind='redis')])
+        self.assertEqual(again.results()['updated'] + again.results()['created'] + again.results()['deleted'], [])
+
+    def test_endpoint_dry_run_and_hash_check(self):
+        url = f'/api/repositories/{self.repo.id}/sync_datasources/'
+        body = {'sources': [source_node('payments')], 'dry_run': True}
+        response = self.client.post(url, body, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(sorted(response.data['results']['deleted']), ['chargebacks', 'refunds'])
+        self.assertIsNone(response.data['new_hash'])
+        self.assertEqual(self.repo.data_sources.count(), 3)
+
+        stale = self.client.post(url, {**body, 'client_hash': 'stale'}, format='json')
+        self.assertEqual(stale.status_code, 409)
+
+        response = self.client.post(url, {'sources': [source_node('payments')]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.repo.data_sources.values_list('name', flat=True)), ['payments'])
+
+
+class TrickleFile(io.BytesIO):
+    """Upload that hands out a few bytes per read, to split tokens across chunks."""
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+def server_export(architecture=None):
+    return {
+        'repository': {'id': 1, 'name': 'payments', 'location': '/srv/feast', 'settings': {'online': 'redis'}},
+        'export_date': '2026-01-01T00:00:00',
+        'version': '3.0',
+        'architecture': architecture if architecture is not None else sample_architecture(),
+        'server_hash': 'abc',
+    }
+
+
+def ui_export():
+    return {'repository': {'name': 'payments', 'defaultOwner': 'risk'}, 'version': '2.0',
+            **sample_architecture()}
+
+
+class StreamingImportTests(RepositoryAPITestCase):
+    def read(self, document):
+        return read_import(TrickleFile(json.dumps(document, ensure_ascii=False).encode('utf-8')))
+
+    def test_server_export_shape(self):
+        doc = self.read(server_export())
+        self.assertEqual(doc.repository['location'], '/srv/feast')
+        self.assertEqual(doc.import_hash, 'abc')
+        self.assertEqual(doc.architecture, sample_architecture())
+        self.assertEqual([n['name'] for n in doc.source_nodes], ['payments'])
+        self.assertEqual([n['name'] for n in doc.entity_nodes], ['customer'])
+
+    def test_ui_export_shape_and_dict_layout(self):
+        doc = self.read(ui_export())
+        self.assertEqual(doc.architecture, {'version': '2.0', **sample_architecture()})
+        self.assertIsNone(doc.import_hash)
+
+        arch = sample_architecture()
+        arch['nodes'] = dict(arch['nodes'])
+        arch['nodes']['entity_1']['description'] = 'Kund \u00e9\u2603'
+        doc = self.read(server_export(arch))
+        self.assertEqual(doc.architecture, arch)
+        self.assertEqual(len(doc.entity_nodes), 1)
+
+    def test_malformed_input(self):
+        cases = [b'', b'[]', b'{"nodes": [1, 2', b'{"a": 1} {"b": 2}', b'{"a": tru}', b'{"a" 1}', b'\xff\xfe']
+        for raw in cases:
+            with self.subTest(raw=raw), self.assertRaises(JSONStreamError):
+                read_import(TrickleFile(raw))
+
+    def upload(self, document, name='export.json'):
+        raw = document if isinstance(document, bytes) else json.dumps(document).encode('utf-8')
+        return self.client.post('/api/repositories/import_json/',
+                                {'file': SimpleUploadedFile(name, raw, content_type='application/json')})
+
+    def test_import_endpoint(self):
+        response = self.upload(server_export())
+        self.assertEqual(response.status_code, 201, response.content)
+        repo = FeastRepository.objects.get(pk=response.data['id'])
+        self.assertEqual(repo.location, '/srv/feast')
+        self.assertEqual(repo.architecture_json, sample_architecture())
+        self.assertEqual(response.data['hash'], compute_digest(sample_architecture()).root)
+        self.assertEqual(list(repo.data_sources.values_list('name', flat=True)), ['payments'])
+        self.assertEqual(list(repo.entities.values_list('name', flat=True)), ['customer'])
+        self.assertEqual(repo.nodes.count(), 3)
+
+        duplicate = self.upload(ui_export())
+        self.assertEqual(duplicate.status_code, 409)
+        self.assertEqual(duplicate.data['existing_id'], repo.id)
+
+        self.assertEqual(self.upload(b'{"repository": ').status_code, 400)
+        self.assertEqual(self.upload(b'{"repository": {"name": "\xff"}}').status_code, 400)
+
+
+class ExportTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = self.create_repository()
+        self.url = f'/api/repositories/{self.repo.id}/export_json/'
+
+    def export(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.status_code == 200 else b''
+        if response.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return response, json.loads(body) if body else None
+
+    def test_streamed_export_round_trips(self):
+        response, document = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.get('Content-Encoding'))
+        self.assertEqual(document['architecture'], sample_architecture())
+        self.assertEqual(document['server_hash'], self.repo.json_hash)
+        self.assertEqual(document['repository']['name'], 'payments')
+
+        compressed, same = self.export(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(same['architecture'], document['architecture'])
+
+    def test_if_none_match_gets_304_without_audit(self):
+        response, _ = self.export()
+        exports = AuditLog.objects.filter(action='EXPORT').count()
+
+        cached, _ = self.export(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(AuditLog.objects.filter(action='EXPORT').count(), exports)
+
+        other_variant = self.client.get(self.url + '?include_hash=false', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(other_variant.status_code, 200)
+
+    def test_metadata_changes_invalidate_the_etag(self):
+        response, _ = self.export()
+        renamed = self.client.patch(f'/api/repositories/{self.repo.id}/', {'name': 'payments_v2'}, format='json')
+        self.assertEqual(renamed.status_code, 200, renamed.content)
+
+        fresh, document = self.export(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], response['ETag'])
+        self.assertEqual(document['repository']['name'], 'payments_v2')
+
+
+class ConditionalDetailTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = self.create_repository()
+        self.url = f'/api/repositories/{self.repo.id}/'
+
+    def assertRefetched(self, etag, url=None):
+        response = self.client.get(url or self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def test_detail_validators_and_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", {etag}').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+        head = self.client.head(self.url)
+        self.assertEqual(head.status_code, 200)
+        self.assertEqual(head['ETag'], etag)
+        self.assertEqual(head.content, b'')
+
+    def test_check_status_validators(self):
+        url = f'/api/repositories/{self.repo.id}/check_status/'
+        response = self.client.get(url)
+        self.assertEqual(response.data['server_hash'], self.repo.json_hash)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertNotEqual(response['ETag'], self.client.get(self.url)['ETag'])
+
+    def test_nested_rows_change_the_detail_etag(self):
+        source = DataSource.objects.create(repository=self.repo, name='payments', kind='postgres')
+        entity = Entity.objects.create(repository=self.repo, name='customer')
+        etag = self.client.get(self.url)['ETag']
+
+        updated = self.client.patch(f'/api/datasources/{source.id}/', {'description': 'card payments'}, format='json')
+        self.assertEqual(updated.status_code, 200, updated.content)
+        response = self.assertRefetched(etag)
+        self.assertEqual(response.data['data_sources'][0]['description'], 'card payments')
+
+        self.assertEqual(self.client.delete(f'/api/entities/{entity.id}/').status_code, 204)
+        self.assertEqual(self.assertRefetched(response['ETag']).data['entities'], [])
+
+    def test_sync_without_architecture_changes_the_detail_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        sync_url = f'/api/repositories/{self.repo.id}/sync_datasources/'
+        self.client.post(sync_url, {'sources': [source_node('payments')]}, format='json')
+        etag = self.assertRefetched(etag)['ETag']
+
+        # A sync that writes nothing keeps the cached copy valid
+        self.client.post(sync_url, {'sources': [source_node('payments')]}, format='json')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class RevisionTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = {
+            'version': 2,
+            'nodes': [
+                ['fv_1', {'type': 'featureview', 'name': 'payment_features'}],
+                ['source_1', {'type': 'datasource', 'name': 'payments'}],
+                ['entity_1', {'type': 'entity', 'name': 'customer'}],
+            ],
+            'edges': [
+                {'from': 'source_1', 'to': 'fv_1'},
+                {'from': 'entity_1', 'to': 'fv_1'},
+            ],
+            'exportDate': '2024-01-01',
+        }
+        self.repo = self.create_repository(architecture=self.document)
+        self.url = f'/api/repositories/{self.repo.id}/'
+
+    def force_update(self, architecture):
+        response = self.client.post(self.url + 'force_update/', {'architecture_json': architecture}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def rebuilt(self, number):
+        response = self.client.get(self.url + f'revisions/{number}/')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data['architecture_json']
+
+    def assertSameDocument(self, rebuilt, document):
+        self.assertEqual(json.dumps(rebuilt), json.dumps(document))
+
+    def test_revisions_rebuild_in_document_order(self):
+        appended = copy.deepcopy(self.document)
+        appended['nodes'].append(['a_new', {'type': 'entity', 'name': 'merchant'}])
+        appended['edges'].append({'from': 'a_new', 'to': 'fv_1'})
+        self.force_update(appended)
+
+        reordered = copy.deepcopy(appended)
+        reordered['nodes'].reverse()
+        reordered['edges'].reverse()
+        reordered['nodes'][0][1]['name'] = 'renamed'
+        reordered = {'exportDate': '2024-02-01', 'edges': reordered['edges'], 'nodes': reordered['nodes']}
+        self.force_update(reordered)
+
+        dict_layout = {'nodes': {node_id: node for node_id, node in reordered['nodes']}, 'edges': []}
+        self.force_update(dict_layout)
+
+        for number, document in enumerate([self.document, appended, reordered, dict_layout], start=1):
+            self.assertSameDocument(self.rebuilt(number), document)
+        # Appending is implied by the parent's order, so nothing extra is stored
+        self.assertIsNone(self.repo.revisions.get(number=2).order)
+
+    def test_restore_reproduces_the_stored_document(self):
+        changed = copy.deepcopy(self.document)
+        del changed['nodes'][1]
+        self.force_update(changed)
+
+        response = self.client.post(self.url + 'revisions/1/restore/', {}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['revision'], 3)
+        self.repo.refresh_from_db()
+        self.assertSameDocument(self.repo.architecture_json, self.document)
+        self.assertEqual(self.repo.json_hash, compute_digest(self.document).root)
+
+    def test_non_object_documents_are_rejected(self):
+        sync_url = self.url + 'sync_datasources/'
+        for document in (['nodes'], 'nodes', None):
+            response = self.client.post(sync_url, {'sources': [], 'architecture_json': document}, format='json')
+            self.assertEqual(response.status_code, 400, response.content)
+            response = self.client.post(self.url + 'force_update/', {'architecture_json': document}, format='json')
+            self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(self.repo.revisions.count(), 1)
+        self.repo.refresh_from_db()
+        self.assertEqual(self.repo.architecture_json, self.document)
+
+    def test_revisions_without_order_fall_back_to_sorted(self):
+        self.repo.revisions.update(order=None)
+        rebuilt = self.rebuilt(1)
+        self.assertEqual([node_id for node_id, _ in rebuilt['nodes']], ['entity_1', 'fv_1', 'source_1'])
+        self.assertEqual(compute_digest(rebuilt).root, self.repo.json_hash)
+
+    def test_force_update_reports_the_overwritten_revision(self):
+        changed = copy.deepcopy(self.document)
+        changed['version'] = 3
+        data = self.force_update(changed)
+        self.assertEqual((data['revision'], data['previous_revision'], data['revision_created']), (2, 1, True))
+
+        # Same content: no new revision, and what was overwritten is revision 2 itself
+        data = self.force_update(changed)
+        self.assertEqual((data['revision'], data['previous_revision'], data['revision_created']), (2, 2, False))
+        self.assertEqual(self.repo.revisions.count(), 2)
+
+
+class CatalogTests(TestCase):
+    def test_repository_writes_invalidate_the_owner_catalog(self):
+        user = User.objects.create_user('architect', password='x')
+        catalog.clear()
+        self.assertIsNone(catalog.find(user, 'payments'))
+
+        repo = FeastRepository.objects.create(name='payments', location='/repos/payments', created_by=user)
+        self.assertEqual(catalog.find(user, 'payments').id, repo.id)
+        repo.delete()
+        self.assertIsNone(catalog.find(user, 'payments'))
+
+
+class FeatureCatalogTests(RepositoryAPITestCase):
+    def test_rows(self):
+        rows = catalog_rows({
+            'nodes': [
+                ['e', {'type': 'entity', 'name': 'customer', 'joinKey': 'customer_id'}],
+                ['v', {'type': 'featureview', 'name': 'txn', 'entities': ['e', 'gone'], 'details': {'ttl': '2 weeks'},
+                       'features': [{'name': 'Amount', 'type': 'Float32'}, {'name': 'count', 'type': 'Int64'}, 'junk']}],
+                ['s', {'type': 'service', 'name': 'scoring', 'features': ['txn:count']}],
+                ['s2', {'type': 'service', 'name': 'batch', 'features': ['v']}],
+            ],
+            'edges': [],
+        })
+        self.assertEqual(sorted(rows), [('v', 'Amount'), ('v', 'count')])
+        self.assertEqual(rows[('v', 'count')], {
+            'feature_view': 'txn', 'feature_key': 'count', 'dtype': 'Int64', 'join_keys': ['customer_id'],
+            'ttl_seconds': 1209600, 'services': ['batch', 'scoring'],
+        })
+        self.assertEqual(rows[('v', 'Amount')]['services'], ['batch'])
+
+    def test_malformed_nodes_are_skipped(self):
+        architecture = {
+            'nodes': [
+                ['e', {'type': 'entity', 'name': ['odd'], 'joinKey': 'id'}],
+                ['v', {'type': 'featureview', 'name': 'v', 'details': 'ttl 1d', 'entities': ['e', ['e'], {'id': 'e'}],
+                       'features': [{'name': 'f'}]}],
+                ['w', {'type': 'featureview', 'name': {'odd': 1}, 'entities': 'e', 'features': 'f'}],
+                ['s', {'type': 'service', 'name': ['svc'], 'features': 'v'}],
+                ['s2', {'type': 'service', 'name': 'svc', 'features': ['v:f', ['v']]}],
+                [['bad'], {'type': 'featureview', 'features': [{'name': 'g'}]}],
+            ],
+            'edges': [],
+        }
+        self.assertEqual(catalog_rows(architecture), {('v', 'f'): {
+            'feature_view': 'v', 'feature_key': 'f', 'dtype': '', 'join_keys': ['id'],
+            'ttl_seconds': None, 'services': ['svc'],
+        }})
+
+        repo = self.create_repository(architecture=architecture)
+        self.assertEqual(list(repo.feature_entries.values_list('feature_view_id', 'feature')), [('v', 'f')])
+
+
+class RepositoryDeleteAuditTests(RepositoryAPITestCase):
+    @override_settings(FEAST_AUDIT_ASYNC=True)
+    def test_delete_is_audited_synchronously(self):
+        repo = self.create_repository()
+        response = self.client.delete(f'/api/repositories/{repo.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(FeastRepository.objects.filter(pk=repo.pk).exists())
+
+        entry = AuditLog.objects.get(action='DELETE')
+        self.assertEqual((entry.resource_type, entry.resource_name, entry.user), ('repository', 'payments', self.user))
+        self.assertEqual(entry.details, {'id': repo.id, 'hash': repo.json_hash})
+
+
+class AuditArchiveTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        archive = tempfile.TemporaryDirectory()
+        self.addCleanup(archive.cleanup)
+        self.enterContext(override_settings(FEAST_AUDIT_ARCHIVE_DIR=archive.name))
+        for day in (1, 2, 3):
+            AuditLog.objects.create(
+                timestamp=datetime(2024, 1, day, 12, tzinfo=dt_timezone.utc), user=self.user,
+                action='EXPORT', resource_type='repository', resource_name=f'repo_{day}'
+            )
+        archive_audit_logs(datetime(2024, 2, 1, tzinfo=dt_timezone.utc))
+
+    def archived(self, **params):
+        response = self.client.get('/api/audit-logs/archive/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['resource_name'] for row in response.data['results']]
+
+    def test_naive_and_aware_bounds(self):
+        self.assertEqual(self.archived(start='2024-01-02T00:00:00Z'), ['repo_2', 'repo_3'])
+        # No offset: read in the server's time zone instead of failing the comparison
+        self.assertEqual(self.archived(start='2024-01-01T00:00:00', end='2024-01-03T00:00:00'), ['repo_1', 'repo_2'])
+
+    def test_unparseable_bounds(self):
+        for start in ('yesterday', '2024-13-01T00:00:00'):
+            response = self.client.get('/api/audit-logs/archive/', {'start': start})
+            self.assertEqual(response.status_code, 400)
+
+
+class ViewportTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        node = lambda x, y: {'type': 'entity', 'name': f'n{x}', 'x': x, 'y': y}
+        self.repo = self.create_repository(architecture={
+            'nodes': [['a', node(0, 0)], ['b', node(100, 0)], ['c', node(200, 0)], ['d', node(1000, 1000)]],
+            'edges': [{'from': 'a', 'to': 'b'}, {'from': 'a', 'to': 'c'}, {'from': 'a', 'to': 'd'},
+                      {'from': 'b', 'to': 'c'}],
+        })
+
+    def viewport(self, limit):
+        response = self.client.get(f'/api/repositories/{self.repo.id}/viewport/',
+                                   {'x0': 0, 'y0': 0, 'x1': 500, 'y1': 500, 'limit': limit})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_edges_follow_the_returned_nodes(self):
+        data = self.viewport(limit=10)
+        self.assertEqual([node['id'] for node in data['nodes']], ['a', 'b', 'c'])
+        self.assertEqual(len(data['edges']), 4)
+        self.assertFalse(data['truncated'] or data['edges_truncated'])
+        self.assertEqual(data['clusters'][0]['count'], 1)
+
+        data = self.viewport(limit=2)
+        self.assertEqual([node['id'] for node in data['nodes']], ['a', 'b'])
+        self.assertTrue(data['truncated'])
+        self.assertTrue(data['edges_truncated'])
+        self.assertEqual(len(data['edges']), 2)
+        for edge in data['edges']:
+            self.assertTrue({edge['from'], edge['to']} & {'a', 'b'})
+
+    def test_edges_of_truncated_nodes_are_left_out(self):
+        data = self.viewport(limit=3)
+        self.assertEqual(len(data['edges']), 3)
+        data = self.viewport(limit=1)
+        self.assertEqual([node['id'] for node in data['nodes']], ['a'])
+        self.assertEqual([(edge['from'], edge['to']) for edge in data['edges']], [('a', 'b')])
+
+    def test_cell_must_be_finite_and_is_widened(self):
+        url = f'/api/repositories/{self.repo.id}/viewport/'
+        bbox = {'x0': 0, 'y0': 0, 'x1': 500, 'y1': 500}
+        for cell in ('nan', 'inf', '-inf', '0', '-5', 'wide'):
+            response = self.client.get(url, {**bbox, 'cell': cell})
+            self.assertEqual(response.status_code, 400, cell)
+
+        response = self.client.get(url, {**bbox, 'x0': 1, 'cell': '1e-300'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['cell_size'], 500 / MAX_CLUSTER_CELLS_PER_VIEWPORT)
+        self.assertEqual([cluster['count'] for cluster in response.data['clusters']], [1, 1])
+
+        response = self.client.get(url, {**bbox, 'cell': '2000'})
+        self.assertEqual(response.data['cell_size'], 2000)
+
+
+@override_settings(FEAST_LLM_JOBS_PER_USER=1)
+class LLMJobRunnerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('architect', password='x')
+        self.session = LLMChatSession.objects.create(user=self.user)
+        self.runner = LLMJobRunner()
+        # Tests run inside one transaction; the worker must not close its connection
+        patcher = mock.patch('FeastArchitect.llm_jobs.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_per_user_limit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = self.runner.submit(self.session, 'first question')
+        self.assertEqual((job.status, len(callbacks)), ('queued', 1))
+        with self.assertRaises(JobRejected) as rejected:
+            self.runner.submit(self.session, 'second question')
+        self.assertEqual(rejected.exception.status_code, 429)
+        self.assertEqual(LLMJob.objects.count(), 1)
+        self.assertEqual(LLMMessage.objects.filter(role='user').count(), 1)
+
+    def run_job(self, events):
+        with self.captureOnCommitCallbacks():
+            job = self.runner.submit(self.session, 'question')
+        assistant = LLMMessage.objects.create(session=self.session, role='assistant', content='')
+        with mock.patch('FeastArchitect.chat.open_stream', return_value=(assistant, events(job))), \
+                mock.patch('FeastArchitect.chat.reply_summary', return_value={'ok': True}), \
+                mock.patch('FeastArchitect.chat.compact'):
+            self.runner._run(job.id)
+        job.refresh_from_db()
+        return job
+
+    def test_finished_job_succeeds(self):
+        job = self.run_job(lambda job: iter([{'delta': 'hi'}, {'done': True}]))
+        self.assertEqual((job.status, job.result), ('succeeded', {'ok': True}))
+        self.assertEqual((self.runner.succeeded, self.runner.failed), (1, 0))
+
+    def test_reaped_job_stays_failed(self):
+        def events(job):
+            yield {'delta': 'slow'}
+            LLMJob.objects.filter(pk=job.pk).update(status='failed', error='Job timed out or its worker stopped')
+            yield {'done': True}
+
+        job = self.run_job(events)
+        self.assertEqual((job.status, job.error), ('failed', 'Job timed out or its worker stopped'))
+        self.assertEqual((self.runner.succeeded, self.runner.failed), (0, 0))
+
+
+class LLMJobEndpointTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = LLMChatSession.objects.create(user=self.user)
+
+    def job(self, age=0):
+        job = LLMJob.objects.create(user=self.user, session=self.session, message='question', status='running')
+        LLMJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - timedelta(seconds=age))
+        return job
+
+    def test_reading_a_dead_job_fails_it(self):
+        alive, dead = self.job(), self.job(age=301)
+        response = self.client.get('/api/jobs/', {'status': 'running'})
+        self.assertEqual([job['id'] for job in response.data['results']], [alive.id])
+        response = self.client.get(f'/api/jobs/{dead.id}/')
+        self.assertEqual((response.data['status'], response.data['error']),
+                         ('failed', 'Job timed out or its worker stopped'))
+        self.assertEqual(self.client.get(f'/api/jobs/{alive.id}/').data['status'], 'running')
+
+    @override_settings(FEAST_CHANGE_FEED_MAX_AGE=0.3, FEAST_LLM_JOB_POLL_INTERVAL=0.05)
+    async def test_job_stream_ends_after_max_age(self):
+        job = await sync_to_async(self.job)()
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = await client.get(f'/api/jobs/{job.id}/stream/')
+        self.assertEqual(response.status_code, 200)
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertIn('event: status', body)
+        self.assertNotIn('event: done', body)
+
+    async def test_job_stream_reports_a_dead_job(self):
+        job = await sync_to_async(self.job)(age=301)
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = await client.get(f'/api/jobs/{job.id}/stream/')
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertIn('event: error', body)
+        self.assertIn('Job timed out or its worker stopped', body)
+
+
+class ContextWindowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('architect', password='x')
+        self.session = LLMChatSession.objects.create(user=self.user)
+        self.windows = ContextWindowCache()
+
+    def say(self, role, content, **fields):
+        return LLMMessage.objects.create(session=self.session, role=role, content=content, **fields)
+
+    def contents(self, windows=None):
+        return [message['content'] for message in (windows or self.windows).history(self.session)]
+
+    def test_streaming_answer_is_not_cached_until_finished(self):
+        self.say('user', 'first')
+        answer = self.say('assistant', '', is_complete=False)
+        self.assertEqual(self.contents(), ['first'])
+
+        # Partly flushed answer and a newer turn: the newer turn is used, nothing past the answer is cached
+        LLMMessage.objects.filter(pk=answer.pk).update(content='partial')
+        self.say('user', 'second')
+        self.assertEqual(self.contents(), ['first', 'second'])
+        # The flag is in the database, so a process that did not start the stream waits for it too
+        self.assertEqual(self.contents(ContextWindowCache()), ['first', 'second'])
+
+        LLMMessage.objects.filter(pk=answer.pk).update(content='full answer', is_complete=True)
+        self.assertEqual(self.contents(), ['first', 'full answer', 'second'])
+        self.assertEqual(self.contents(), ['first', 'full answer', 'second'])
+
+    def test_abandoned_stream_counts_as_finished(self):
+        self.say('user', 'first')
+        answer = self.say('assistant', 'partial', is_complete=False)
+        LLMMessage.objects.filter(pk=answer.pk).update(created_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(self.contents(), ['first', 'partial'])
+
+    def test_persisted_stream_is_marked_complete(self):
+        answer = self.say('assistant', '', is_complete=False)
+
+        def failing():
+            yield {'delta': 'half'}
+            raise RuntimeError('connection reset')
+
+        with self.assertRaises(RuntimeError):
+            list(chat._persist_stream(self.session, answer, failing()))
+        answer.refresh_from_db()
+        self.assertEqual((answer.content, answer.is_complete), ('half', True))
+
+    def test_abandoned_empty_answers_are_skipped(self):
+        self.say('user', 'first')
+        self.say('assistant', '')
+        self.say('user', 'second')
+        self.assertEqual(self.contents(), ['first', 'second'])
+
+
+@override_settings(FEAST_LLM_BACKGROUND=False)
+class InlineChatTests(RepositoryAPITestCase):
+    def test_compaction_runs_on_the_worker_pool(self):
+        session = LLMChatSession.objects.create(user=self.user)
+        result = {'response': 'hi', 'usage': {}, 'model': 'm', 'query_type': 'default', 'cached': False}
+        executor = mock.Mock()
+        with mock.patch('FeastArchitect.chat.send', return_value=result), \
+                mock.patch('FeastArchitect.chat.compact') as compact, \
+                mock.patch.object(job_runner, '_executor', return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f'/api/chats/{session.id}/send_message/', {'message': 'hello'},
+                                            format='json')
+            self.assertEqual(response.status_code, 200, response.content)
+            compact.assert_not_called()
+            executor.submit.assert_called_once_with(job_runner._compact, session.id)
+
+            with mock.patch('FeastArchitect.llm_jobs.close_old_connections'):
+                job_runner._compact(session.id)
+            self.assertEqual(compact.call_args.args[0].pk, session.id)
+
+
+class ChangeFeedPollTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('architect', password='x')
+        self.repo = FeastRepository.objects.create(name='payments', created_by=self.user)
+        self.broker = ChangeBroker()
+        self.broker.deliver = mock.Mock()
+
+    def change(self, change_id):
+        return RepositoryChange.objects.create(id=change_id, repository=self.repo, action='UPDATE',
+                                               payload={'hash': str(change_id)})
+
+    def delivered(self):
+        seqs = [call.args[1]['seq'] for call in self.broker.deliver.call_args_list]
+        self.broker.deliver.reset_mock()
+        return seqs
+
+    def test_rows_committed_out_of_id_order_are_delivered_once(self):
+        self.change(10)
+        self.broker._poll_once()
+        self.assertEqual(self.delivered(), [])  # Already there when the poller started
+
+        self.change(12)
+        self.broker._poll_once()
+        self.assertEqual(self.delivered(), [12])
+
+        # 11 was allocated before 12 but committed after it was read
+        self.change(11)
+        self.change(13)
+        self.broker._poll_once()
+        self.assertEqual(sorted(self.delivered()), [11, 13])
+
+        self.broker._poll_once()
+        self.assertEqual(self.delivered(), [])
+
+
+class LineageGraphTests(TestCase):
+    def test_malformed_references_are_skipped(self):
+        graph = LineageGraph({
+            'nodes': [
+                [1, {'type': 'datasource', 'name': ['not', 'a', 'name'], 'outputs': [2, ['x'], {'id': 3}]}],
+                [2, {'type': 'featureview', 'name': 'fv', 'inputs': 'ab', 'outputs': {'3': True}}],
+                ['3', {'type': {'odd': 1}, 'name': 'svc'}],
+                [['bad'], {'type': 'entity'}],
+            ],
+            'edges': [{'from': 2, 'to': '3'}, {'from': ['x'], 'to': {'y': 1}}, 'junk'],
+        })
+        self.assertEqual(graph.ids, ['1', '2', '3'])
+        self.assertEqual(graph.names, ['1', 'fv', 'svc'])
+        self.assertEqual(graph.summary()['adjacency'], {'1': ['2'], '2': ['3'], '3': []})
+        self.assertEqual(graph.resolve(1), graph.resolve('1'))
+        self.assertIsNone(graph.resolve(['1']))
+        self.assertEqual([node['id'] for node in graph.downstream(graph.resolve('1'))], ['2', '3'])
+
+
+
+class LineageEndpointTests(RepositoryAPITestCase):
+    def test_numeric_ids_match_query_refs(self):
+        repo = self.create_repository(architecture={
+            'nodes': [[1, {'type': 'datasource', 'name': 'src'}], [2, {'type': 'featureview', 'inputs': [1, [1]]}]],
+            'edges': [],
+        })
+        response = self.client.get(f'/api/repositories/{repo.id}/lineage/downstream/', {'node': '1'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([node['id'] for node in response.data['downstream']], ['2'])
+
+
+class GenerateCodeTests(TestCase):
+    def test_document_text_cannot_escape_comments_or_docstrings(self):
+        injected = 'x\nimport os; os.system("boom")\r\n'
+        files = generate_feature_repo({
+            'nodes': [
+                ['src', {'type': 'datasource', 'name': 'src' + injected, 'kind': 'postgres',
+                         'ownedBy': 'team' + injected, 'details': {'connection': 'db' + injected}}],
+                ['fv', {'type': 'featureview', 'name': 'fv' + injected, 'details': 'ttl 1d', 'entities': 'ab'}],
+                ['fv_2', {'type': 'featureview', 'name': 'orphan' + injected, 'entities': [['e']]}],
+            ],
+            'edges': [],
+        }, 'pay"""ments\\ ' + injected)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(iter_zip(files))))
+        sources = [path for path in archive.namelist() if path.endswith('.py')]
+        self.assertEqual(len(sources), 4)
+        for path in sources:
+            text = archive.read(path).decode('utf-8')
+            compile(text, path, 'exec')
+            self.assertNotIn('\nimport os', text)
+
+
+class ValidationTests(RepositoryAPITestCase):
+    def rules(self, architecture):
+        report = validate_architecture(architecture)
+        return sorted((issue['rule'], str(issue['node'])) for issue in report['issues'])
+
+    def test_rules(self):
+        self.assertTrue(validate_architecture(sample_architecture())['valid'])
+        self.assertEqual(self.rules({
+            'nodes': [
+                ['e', {'type': 'entity', 'name': 'customer'}],
+                ['e2', {'type': 'entity', 'name': 'customer'}],
+                ['fv', {'type': 'featureview', 'name': 'fv', 'entities': ['e', 'nope'], 'inputs': ['gone'],
+                        'features': ['amount', {'name': 'amount'}], 'details': {'ttl': 'soon'}}],
+                ['svc', {'type': 'service', 'features': ['fv', 'fv:amount', 'fv:missing', 'other', 7]}],
+            ],
+            'edges': [{'from': 'e', 'to': 'missing'}, 'junk'],
+        }), [
+            ('dangling_edge', 'None'), ('dangling_edge', 'e->missing'), ('dangling_reference', 'fv'),
+            ('duplicate_feature', 'fv'), ('duplicate_name', 'e2'), ('invalid_ttl', 'fv'), ('missing_entity', 'fv'),
+            ('undefined_feature', 'svc'), ('undefined_feature', 'svc'), ('undefined_feature', 'svc'),
+        ])
+
+    def test_wrongly_typed_values_are_reported(self):
+        report = validate_architecture({
+            'nodes': [
+                [['bad'], {'type': 'entity'}],
+                ['e', {'type': 'entity', 'name': ['customer']}],
+                ['e2', {'type': {'odd': 1}, 'name': 'customer'}],
+                ['fv', {'type': 'featureview', 'name': 'fv', 'details': 'ttl 1d', 'entities': 'e',
+                        'inputs': [['e']], 'outputs': {'svc': True}, 'features': [['amount'], {'name': 1}]}],
+                ['fv2', {'type': 'featureview', 'name': 'fv2', 'entities': [{'id': 'e'}], 'features': 'amount'}],
+                ['svc', {'type': 'service', 'features': 'fv', 'inputs': 'fv'}],
+                ['svc2', {'type': 'service', 'features': ['fv2:amount']}],
+            ],
+            'edges': [{'from': ['e'], 'to': {'id': 'fv'}}],
+        })
+        self.assertFalse(report['valid'])
+        invalid = [(issue['node'], issue['message']) for issue in report['issues'] if issue['rule'] == 'invalid_value']
+        self.assertEqual(len(invalid), 15, invalid)
+        self.assertIn(('fv', 'details must be an object, not str'), invalid)
+        self.assertIn(('fv', 'entities must be a list, not str'), invalid)
+        self.assertIn(('edge #0', "edge from ['e'] is not a node id"), invalid)
+        # Nothing wrongly typed is checked character by character
+        self.assertNotIn('missing_entity', {issue['rule'] for issue in report['issues']})
+
+    @override_settings(FEAST_VALIDATION_ENFORCE=True)
+    def test_enforced_writes_reject_malformed_documents(self):
+        malformed = {'nodes': [['fv', {'type': 'featureview', 'name': 'fv', 'details': 'ttl 1d'}]], 'edges': []}
+        response = self.client.post('/api/repositories/', {'name': 'bad', 'architecture_json': malformed}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(response.data['validation']['issues'][0]['rule'], 'invalid_value')
+
+        repo = self.create_repository()
+        response = self.client.post(f'/api/repositories/{repo.id}/sync_datasources/', {
+            'sources': [source_node('refunds')],
+            'architecture_json': malformed,
+        }, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        repo.refresh_from_db()
+        self.assertEqual(repo.architecture_json, sample_architecture())
+        self.assertFalse(repo.data_sources.exists())
+
+
+class SearchTests(RepositoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_repository(architecture={
+            'nodes': [
+                ['src', {'type': 'datasource', 'name': 'ledger', 'description': 'raw card payments'}],
+                ['fv', {'type': 'featureview', 'name': 'payment_stats', 'description': 'rolling totals',
+                        'features': [{'name': 'avg_amount', 'type': 'Float32'}]}],
+                ['ops', {'type': 'datasource', 'name': 'ops_notes', 'description': 'AND OR NOT * "quoted"'}],
+            ],
+            'edges': [],
+        })
+        other = User.objects.create_user('other', password='x')
+        FeastRepository.objects.create(name='theirs', created_by=other, architecture_json={})
+
+    def search(self, q, **params):
+        response = self.client.get('/api/repositories/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_fts5_query_sanitizer(self):
+        self.assertEqual(_fts5_query('"unbalanced'), '"unbalanced"*')
+        self.assertEqual(_fts5_query('AND OR NOT'), '"and" "or" "not"*')
+        self.assertEqual(_fts5_query('*'), '')
+        self.assertEqual(_fts5_query('card-pay'), '"card pay"*')
+
+    def test_fts5_ranks_name_matches_first(self):
+        self.assertEqual(search_backend(), 'fts5')
+        data = self.search('payment')
+        self.assertEqual(data['backend'], 'fts5')
+        # "payment_stats" matches by name, "ledger" only through its description
+        self.assertEqual([row['node_id'] for row in data['results']], ['fv', 'src'])
+        self.assertLess(data['results'][0]['rank'], data['results'][1]['rank'])
+        self.assertIn('[', data['results'][1]['snippet'])
+
+        self.assertEqual([row['node_id'] for row in self.search('avg_amount')['results']], ['fv'])
+        self.assertEqual([row['node_id'] for row in self.search('payment', type='datasource')['results']], ['src'])
+        for q in ('"unbalanced', 'AND OR NOT', '*', 'NEAR(a b)', 'name:ledger'):
+            self.search(q)
+        self.assertEqual([row['node_id'] for row in self.search('AND OR NOT')['results']], ['ops'])
+        self.assertEqual(self.search('*')['results'], [])
+
+    def test_like_fallback(self):
+        with mock.patch('FeastArchitect.search.search_backend', return_value='like'):
+            data = self.search('PAYMENT')
+            self.assertEqual(data['backend'], 'like')
+            self.assertEqual([(row['node_id'], row['rank']) for row in data['results']], [('fv', None), ('src', None)])
+            self.assertEqual([row['node_id'] for row in self.search('card payments')['results']], ['src'])
+            self.assertEqual([row['node_id'] for row in self.search('"unbalanced')['results']], [])
+            self.assertEqual([row['node_id'] for row in self.search('AND OR NOT')['results']], ['ops'])
+            self.assertEqual(self.search('*')['results'], [])
@@ -10,11 +10,18 @@ router = DefaultRouter()
 router.register(r'repositories', views.FeastRepositoryViewSet, basename='repository')
 router.register(r'datasources', views.DataSourceViewSet, basename='datasource')
 router.register(r'entities', views.EntityViewSet, basename='entity')
+router.register(r'nodes', views.ArchitectureNodeViewSet, basename='node')
+router.register(r'edges', views.ArchitectureEdgeViewSet, basename='edge')
+router.register(r'features', views.FeatureCatalogViewSet, basename='feature')
 router.register(r'audit-logs', views.AuditLogViewSet, basename='auditlog')
 router.register(r'chats', views.LLMChatSessionViewSet, basename='chat')
+router.register(r'jobs', views.LLMJobViewSet, basename='job')
 
 
 urlpatterns = [
+    # Async (ASGI) view, so it is routed outside the DRF router
+    path('api/repositories/<int:pk>/events/', views.repository_events, name='repository-events'),
+    path('api/jobs/<int:pk>/stream/', views.job_events, name='job-events'),
     path('api/', include(router.urls)),
     
     # UI rendering endpoint
@@ -29,32 +36,68 @@ urlpatterns = [
 # Repositories:
 #   GET    /api/repositories/              - List all repos
 #   POST   /api/repositories/              - Create new repo
-#   GET    /api/repositories/{id}/         - Get repo detail with JSON
+#   GET    /api/repositories/{id}/         - Get repo detail with JSON (ETag/Last-Modified; HEAD is cheap)
 #   PUT    /api/repositories/{id}/         - Update repo
 #   DELETE /api/repositories/{id}/         - Delete repo
+#   GET    /api/repositories/{id}/check_status/      - Hash/freshness probe (ETag/Last-Modified; HEAD is cheap)
+#   PATCH  /api/repositories/{id}/patch/             - Apply JSON Patch ops (needs base_hash or If-Match)
 #   POST   /api/repositories/{id}/sync_datasources/  - Sync sources from JSON
-#   POST   /api/repositories/{id}/export_json/         - Export as JSON
+#   GET    /api/repositories/{id}/export_json/         - Export as JSON (streamed, gzip, ETag; POST also works)
+#   GET    /api/repositories/{id}/validate/            - Rule-based validation report (cached per hash)
+#   GET    /api/repositories/{id}/generate_code/       - Feast feature repo as a zip (cached per hash, ETag)
+#   GET    /api/repositories/check_name/?name=   - Name availability (served from the catalog cache)
+#   GET    /api/repositories/search/?q=       - Ranked full-text search over nodes, features, tags (?type=&limit=)
+#   GET    /api/repositories/catalog_stats/        - Catalog cache hit/miss counters
+#   GET    /api/repositories/{id}/revisions/             - Revision history (?limit=&before=)
+#   GET    /api/repositories/{id}/revisions/{n}/         - Revision n with its architecture_json
+#   GET    /api/repositories/{id}/revisions/diff/        - Diff two revisions (?from=&to=)
+#   POST   /api/repositories/{id}/revisions/{n}/restore/ - Restore revision n as a new revision
+#   GET    /api/repositories/{id}/lineage/             - Lineage graph (roots, sinks, adjacency; cached per hash)
+#   GET    /api/repositories/{id}/lineage/upstream/    - Upstream closure (?node=&depth=)
+#   GET    /api/repositories/{id}/lineage/downstream/  - Downstream closure (?node=&depth=)
+#   GET    /api/repositories/{id}/lineage/paths/       - Shortest paths (?from=&to=; no to = every reachable service)
+#   GET    /api/repositories/{id}/lineage/impact/      - Downstream impact set (?node=&node=...)
+#   GET    /api/repositories/{id}/viewport/      - Nodes/edges in a bbox plus clusters (?x0=&y0=&x1=&y1=)
+#   GET    /api/repositories/{id}/events/          - SSE change feed (hash after each write; ASGI only)
 #   POST   /api/repositories/import_json/  - Import from JSON file
 #
 # Data Sources:
-#   GET    /api/datasources/               - List sources (filter: ?repository=1)
+#   GET    /api/datasources/               - List sources (filter: ?repository=1; cursor pages, ?limit=)
 #   POST   /api/datasources/               - Create source
 #   GET    /api/datasources/{id}/          - Get source detail
 #   PUT    /api/datasources/{id}/          - Update source
 #   DELETE /api/datasources/{id}/          - Delete source
 #
 # Entities:
-#   GET    /api/entities/                  - List entities
+#   GET    /api/entities/                  - List entities (cursor pages, ?limit=)
 #   POST   /api/entities/                  - Create entity
 #   GET    /api/entities/{id}/               - Get entity detail
 #
+# Architecture nodes/edges (read-only, derived from architecture_json):
+#   GET    /api/nodes/                     - List nodes (filter: ?node_type=featureview&repository=1)
+#   GET    /api/edges/                     - List edges (filter: ?to_node=service_1&from_node=fv_1)
+#
+# Feature catalog (across all of the user's repositories, refreshed on every write):
+#   GET    /api/features/                  - Features (?prefix=, ?feature=, ?repository=, ?dtype=; cursor pages)
+#   GET    /api/features/lookup/?name=     - Definitions and consuming services of one feature
+#
 # Audit Logs:
-#   GET    /api/audit-logs/                - List user actions
+#   GET    /api/audit-logs/                - List user actions (cursor pages, ?limit=)
+#   GET    /api/audit-logs/rollups/        - Daily per-action counts of archived rows (?start=&end=)
+#   GET    /api/audit-logs/archive/        - Archived raw rows by time range (?start=&end=&limit=)
 #
 # LLM Chats:
-#   GET    /api/chats/                     - List active chats
+#   GET    /api/chats/                     - List active chats (cursor pages, ?limit=)
 #   POST   /api/chats/                     - Create new chat session
 #   GET    /api/chats/{id}/                - Get chat with messages
-#   POST   /api/chats/{id}/send_message/   - Send message to chat
+#   POST   /api/chats/{id}/send_message/   - Send message to chat (202 + job; "cache": false to bypass the cache)
 #   POST   /api/chats/{id}/archive/        - Archive chat session
+#   GET    /api/chats/{id}/context/        - Summary + recent turns sent with the next message
 #   GET    /api/chats/history/             - Get chat history
+#   GET    /api/chats/cache_stats/         - LLM response cache hit/miss counters
+#
+# LLM jobs (background chat turns):
+#   GET    /api/jobs/                      - List jobs (?status=&session=)
+#   GET    /api/jobs/{id}/                 - Poll a job (content = answer so far)
+#   GET    /api/jobs/{id}/stream/          - SSE tokens then done/error (ASGI only)
+#   GET    /api/jobs/stats/                - Worker pool counters
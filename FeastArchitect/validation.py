@@ -0,0 +1,196 @@
+"""
+Deterministic structural validation of architecture_json.
+
+validate_architecture() makes one pass over the nodes and one over the
+edges (O(nodes + edges)) and reports:
+
+- dangling_edge       edge whose from/to is not a node            (error)
+- dangling_reference  inputs/outputs entry that is not a node      (warning)
+- missing_entity      feature view entity that is not an entity    (error)
+- duplicate_feature   feature name repeated within a feature view  (error)
+- invalid_ttl         details.ttl that parse_ttl can't read        (error)
+- undefined_feature   service feature ref that is not a feature view
+                      (or "View:feature" naming an unknown feature) (error)
+- duplicate_name      two nodes of one type with the same name      (error)
+- invalid_value       node id, field or reference of the wrong JSON
+                      type (e.g. a string where a list is expected) (error)
+
+Values of the wrong type are reported as invalid_value and left out of
+the other rules, so a malformed document gets a report, not a crash.
+
+Reports depend only on the document, so they are cached per json_hash.
+With FEAST_VALIDATION_ENFORCE on, writes whose architecture has errors
+are rejected with 400.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import APIException
+
+from .architecture import iter_nodes, get_edges, parse_ttl
+
+
+# Bump when rules change so cached reports are recomputed
+RULES_VERSION = '2'
+
+
+class ArchitectureInvalid(APIException):
+    """Raised by enforce(); DRF renders it as a 400 carrying the report."""
+    status_code = 400
+
+    def __init__(self, report):
+        self.report = report
+        # Set directly so DRF returns the report as-is (no ErrorDetail coercion)
+        self.detail = {
+            'error': 'Architecture validation failed',
+            'detail': f"{report['error_count']} validation error(s)",
+            'validation': report
+        }
+
+
+def _issue(issues, rule, severity, node, message):
+    issues.append({'rule': rule, 'severity': severity, 'node': node, 'message': message})
+
+
+def _is_ref(value):
+    """Node ids and references are strings, or integers in older documents."""
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def _typed(issues, node_id, node, key, kind, label):
+    """node[key] if it is None or a ``kind``; reports invalid_value and returns None otherwise."""
+    value = node.get(key)
+    if value is None or isinstance(value, kind):
+        return value
+    _issue(issues, 'invalid_value', 'error', node_id, f"{key} must be {label}, not {type(value).__name__}")
+    return None
+
+
+def _refs(issues, node_id, node, key):
+    """The valid references in the list node[key]; reports the rest as invalid_value."""
+    refs = []
+    for ref in _typed(issues, node_id, node, key, list, 'a list') or []:
+        if _is_ref(ref):
+            refs.append(ref)
+        else:
+            _issue(issues, 'invalid_value', 'error', node_id, f"{key} entry {ref!r} is not a node id")
+    return refs
+
+
+def _feature_name(feature):
+    """Name of a feature entry (an object with a name, or a bare string); None if it has none."""
+    name = feature.get('name') if isinstance(feature, dict) else feature
+    return name if isinstance(name, str) else None
+
+
+def validate_architecture(architecture):
+    """Run every rule; returns a JSON-serializable report."""
+    issues = []
+    nodes = {}
+    for node_id, node in iter_nodes(architecture):
+        if not _is_ref(node_id):
+            _issue(issues, 'invalid_value', 'error', None, f"node id {node_id!r} is not a valid node id")
+        elif isinstance(node, dict):
+            nodes[node_id] = node
+
+    views_by_name = {}
+    seen_names = {}
+    for node_id, node in nodes.items():
+        node_type = _typed(issues, node_id, node, 'type', str, 'a string')
+        name = _typed(issues, node_id, node, 'name', str, 'a string')
+        if name:
+            other = seen_names.setdefault((node_type, name), node_id)
+            if other != node_id:
+                _issue(issues, 'duplicate_name', 'error', node_id,
+                       f"{node_type} name '{name}' is also used by {other}")
+        if node_type == 'featureview':
+            views_by_name.setdefault(name or node_id, node)
+
+        for key in ('inputs', 'outputs'):
+            for ref in _refs(issues, node_id, node, key):
+                if ref not in nodes:
+                    _issue(issues, 'dangling_reference', 'warning', node_id,
+                           f"{key} references missing node '{ref}'")
+
+    for node_id, node in nodes.items():
+        node_type = node.get('type')
+        if node_type == 'featureview':
+            for ref in _refs(issues, node_id, node, 'entities'):
+                if nodes.get(ref, {}).get('type') != 'entity':
+                    _issue(issues, 'missing_entity', 'error', node_id,
+                           f"references entity '{ref}', which does not exist")
+
+            seen_features = set()
+            for feature in _typed(issues, node_id, node, 'features', list, 'a list') or []:
+                feature_name = _feature_name(feature)
+                if feature_name is None:
+                    _issue(issues, 'invalid_value', 'error', node_id, f"feature {feature!r} has no string name")
+                    continue
+                if feature_name in seen_features:
+                    _issue(issues, 'duplicate_feature', 'error', node_id,
+                           f"feature '{feature_name}' is defined more than once")
+                seen_features.add(feature_name)
+
+            ttl = (_typed(issues, node_id, node, 'details', dict, 'an object') or {}).get('ttl')
+            if ttl not in (None, '') and parse_ttl(ttl) is None:
+                _issue(issues, 'invalid_ttl', 'error', node_id, f"details.ttl {ttl!r} is not a valid duration")
+
+        elif node_type == 'service':
+            for ref in _typed(issues, node_id, node, 'features', list, 'a list') or []:
+                if not isinstance(ref, str):
+                    _issue(issues, 'undefined_feature', 'error', node_id, f"feature reference {ref!r} is not a string")
+                elif nodes.get(ref, {}).get('type') == 'featureview':
+                    continue
+                elif ':' in ref:
+                    view_name, _, feature_name = ref.partition(':')
+                    view = nodes.get(view_name) or views_by_name.get(view_name)
+                    features = (view or {}).get('features')
+                    names = {_feature_name(f) for f in features} if isinstance(features, list) else set()
+                    if view is None or view.get('type') != 'featureview' or feature_name not in names:
+                        _issue(issues, 'undefined_feature', 'error', node_id, f"reads undefined feature '{ref}'")
+                else:
+                    _issue(issues, 'undefined_feature', 'error', node_id, f"reads undefined feature view '{ref}'")
+
+    for index, edge in enumerate(get_edges(architecture)):
+        if not isinstance(edge, dict):
+            _issue(issues, 'dangling_edge', 'error', None, f"edge #{index} is not an object")
+            continue
+        for end in ('from', 'to'):
+            if not _is_ref(edge.get(end)):
+                _issue(issues, 'invalid_value', 'error', f"edge #{index}", f"edge {end} {edge.get(end)!r} is not a node id")
+            elif edge.get(end) not in nodes:
+                _issue(issues, 'dangling_edge', 'error', edge.get('id') or f"{edge.get('from')}->{edge.get('to')}",
+                       f"edge {end} '{edge.get(end)}' is not a node")
+
+    errors = sum(1 for issue in issues if issue['severity'] == 'error')
+    return {
+        'valid': errors == 0,
+        'error_count': errors,
+        'warning_count': len(issues) - errors,
+        'issues': issues,
+        'rules_version': RULES_VERSION
+    }
+
+
+def _cache_key(json_hash):
+    return f'feast:validation:{RULES_VERSION}:{json_hash}'
+
+
+def validation_report(json_hash, load_architecture):
+    """Cached report for json_hash; load_architecture() is only called on a miss."""
+    if not json_hash:
+        return validate_architecture(load_architecture())
+    report = cache.get(_cache_key(json_hash))
+    if report is None:
+        report = validate_architecture(load_architecture())
+        cache.set(_cache_key(json_hash), report, timeout=getattr(settings, 'FEAST_VALIDATION_CACHE_TTL', 86400))
+    return report
+
+
+def enforce(architecture, json_hash):
+    """Raise ArchitectureInvalid if enforcement is on and the document has errors."""
+    if not getattr(settings, 'FEAST_VALIDATION_ENFORCE', False):
+        return None
+    report = validation_report(json_hash, lambda: architecture)
+    if not report['valid']:
+        raise ArchitectureInvalid(report)
+    return report
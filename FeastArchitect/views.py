@@ -1,11 +1,18 @@
 """
 DRF Views for Feast Architect API with hash-based conflict detection
 """
-import hashlib
+import asyncio
 import json
 import logging
+import math
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.db import transaction
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -13,30 +20,60 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
 
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 
 from .models import (
     FeastRepository, DataSource, Entity,
-    AuditLog, LLMChatSession, LLMMessage
+    AuditLog, LLMChatSession, LLMMessage,
+    ArchitectureNode, ArchitectureEdge, ArchitectureRevision, AuditLogRollup,
+    FeatureCatalogEntry, LLMJob
 )
 from .serializers import (
     FeastRepositoryListSerializer, FeastRepositoryDetailSerializer,
     FeastRepositoryCreateUpdateSerializer, DataSourceSerializer,
     EntitySerializer, AuditLogSerializer, LLMChatSessionListSerializer,
     LLMChatSessionDetailSerializer, LLMChatCreateSerializer,
-    LLMQuerySerializer, DataSourceSyncSerializer, LLMMessageSerializer
+    LLMQuerySerializer, DataSourceSyncSerializer, LLMMessageSerializer,
+    ArchitecturePatchSerializer, ArchitectureNodeSerializer, ArchitectureEdgeSerializer,
+    ArchitectureRevisionSerializer, RevisionRestoreSerializer, AuditLogRollupSerializer,
+    FeatureCatalogEntrySerializer, LLMJobSerializer
+)
+from . import chat
+from .context_window import context_windows, estimate_tokens
+from .llm_cache import response_cache
+from .llm_jobs import runner as job_runner
+from .json_patch import apply_patch, affected_nodes, PatchError
+from .merkle import compute_digest, update_digest, diff_hashes
+from .structure import sync_architecture_tables, stored_digest
+from .datasource_sync import plan_sync, apply_sync
+from .importer import read_import, create_rows
+from .json_stream import JSONStreamError, iter_encode, buffer_chunks, gzip_chunks
+from .events import broker, publish_change
+from .catalog import catalog
+from .audit import audit_log
+from .retention import iter_archived
+from .lineage import lineage_cache
+from .search import search_nodes
+from .spatial import BBox, viewport
+from .validation import validation_report, enforce
+from .codegen import generate_feature_repo, project_name, cache_key, cached_zip, iter_zip_cached
+from .pagination import (
+    AuditLogPagination, NamePagination, ChatSessionPagination, FeatureCatalogPagination, LLMJobPagination
+)
+from .feature_catalog import prefix_range
+from .revisions import record_revision, load_manifest, build_architecture, diff_revisions, RevisionError
+from .conditional import (
+    make_etag, etag_matches, if_match_hash, accepts_gzip, repository_validators,
+    is_not_modified, set_validators, not_modified_response
 )
-from .llm_client import GroqLLMClient, LLMContext
 
 logger = logging.getLogger(__name__)
 
 
 def compute_json_hash(data):
-    """Compute MD5 hash of JSON data for conflict detection."""
-    # Normalize: sort keys, ensure consistent formatting
-    json_str = json.dumps(data, sort_keys=True, separators=(',', ':'))
-    return hashlib.md5(json_str.encode('utf-8')).hexdigest()
+    """Compute the Merkle root hash of an architecture for conflict detection."""
+    return compute_digest(data).root
 
 
 class FeastRepositoryViewSet(viewsets.ModelViewSet):
@@ -56,14 +93,44 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
         return FeastRepositoryDetailSerializer
     
     def get_queryset(self):
-        return FeastRepository.objects.filter(created_by=self.request.user)
+        queryset = FeastRepository.objects.filter(created_by=self.request.user)
+        if self.action == 'list':
+            # List rows use the stored count columns, never the blob
+            queryset = queryset.defer('architecture_json', 'settings').select_related('created_by')
+        return queryset
+    
+    def _get_object_fields(self, *fields):
+        """Like get_object(), but loads only the given columns (never architecture_json)."""
+        queryset = self.filter_queryset(self.get_queryset()).only('id', *fields)
+        obj = get_object_or_404(queryset, pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, obj)
+        return obj
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Repository detail with ETag/Last-Modified.
+        A fresh If-None-Match/If-Modified-Since, or a HEAD request, only
+        reads json_hash and updated_at.
+        """
+        light = self._get_object_fields('json_hash', 'updated_at')
+        etag, last_modified = repository_validators(light, 'detail')
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        if request.method == 'HEAD':
+            return set_validators(Response(), etag, last_modified)
+        
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
     
     def _check_repository_exists(self, name, exclude_id=None):
-        """Check if repository with name exists for this user."""
-        queryset = self.get_queryset().filter(name=name)
-        if exclude_id:
-            queryset = queryset.exclude(id=exclude_id)
-        return queryset.first()
+        """Check if repository with name exists for this user (served from the catalog cache)."""
+        return catalog.find(self.request.user, name, exclude_id=exclude_id)
+    
+    def list(self, request, *args, **kwargs):
+        """Repository list, served from the per-user catalog unless searching/ordering."""
+        if any(param in request.query_params for param in ('search', 'ordering')):
+            return super().list(request, *args, **kwargs)
+        return Response(catalog.rows(request.user))
     
     def _check_hash_conflict(self, instance, client_hash):
         """
@@ -98,11 +165,7 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
                 'suggestion': 'Use PUT to update existing or choose a different name'
             }, status=status.HTTP_409_CONFLICT)
         
-        # Compute initial hash if architecture provided
-        if 'architecture_json' in request.data:
-            arch = request.data['architecture_json']
-            request.data['json_hash'] = compute_json_hash(arch)
-        
+        # Hash is computed once, in perform_create
         return super().create(request, *args, **kwargs)
     
     def update(self, request, *args, **kwargs):
@@ -128,6 +191,10 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
             has_conflict, server_hash, last_updated = self._check_hash_conflict(instance, client_hash)
             
             if has_conflict:
+                diverged = None
+                if isinstance(request.data.get('architecture_json'), dict):
+                    incoming = compute_digest(request.data['architecture_json'])
+                    diverged = diff_hashes(stored_digest(instance).nodes, incoming.nodes)
                 return Response({
                     'error': 'Conflict detected',
                     'detail': 'Repository was modified by another session',
@@ -135,6 +202,7 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
                     'client_hash': client_hash if isinstance(client_hash, str) else compute_json_hash(client_hash),
                     'last_updated': last_updated.isoformat(),
                     'your_timestamp': client_timestamp,
+                    'diverged_nodes': diverged,
                     'resolution_options': [
                         'GET /api/repositories/{id}/ to fetch latest',
                         'PUT with force=true to overwrite',
@@ -142,12 +210,7 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
                     ]
                 }, status=status.HTTP_409_CONFLICT)
         
-        # Compute new hash if architecture changed
-        if 'architecture_json' in request.data:
-            arch = request.data['architecture_json']
-            request.data['json_hash'] = compute_json_hash(arch)
-            request.data['last_synced_at'] = timezone.now().isoformat()
-        
+        # Hash is computed once, in perform_update
         return super().update(request, *args, **kwargs)
     
     @action(detail=True, methods=['post'])
@@ -161,39 +224,159 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
         # Skip hash check, just update
         if 'architecture_json' in request.data:
             arch = request.data['architecture_json']
+            if not isinstance(arch, dict):
+                return Response({'error': 'Architecture must be a JSON object'}, status=400)
+            digest = compute_digest(arch)
+            enforce(arch, digest.root)
+            previous_hash = instance.json_hash
             instance.architecture_json = arch
-            instance.json_hash = compute_json_hash(arch)
+            instance.json_hash = digest.root
             instance.last_synced_at = timezone.now()
-            instance.save()
+            with transaction.atomic():
+                instance.save()
+                sync_architecture_tables(instance, digest)
+                revision, created = record_revision(instance, arch, digest, 'FORCE_UPDATE', request.user)
+                publish_change(instance, 'FORCE_UPDATE', previous_hash, request.user)
             
             # Log forced update
-            AuditLog.objects.create(
+            audit_log(
                 user=request.user,
                 action='FORCE_UPDATE',
                 resource_type='repository',
                 resource_name=instance.name,
-                details={'override': True}
+                details={'override': True, 'revision': revision.number}
             )
             
+            # The overwritten state stays restorable as the previous revision;
+            # when the content did not change it is the current one
+            previous_revision = revision.number - 1 if created else revision.number
             return Response({
                 'id': instance.id,
                 'hash': instance.json_hash,
                 'updated_at': instance.updated_at.isoformat(),
-                'forced': True
+                'forced': True,
+                'revision': revision.number,
+                'revision_created': created,
+                'previous_revision': previous_revision or None
             })
         
         return Response({'error': 'No architecture_json provided'}, status=400)
     
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['patch'], url_path='patch')
+    def patch_architecture(self, request, pk=None):
+        """
+        Apply JSON Patch operations to architecture_json.
+        PATCH /api/repositories/{id}/patch/
+        
+        Body: {"base_hash": "<json_hash>", "operations": [
+            {"op": "replace", "path": "/nodes/fv_1/x", "value": 420},
+            {"op": "add", "path": "/edges/-", "value": {"from": "entity_1", "to": "fv_1"}}
+        ]}
+        base_hash (or an If-Match header with the hash or any repository
+        ETag) is required and must equal the current json_hash, otherwise
+        nothing is applied: 409 for a stale base_hash, 412 for a stale
+        If-Match.
+        """
+        serializer = ArchitecturePatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        base_hash = serializer.validated_data.get('base_hash')
+        from_header = not base_hash
+        if from_header:
+            base_hash = if_match_hash(request)
+        if not base_hash:
+            return Response({
+                'error': 'Precondition required',
+                'detail': 'Send base_hash (or If-Match) with the json_hash your edits are based on'
+            }, status=status.HTTP_428_PRECONDITION_REQUIRED)
+        
+        instance = self.get_object()
+        operations = serializer.validated_data['operations']
+        
+        with transaction.atomic():
+            # Lock the row so the hash check and the write see the same state
+            instance = FeastRepository.objects.select_for_update().get(pk=instance.pk)
+            
+            if base_hash != instance.json_hash:
+                return Response({
+                    'error': 'Conflict detected',
+                    'detail': 'Repository was modified by another session',
+                    'server_hash': instance.json_hash,
+                    'client_hash': base_hash,
+                    'last_updated': instance.updated_at.isoformat(),
+                    'resolution_options': [
+                        'GET /api/repositories/{id}/ to fetch latest',
+                        'Rebase your operations and PATCH again'
+                    ]
+                }, status=status.HTTP_412_PRECONDITION_FAILED if from_header else status.HTTP_409_CONFLICT)
+            
+            try:
+                arch = apply_patch(instance.architecture_json, operations)
+            except PatchError as e:
+                return Response({'error': 'Invalid patch', 'detail': str(e)}, status=400)
+            
+            if not isinstance(arch, dict):
+                return Response({'error': 'Invalid patch', 'detail': 'Architecture must be a JSON object'}, status=400)
+            
+            # Re-hash only the nodes the operations touched
+            touched, edges_touched = affected_nodes(operations)
+            digest = None
+            if touched is not None:
+                digest = update_digest(arch, stored_digest(instance), touched, edges_touched)
+            if digest is None:
+                digest, touched, edges_touched = compute_digest(arch), None, True
+            enforce(arch, digest.root)
+            
+            previous_hash = instance.json_hash
+            instance.architecture_json = arch
+            instance.json_hash = digest.root
+            instance.last_synced_at = timezone.now()
+            instance.save(update_fields=['architecture_json', 'json_hash', 'last_synced_at', 'updated_at'])
+            sync_architecture_tables(instance, digest, touched_nodes=touched, edges_touched=edges_touched)
+            revision, _ = record_revision(instance, arch, digest, 'PATCH', request.user)
+            publish_change(instance, 'PATCH', previous_hash, request.user)
+            
+            audit_log(
+                user=request.user,
+                action='PATCH',
+                resource_type='repository',
+                resource_name=instance.name,
+                details={'hash': instance.json_hash, 'previous_hash': previous_hash, 'operations': len(operations)}
+            )
+        
+        return Response({
+            'id': instance.id,
+            'hash': instance.json_hash,
+            'previous_hash': previous_hash,
+            'updated_at': instance.updated_at.isoformat(),
+            'applied': len(operations),
+            'revision': revision.number
+        })
+    
+    @action(detail=True, methods=['get', 'post'])
     def check_status(self, request, pk=None):
         """
         Get repository status including hash for comparison.
-        GET /api/repositories/{id}/check_status/
+        GET /api/repositories/{id}/check_status/?include_hashes=true
+        POST /api/repositories/{id}/check_status/  {"client_hash": ..., "node_hashes": {id: hash}}
+        
+        include_hashes returns the per-node/per-edge content hashes; posting
+        node_hashes returns which nodes were added, removed or changed.
+        
+        GET/HEAD honour If-None-Match/If-Modified-Since; a 304 or a HEAD
+        costs one lookup of json_hash and updated_at. architecture_json is
+        never loaded here.
         """
-        instance = self.get_object()
+        instance = self._get_object_fields('name', 'json_hash', 'updated_at', 'last_synced_at', 'node_count', 'edge_count')
+        etag, last_modified = repository_validators(instance, 'status')
+        if request.method in ('GET', 'HEAD'):
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            if request.method == 'HEAD':
+                return set_validators(Response(), etag, last_modified)
         
-        # Get client's hash from query param
-        client_hash = request.query_params.get('client_hash')
+        # Get client's hash from query param (or body for POST)
+        client_hash = request.query_params.get('client_hash') or request.data.get('client_hash')
         
         response_data = {
             'id': instance.id,
@@ -202,8 +385,8 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
             'last_updated': instance.updated_at.isoformat(),
             'server_hash': instance.json_hash,
             'last_synced_at': instance.last_synced_at.isoformat() if instance.last_synced_at else None,
-            'node_count': instance.get_node_count(),
-            'edge_count': instance.get_edge_count()
+            'node_count': instance.node_count,
+            'edge_count': instance.edge_count
         }
         
         if client_hash:
@@ -215,7 +398,17 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
         else:
             response_data['status'] = 'unknown'  # No client hash to compare
         
-        return Response(response_data)
+        client_nodes = request.data.get('node_hashes')
+        include_hashes = request.query_params.get('include_hashes', 'false').lower() == 'true'
+        if include_hashes or isinstance(client_nodes, dict):
+            digest = stored_digest(instance)
+            if include_hashes:
+                response_data['node_hashes'] = digest.nodes
+                response_data['edge_hashes'] = digest.edge_map()
+            if isinstance(client_nodes, dict):
+                response_data['diverged_nodes'] = diff_hashes(client_nodes, digest.nodes)
+        
+        return set_validators(Response(response_data), etag, last_modified)
     
     @action(detail=False, methods=['get'])
     def check_name(self, request):
@@ -236,7 +429,7 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
                 'id': existing.id,
                 'created_at': existing.created_at.isoformat(),
                 'updated_at': existing.updated_at.isoformat(),
-                'owner': existing.created_by.username if existing.created_by else None,
+                'owner': existing.created_by_username,
                 'available': False
             })
         
@@ -246,16 +439,175 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
             'available': True
         })
     
-    def perform_create(self, serializer):
-        repo = serializer.save(created_by=self.request.user)
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over nodes in all of the user's repositories:
+        names, descriptions, tags, feature names, column security and details.
+        GET /api/repositories/search/?q=payment_to_income_ratio&type=featureview&limit=20
+        """
+        query = (request.query_params.get('q') or '').strip()
+        if not query:
+            return Response({'error': 'q parameter required'}, status=400)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=400)
         
-        # Compute and save hash
-        if repo.architecture_json:
-            repo.json_hash = compute_json_hash(repo.architecture_json)
-            repo.last_synced_at = timezone.now()
-            repo.save(update_fields=['json_hash', 'last_synced_at'])
+        backend, results = search_nodes(request.user, query, request.query_params.get('type'), limit)
+        return Response({'query': query, 'backend': backend, 'count': len(results), 'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def catalog_stats(self, request):
+        """
+        Hit/miss counters of the repository catalog cache (this process).
+        GET /api/repositories/catalog_stats/
+        """
+        return Response(catalog.stats())
+    
+    def _get_revision(self, repo, number):
+        return get_object_or_404(ArchitectureRevision, repository=repo, number=number)
+    
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, pk=None):
+        """
+        Revision history, newest first.
+        GET /api/repositories/{id}/revisions/?limit=50&before=<number>
+        """
+        repo = self._get_object_fields('name')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+        except ValueError:
+            return Response({'error': 'limit and before must be integers'}, status=400)
+        
+        queryset = repo.revisions.select_related('user').defer('node_changes', 'edge_changes', 'order')
+        if before is not None:
+            queryset = queryset.filter(number__lt=before)
+        revisions = list(queryset[:limit])
+        return Response({
+            'repository_id': repo.id,
+            'revisions': ArchitectureRevisionSerializer(revisions, many=True).data,
+            'next_before': revisions[-1].number if len(revisions) == limit else None
+        })
+    
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<number>\d+)')
+    def revision(self, request, pk=None, number=None):
+        """
+        One revision with its architecture rebuilt from stored blobs.
+        GET /api/repositories/{id}/revisions/{number}/
+        """
+        repo = self._get_object_fields('name')
+        revision = self._get_revision(repo, number)
+        try:
+            architecture = build_architecture(load_manifest(revision))
+        except RevisionError as e:
+            return Response({'error': 'Revision could not be rebuilt', 'detail': str(e)},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        data = ArchitectureRevisionSerializer(revision).data
+        data['architecture_json'] = architecture
+        return Response(data)
+    
+    @action(detail=True, methods=['get'], url_path='revisions/diff')
+    def diff_revisions(self, request, pk=None):
+        """
+        Nodes/edges that differ between two revisions (hashes only, no bodies).
+        GET /api/repositories/{id}/revisions/diff/?from=3&to=7
+        to defaults to the latest revision.
+        """
+        repo = self._get_object_fields('name')
+        from_number = request.query_params.get('from')
+        to_number = request.query_params.get('to')
+        if not from_number or not from_number.isdigit() or (to_number and not to_number.isdigit()):
+            return Response({'error': 'from (and optional to) must be revision numbers'}, status=400)
         
-        AuditLog.objects.create(
+        old = self._get_revision(repo, from_number)
+        new = self._get_revision(repo, to_number) if to_number else repo.revisions.first()
+        return Response(diff_revisions(old, new))
+    
+    @action(detail=True, methods=['post'], url_path=r'revisions/(?P<number>\d+)/restore')
+    def restore_revision(self, request, pk=None, number=None):
+        """
+        Restore architecture_json to an earlier revision (as a new revision).
+        POST /api/repositories/{id}/revisions/{number}/restore/  {"client_hash": ...}
+        A client_hash that is not the current json_hash gets 409.
+        """
+        serializer = RevisionRestoreSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        client_hash = serializer.validated_data.get('client_hash')
+        
+        repo = self._get_object_fields('name')
+        revision = self._get_revision(repo, number)
+        try:
+            arch = build_architecture(load_manifest(revision))
+        except RevisionError as e:
+            return Response({'error': 'Revision could not be rebuilt', 'detail': str(e)},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        digest = compute_digest(arch)
+        
+        with transaction.atomic():
+            instance = FeastRepository.objects.select_for_update().get(pk=repo.pk)
+            if client_hash and client_hash != instance.json_hash:
+                return Response({
+                    'error': 'Conflict detected',
+                    'detail': 'Repository was modified by another session',
+                    'server_hash': instance.json_hash,
+                    'client_hash': client_hash,
+                    'last_updated': instance.updated_at.isoformat()
+                }, status=status.HTTP_409_CONFLICT)
+            
+            previous_hash = instance.json_hash
+            instance.architecture_json = arch
+            instance.json_hash = digest.root
+            instance.last_synced_at = timezone.now()
+            instance.save(update_fields=['architecture_json', 'json_hash', 'last_synced_at', 'updated_at'])
+            sync_architecture_tables(instance, digest)
+            message = serializer.validated_data.get('message') or f'Restored revision {revision.number}'
+            new_revision, _ = record_revision(instance, arch, digest, 'RESTORE', request.user, message)
+            publish_change(instance, 'RESTORE', previous_hash, request.user)
+            
+            audit_log(
+                user=request.user,
+                action='RESTORE',
+                resource_type='repository',
+                resource_name=instance.name,
+                details={'hash': instance.json_hash, 'previous_hash': previous_hash,
+                         'restored_revision': revision.number, 'revision': new_revision.number}
+            )
+        
+        return Response({
+            'id': instance.id,
+            'hash': instance.json_hash,
+            'previous_hash': previous_hash,
+            'restored_revision': revision.number,
+            'revision': new_revision.number,
+            'updated_at': instance.updated_at.isoformat()
+        })
+    
+    def _hash_fields(self, serializer):
+        """
+        Hash the validated architecture so it is saved in the same write.
+        Returns (digest, extra save kwargs); digest is None if no architecture.
+        """
+        if 'architecture_json' not in serializer.validated_data:
+            return None, {}
+        digest = compute_digest(serializer.validated_data['architecture_json'])
+        enforce(serializer.validated_data['architecture_json'], digest.root)
+        return digest, {
+            'json_hash': digest.root,
+            'last_synced_at': timezone.now()
+        }
+    
+    def perform_create(self, serializer):
+        digest, hash_fields = self._hash_fields(serializer)
+        with transaction.atomic():
+            repo = serializer.save(created_by=self.request.user, **hash_fields)
+            sync_architecture_tables(repo, digest)
+            if digest is not None:
+                record_revision(repo, repo.architecture_json, digest, 'CREATE', self.request.user)
+        
+        audit_log(
             user=self.request.user,
             action='CREATE',
             resource_type='repository',
@@ -265,15 +617,16 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
         return repo
     
     def perform_update(self, serializer):
-        repo = serializer.save()
-        
-        # Update hash and sync time
-        if 'architecture_json' in self.request.data:
-            repo.json_hash = compute_json_hash(repo.architecture_json)
-            repo.last_synced_at = timezone.now()
-            repo.save(update_fields=['json_hash', 'last_synced_at'])
+        digest, hash_fields = self._hash_fields(serializer)
+        previous_hash = serializer.instance.json_hash
+        with transaction.atomic():
+            repo = serializer.save(**hash_fields)
+            if digest is not None:
+                sync_architecture_tables(repo, digest)
+                record_revision(repo, repo.architecture_json, digest, 'UPDATE', self.request.user)
+            publish_change(repo, 'UPDATE', previous_hash, self.request.user)
         
-        AuditLog.objects.create(
+        audit_log(
             user=self.request.user,
             action='UPDATE',
             resource_type='repository',
@@ -281,10 +634,155 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
             details={'hash': repo.json_hash}
         )
         return repo
+
+    def perform_destroy(self, instance):
+        # DELETE is durable: the audit row commits or rolls back with the delete
+        with transaction.atomic():
+            details = {'id': instance.id, 'hash': instance.json_hash}
+            instance.delete()
+            audit_log(
+                user=self.request.user,
+                action='DELETE',
+                resource_type='repository',
+                resource_name=instance.name,
+                details=details
+            )
+
+    def _get_lineage(self):
+        """(repo, LineageGraph); architecture_json is only read on a cache miss."""
+        repo = self._get_object_fields('name', 'json_hash')
+        graph = lineage_cache.get(
+            repo.json_hash,
+            lambda: FeastRepository.objects.values_list('architecture_json', flat=True).get(pk=repo.pk)
+        )
+        return repo, graph
+    
+    def _lineage_depth(self, request):
+        depth = request.query_params.get('depth')
+        if depth is None or depth == '':
+            return None
+        depth = int(depth)
+        if depth < 1:
+            raise ValueError('depth must be >= 1')
+        return depth
+    
+    def _lineage_response(self, repo, data):
+        return Response({'repository_id': repo.id, 'hash': repo.json_hash, **data})
+    
+    @action(detail=True, methods=['get'])
+    def lineage(self, request, pk=None):
+        """
+        Whole lineage graph: roots, sinks and downstream adjacency by node id.
+        GET /api/repositories/{id}/lineage/
+        """
+        repo, graph = self._get_lineage()
+        return self._lineage_response(repo, graph.summary())
+    
+    def _lineage_closure(self, request, direction):
+        repo, graph = self._get_lineage()
+        ref = request.query_params.get('node')
+        if not ref:
+            return Response({'error': 'node parameter required'}, status=400)
+        try:
+            depth = self._lineage_depth(request)
+        except ValueError as e:
+            return Response({'error': 'Invalid depth', 'detail': str(e)}, status=400)
+        index = graph.resolve(ref)
+        if index is None:
+            return Response({'error': f"Node '{ref}' not found"}, status=404)
+        
+        closure = graph.upstream(index, depth) if direction == 'upstream' else graph.downstream(index, depth)
+        return self._lineage_response(repo, {'node': graph.node(index), direction: closure})
+    
+    @action(detail=True, methods=['get'], url_path='lineage/upstream')
+    def lineage_upstream(self, request, pk=None):
+        """
+        Everything the node is derived from, nearest first.
+        GET /api/repositories/{id}/lineage/upstream/?node=fv_1&depth=
+        node is a node id or exact node name.
+        """
+        return self._lineage_closure(request, 'upstream')
+    
+    @action(detail=True, methods=['get'], url_path='lineage/downstream')
+    def lineage_downstream(self, request, pk=None):
+        """
+        Everything derived from the node, nearest first.
+        GET /api/repositories/{id}/lineage/downstream/?node=entity_1&depth=
+        """
+        return self._lineage_closure(request, 'downstream')
+    
+    @action(detail=True, methods=['get'], url_path='lineage/paths')
+    def lineage_paths(self, request, pk=None):
+        """
+        Shortest data-flow paths.
+        GET /api/repositories/{id}/lineage/paths/?from=source_1&to=service_2
+        Without to, returns one path from `from` to each reachable service.
+        """
+        repo, graph = self._get_lineage()
+        start_ref = request.query_params.get('from')
+        end_ref = request.query_params.get('to')
+        if not start_ref:
+            return Response({'error': 'from parameter required'}, status=400)
+        start = graph.resolve(start_ref)
+        end = graph.resolve(end_ref) if end_ref else None
+        if start is None or (end_ref and end is None):
+            missing = start_ref if start is None else end_ref
+            return Response({'error': f"Node '{missing}' not found"}, status=404)
+        
+        if end is None:
+            paths = graph.paths_to_type(start, 'service')
+        else:
+            path = graph.path(start, end)
+            paths = [path] if path else []
+        return self._lineage_response(repo, {'from': graph.ids[start], 'to': end_ref and graph.ids[end], 'paths': paths})
+    
+    @action(detail=True, methods=['get'], url_path='lineage/impact')
+    def lineage_impact(self, request, pk=None):
+        """
+        Impact set of changing one or more nodes: all downstream nodes by type
+        and the services that would be affected.
+        GET /api/repositories/{id}/lineage/impact/?node=source_1&node=entity_2
+        """
+        repo, graph = self._get_lineage()
+        refs = request.query_params.getlist('node')
+        if not refs:
+            return Response({'error': 'node parameter required'}, status=400)
+        indexes = []
+        for ref in refs:
+            index = graph.resolve(ref)
+            if index is None:
+                return Response({'error': f"Node '{ref}' not found"}, status=404)
+            if index not in indexes:
+                indexes.append(index)
+        return self._lineage_response(repo, graph.impact(indexes))
+    
+    @action(detail=True, methods=['get'])
+    def viewport(self, request, pk=None):
+        """
+        Nodes inside a canvas bounding box, the edges touching them, and a
+        grid cluster summary of every node outside it.
+        GET /api/repositories/{id}/viewport/?x0=0&y0=0&x1=1600&y1=900&limit=2000&cell=400
+        """
+        repo = self._get_object_fields('json_hash')
+        params = request.query_params
+        try:
+            bbox = BBox.parse(params)
+            limit = min(max(int(params.get('limit', 2000)), 1), 5000)
+            cell = float(params['cell']) if params.get('cell') else None
+            if cell is not None and not (math.isfinite(cell) and cell > 0):
+                raise ValueError('cell must be a finite number > 0')
+        except ValueError as e:
+            return Response({'error': 'Invalid viewport', 'detail': str(e)}, status=400)
+        
+        return Response({'repository_id': repo.id, 'hash': repo.json_hash, **viewport(repo, bbox, limit, cell)})
     
     @action(detail=True, methods=['post'])
     def sync_datasources(self, request, pk=None):
-        """Sync data sources with hash tracking."""
+        """
+        Sync data sources with hash tracking.
+        Only sources whose columns actually changed are written; per-field
+        changes are reported under results.changes.
+        """
         repo = self.get_object()
         
         # Optional hash check
@@ -302,83 +800,58 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
         sources_data = serializer.validated_data['sources']
         dry_run = serializer.validated_data.get('dry_run', False)
         
-        results = {'created': [], 'updated': [], 'deleted': [], 'errors': []}
-        existing = {ds.name: ds for ds in repo.data_sources.all()}
-        incoming_names = set()
+        plan = plan_sync(repo, sources_data)
         
-        for src in sources_data:
-            name = src.get('name')
-            if not name:
-                results['errors'].append("Source missing name")
-                continue
-            
-            incoming_names.add(name)
-            
-            data = {
-                'kind': src.get('kind', 'postgres'),
-                'owned_by': src.get('ownedBy', repo.default_owner),
-                'access_process': src.get('accessProcess', ''),
-                'connection_string': src.get('details', {}).get('connection', ''),
-                'topic': src.get('details', {}).get('topic', ''),
-                'description': src.get('description', ''),
-                'tags': src.get('tags', []),
-                'pos_x': src.get('x', 100),
-                'pos_y': src.get('y', 100),
-                'column_security': src.get('columnSecurity', {}),
-                'feast_connection_type': self._infer_connection_type(src)
-            }
-            
-            if name in existing:
-                ds = existing[name]
-                for key, value in data.items():
-                    setattr(ds, key, value)
-                if not dry_run:
-                    ds.save()
-                results['updated'].append(name)
-            else:
-                if not dry_run:
-                    DataSource.objects.create(repository=repo, name=name, **data)
-                results['created'].append(name)
-        
-        for name, ds in existing.items():
-            if name not in incoming_names:
-                if not dry_run:
-                    ds.delete()
-                results['deleted'].append(name)
-        
-        # After successful sync, update hash if architecture provided
-        if not dry_run and 'architecture_json' in request.data:
-            repo.architecture_json = request.data['architecture_json']
-            repo.json_hash = compute_json_hash(repo.architecture_json)
-            repo.last_synced_at = timezone.now()
-            repo.save(update_fields=['architecture_json', 'json_hash', 'last_synced_at'])
+        if not dry_run:
+            previous_hash = repo.json_hash
+            architecture = serializer.validated_data.get('architecture_json')
+            if architecture is not None:
+                digest = compute_digest(architecture)
+                enforce(architecture, digest.root)
+            with transaction.atomic():
+                apply_sync(plan)
+                
+                # After successful sync, update hash if architecture provided
+                if architecture is not None:
+                    repo.architecture_json = architecture
+                    repo.json_hash = digest.root
+                    repo.last_synced_at = timezone.now()
+                    repo.save(update_fields=['architecture_json', 'json_hash', 'last_synced_at', 'updated_at'])
+                    sync_architecture_tables(repo, digest)
+                    record_revision(repo, repo.architecture_json, digest, 'SYNC', request.user)
+                elif plan.has_writes:
+                    # The nested data_sources changed: new detail ETag/Last-Modified
+                    repo.save(update_fields=['updated_at'])
+                publish_change(repo, 'SYNC', previous_hash, request.user)
         
         return Response({
             'dry_run': dry_run,
             'repository_id': repo.id,
-            'results': results,
+            'results': plan.results(),
             'new_hash': repo.json_hash if not dry_run else None,
-            'synced_at': repo.last_synced_at.isoformat() if not dry_run else None
+            'synced_at': repo.last_synced_at.isoformat() if not dry_run and repo.last_synced_at else None
         })
     
-    def _infer_connection_type(self, src):
-        """Infer Feast connection type from source config."""
-        kind = src.get('kind', '')
-        if kind == 'kafka':
-            return 'stream'
-        elif kind in ['dynamodb', 'redis']:
-            return 'push'
-        elif src.get('subtype') == 'on_demand':
-            return 'request'
-        return 'batch'
-    
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['get', 'post'])
     def export_json(self, request, pk=None):
-        """Export with hash verification option."""
-        repo = self.get_object()
+        """
+        Export with hash verification option.
+        GET/POST /api/repositories/{id}/export_json/?include_hash=true
         
+        The document is streamed (gzip when the client accepts it) with an
+        ETag derived from json_hash and updated_at (the export also carries
+        name, location and settings). A matching If-None-Match gets 304
+        without reading architecture_json or writing an audit row.
+        """
         include_hash = request.query_params.get('include_hash', 'true').lower() == 'true'
         
+        light = self._get_object_fields('json_hash', 'updated_at')
+        etag, _ = repository_validators(light, 'export' if include_hash else 'export-nohash')
+        if etag_matches(request, etag):
+            return not_modified_response(etag, None)
+        
+        repo = self.get_object()
+        
         export_data = {
             'repository': {
                 'id': repo.id,
@@ -396,7 +869,7 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
             export_data['server_hash'] = repo.json_hash
             export_data['last_updated'] = repo.updated_at.isoformat()
         
-        AuditLog.objects.create(
+        audit_log(
             user=request.user,
             action='EXPORT',
             resource_type='repository',
@@ -404,29 +877,98 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
             details={'hash': repo.json_hash}
         )
         
-        return Response(export_data)
+        # depth=3 splits export -> architecture -> nodes/edges into one piece per node
+        chunks = buffer_chunks(iter_encode(
+            export_data, depth=3, encoder=DjangoJSONEncoder(ensure_ascii=False)
+        ))
+        use_gzip = accepts_gzip(request)
+        if use_gzip:
+            chunks = gzip_chunks(chunks)
+        
+        response = StreamingHttpResponse(chunks, content_type='application/json')
+        response['ETag'] = etag
+        response['Vary'] = 'Accept-Encoding'
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def validate(self, request, pk=None):
+        """
+        Structural validation report (rule engine, no LLM), cached per json_hash.
+        GET /api/repositories/{id}/validate/
+        """
+        light = self._get_object_fields('name', 'json_hash')
+        report = validation_report(
+            light.json_hash,
+            lambda: FeastRepository.objects.values_list('architecture_json', flat=True).get(pk=light.pk)
+        )
+        return Response({'repository_id': light.id, 'hash': light.json_hash, **report})
+    
+    @action(detail=True, methods=['get'])
+    def generate_code(self, request, pk=None):
+        """
+        Complete Feast feature repo for the architecture, as a zip.
+        GET /api/repositories/{id}/generate_code/
+        
+        Archives are cached per json_hash (plus name/location), so repeated
+        downloads of an unchanged repository don't read architecture_json;
+        a matching If-None-Match gets 304.
+        """
+        light = self._get_object_fields('name', 'location', 'json_hash')
+        key = cache_key(light.json_hash, light.name, light.location)
+        etag = make_etag(light.json_hash, f'feast-repo-{key[-12:]}')
+        if etag_matches(request, etag):
+            return not_modified_response(etag, None)
+        
+        data = cached_zip(key)
+        if data is not None:
+            response = HttpResponse(data, content_type='application/zip')
+        else:
+            architecture = FeastRepository.objects.values_list('architecture_json', flat=True).get(pk=light.pk)
+            files = generate_feature_repo(architecture, light.name, light.location)
+            response = StreamingHttpResponse(iter_zip_cached(key, files), content_type='application/zip')
+        
+        audit_log(
+            user=request.user,
+            action='EXPORT',
+            resource_type='repository',
+            resource_name=light.name,
+            details={'hash': light.json_hash, 'format': 'feast_repo', 'cached': data is not None}
+        )
+        
+        response['Content-Disposition'] = f'attachment; filename="{project_name(light.name)}_feature_repo.zip"'
+        response['ETag'] = etag
+        return response
     
     @action(detail=False, methods=['post'])
     def import_json(self, request):
-        """Import with duplicate detection and hash verification."""
+        """
+        Import with duplicate detection and hash verification.
+        The upload is parsed incrementally (see importer.py), so large
+        exports are never read into memory as one string.
+        """
         if 'file' not in request.FILES:
             return Response({'error': 'No file provided'}, status=400)
         
         file = request.FILES['file']
+        file.seek(0)
         try:
-            data = json.loads(file.read())
-        except json.JSONDecodeError as e:
+            document = read_import(file)
+        except JSONStreamError as e:
             return Response({'error': f'Invalid JSON: {str(e)}'}, status=400)
         
         # Check for hash in imported file
-        import_hash = data.get('server_hash') or data.get('hash')
-        repo_data = data.get('repository', {})
+        import_hash = document.import_hash
+        repo_data = document.repository
         name = repo_data.get('name', 'Imported Repository')
+        digest = compute_digest(document.architecture)
+        enforce(document.architecture, digest.root)
         
         # Check for existing with same name
         existing = self._check_repository_exists(name)
         if existing:
-            if import_hash and import_hash == existing.json_hash:
+            if existing.json_hash in (import_hash, digest.root):
                 return Response({
                     'error': 'Repository already exists with identical content',
                     'existing_id': existing.id,
@@ -442,37 +984,26 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
                 'suggestion': 'Rename the import or update existing'
             }, status=status.HTTP_409_CONFLICT)
         
-        # Create new
+        # Create new (the stored hash is always recomputed, import_hash may use an older scheme)
         with transaction.atomic():
             repo = FeastRepository.objects.create(
                 name=name,
                 location=repo_data.get('location', '/opt/feast/feature_repo'),
-                default_owner=repo_data.get('default_owner', 'Data Platform Team'),
+                description=repo_data.get('description', ''),
+                default_owner=repo_data.get('default_owner') or repo_data.get('defaultOwner') or 'Data Platform Team',
                 settings=repo_data.get('settings', {}),
-                architecture_json=data.get('architecture', {}),
-                json_hash=import_hash or compute_json_hash(data.get('architecture', {})),
+                architecture_json=document.architecture,
+                json_hash=digest.root,
                 last_synced_at=timezone.now(),
                 created_by=request.user
             )
+            sync_architecture_tables(repo, digest)
+            record_revision(repo, document.architecture, digest, 'IMPORT', request.user)
             
-            # Create data sources from architecture
-            nodes = data.get('architecture', {}).get('nodes', {})
-            for node_id, node in nodes.items():
-                if node.get('type') == 'datasource':
-                    DataSource.objects.create(
-                        repository=repo,
-                        name=node.get('name', 'Unknown'),
-                        kind=node.get('kind', 'postgres'),
-                        owned_by=node.get('ownedBy', repo.default_owner),
-                        access_process=node.get('accessProcess', ''),
-                        description=node.get('description', ''),
-                        tags=node.get('tags', []),
-                        pos_x=node.get('x', 100),
-                        pos_y=node.get('y', 100),
-                        column_security=node.get('columnSecurity', {})
-                    )
-        
-        AuditLog.objects.create(
+            # Data sources and entities from architecture, in batched inserts
+            create_rows(repo, document)
+        
+        audit_log(
             user=request.user,
             action='IMPORT',
             resource_type='repository',
@@ -488,9 +1019,34 @@ class FeastRepositoryViewSet(viewsets.ModelViewSet):
         }, status=201)
 
 
-class DataSourceViewSet(viewsets.ModelViewSet):
+class RepositoryChildMixin:
+    """
+    Rows nested in the repository detail: every write bumps the
+    repository's updated_at so conditional GETs of the detail see it.
+    """
+    
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save()
+            FeastRepository.touch(instance.repository_id)
+    
+    def perform_update(self, serializer):
+        previous_repository = serializer.instance.repository_id
+        with transaction.atomic():
+            instance = serializer.save()
+            for repository_id in {previous_repository, instance.repository_id}:
+                FeastRepository.touch(repository_id)
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            FeastRepository.touch(instance.repository_id)
+
+
+class DataSourceViewSet(RepositoryChildMixin, viewsets.ModelViewSet):
     serializer_class = DataSourceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NamePagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['kind', 'feast_connection_type', 'repository']
     search_fields = ['name', 'description', 'connection_string']
@@ -500,12 +1056,13 @@ class DataSourceViewSet(viewsets.ModelViewSet):
         repo_id = self.request.query_params.get('repository')
         if repo_id:
             queryset = queryset.filter(repository_id=repo_id)
-        return queryset.select_related('repository')
+        return queryset
 
 
-class EntityViewSet(viewsets.ModelViewSet):
+class EntityViewSet(RepositoryChildMixin, viewsets.ModelViewSet):
     serializer_class = EntitySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NamePagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['repository']
     search_fields = ['name', 'description']
@@ -515,18 +1072,162 @@ class EntityViewSet(viewsets.ModelViewSet):
         repo_id = self.request.query_params.get('repository')
         if repo_id:
             queryset = queryset.filter(repository_id=repo_id)
-        return queryset.select_related('repository')
+        return queryset
+
+
+class ArchitectureNodeViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Indexed node rows derived from architecture_json.
+    GET /api/nodes/?node_type=featureview
+    """
+    serializer_class = ArchitectureNodeSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['repository', 'node_type', 'node_id']
+    search_fields = ['name', 'node_id']
+    
+    def get_queryset(self):
+        return ArchitectureNode.objects.filter(
+            repository__created_by=self.request.user
+        ).select_related('repository')
+
+
+class ArchitectureEdgeViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Indexed edge rows derived from architecture_json.
+    GET /api/edges/?repository=1&to_node=service_1
+    """
+    serializer_class = ArchitectureEdgeSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['repository', 'from_node', 'to_node']
+    
+    def get_queryset(self):
+        return ArchitectureEdge.objects.filter(
+            repository__created_by=self.request.user
+        ).select_related('repository')
+
+
+class FeatureCatalogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Cross-repository feature catalog, one row per feature of each feature view.
+    GET /api/features/?prefix=payment_&limit=20
+    GET /api/features/?feature=payment_to_income_ratio&repository=1
+    """
+    serializer_class = FeatureCatalogEntrySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FeatureCatalogPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['repository', 'dtype', 'feature_view']
+    
+    def get_queryset(self):
+        queryset = FeatureCatalogEntry.objects.filter(
+            repository__created_by=self.request.user
+        ).select_related('repository').defer('repository__architecture_json', 'repository__settings')
+        
+        feature = self.request.query_params.get('feature')
+        prefix = self.request.query_params.get('prefix')
+        if feature:
+            queryset = queryset.filter(feature_key=feature.lower())
+        elif prefix:
+            queryset = prefix_range(queryset, prefix)
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Where a feature is defined and which services consume it.
+        GET /api/features/lookup/?name=payment_to_income_ratio
+        """
+        name = request.query_params.get('name')
+        if not name:
+            return Response({'error': 'name parameter required'}, status=400)
+        
+        entries = list(self.get_queryset().filter(feature_key=name.lower())[:500])
+        return Response({
+            'feature': name,
+            'definitions': FeatureCatalogEntrySerializer(entries, many=True).data,
+            'repositories': sorted({entry.repository.name for entry in entries}),
+            'consumers': [
+                {'repository': repository, 'service': service}
+                for repository, service in sorted({
+                    (entry.repository.name, service) for entry in entries for service in entry.services
+                })
+            ]
+        })
 
 
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AuditLogPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['action', 'resource_type']
     ordering_fields = ['timestamp']
+    ordering = ['-timestamp', '-id']
     
     def get_queryset(self):
         return AuditLog.objects.filter(user=self.request.user)
+    
+    def _time_range(self, request, parse):
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        start = parse(start) if start else None
+        end = parse(end) if end else None
+        if (request.query_params.get('start') and start is None) or (request.query_params.get('end') and end is None):
+            raise ValueError('start/end could not be parsed')
+        # Datetimes without an offset are in the server's time zone, like Django's own forms
+        start, end = (
+            timezone.make_aware(value) if isinstance(value, datetime) and timezone.is_naive(value) else value
+            for value in (start, end)
+        )
+        return start, end
+    
+    @action(detail=False, methods=['get'])
+    def rollups(self, request):
+        """
+        Daily per-action counts of archived rows.
+        GET /api/audit-logs/rollups/?start=2026-01-01&end=2026-02-01&action=EXPORT
+        """
+        try:
+            start, end = self._time_range(request, parse_date)
+        except ValueError as e:
+            return Response({'error': 'Invalid date range', 'detail': str(e)}, status=400)
+        
+        queryset = AuditLogRollup.objects.filter(user=request.user)
+        if start:
+            queryset = queryset.filter(day__gte=start)
+        if end:
+            queryset = queryset.filter(day__lt=end)
+        if request.query_params.get('action'):
+            queryset = queryset.filter(action=request.query_params['action'])
+        return Response(AuditLogRollupSerializer(queryset[:1000], many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def archive(self, request):
+        """
+        Raw rows moved to the cold archive, oldest first.
+        GET /api/audit-logs/archive/?start=2026-01-01T00:00:00Z&end=...&action=&limit=500
+        start is required so only overlapping segments are read.
+        """
+        try:
+            start, end = self._time_range(request, parse_datetime)
+            limit = min(max(int(request.query_params.get('limit', 500)), 1), 5000)
+        except ValueError as e:
+            return Response({'error': 'Invalid parameters', 'detail': str(e)}, status=400)
+        if start is None:
+            return Response({'error': 'start parameter required'}, status=400)
+        
+        rows = []
+        for row in iter_archived(start, end, user_id=request.user.id, action=request.query_params.get('action')):
+            rows.append(row)
+            if len(rows) > limit:
+                break
+        return Response({
+            'results': rows[:limit],
+            'truncated': len(rows) > limit,
+            'next_start': rows[limit]['timestamp'] if len(rows) > limit else None
+        })
 
 
 class LLMChatSessionViewSet(viewsets.ModelViewSet):
@@ -534,6 +1235,7 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
     API endpoint for LLM chat sessions with proper response handling.
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = ChatSessionPagination
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -546,10 +1248,14 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
         return LLMChatSession.objects.filter(
             user=self.request.user,
             is_active=True
-        ).select_related('repository')
+        ).select_related('repository').defer('repository__architecture_json', 'repository__settings')
     
     def create(self, request, *args, **kwargs):
-        """Override create to handle initial LLM message."""
+        """
+        Override create to handle initial LLM message.
+        In background mode the answer is produced by a job: 202 with the
+        session and a 'job' to poll or stream.
+        """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -559,6 +1265,12 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
             # Re-fetch with messages for response
             session.refresh_from_db()
             response_serializer = LLMChatSessionDetailSerializer(session)
+            job = getattr(session, '_job', None)
+            if job is not None:
+                return Response(
+                    {**response_serializer.data, 'job': LLMJobSerializer(job).data},
+                    status=status.HTTP_202_ACCEPTED
+                )
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -603,9 +1315,14 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
         
         # Handle initial message
         initial_msg = validated.get('initial_message', '')
+        query_type = validated.get('query_type', 'default')
         if initial_msg:
             try:
-                self._send_to_llm(session, initial_msg, validated.get('query_type', 'default'))
+                if getattr(settings, 'FEAST_LLM_BACKGROUND', True):
+                    session._job = job_runner.submit(session, initial_msg, query_type)
+                else:
+                    user_msg = chat.save_user_message(session, initial_msg, query_type)
+                    chat.send(session, user_msg, query_type)
             except Exception as e:
                 logger.error(f"LLM initial message failed: {str(e)}")
                 # Don't fail session creation, just log the error
@@ -618,83 +1335,70 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
         
         return session
     
-    def _send_to_llm(self, session, message, query_type):
+    def _stream_events(self, session, message, query_type, use_cache=True):
         """
-        Send message to Groq and save response.
-        Returns the result dict for API responses.
+        SSE events of a streaming turn run in this request: 'start', one
+        'token' per chunk, then 'done' or 'error'. Errors before the first
+        token raise here instead.
         """
-        # Save user message
-        user_msg = LLMMessage.objects.create(
-            session=session,
-            role='user',
-            content=message,
-            query_type=query_type
-        )
+        user_msg = chat.save_user_message(session, message, query_type)
+        assistant_msg, stream = chat.open_stream(session, user_msg, query_type, use_cache)
         
-        # Build context
-        context = LLMContext(
-            repo_name=session.context_json.get('repo_name', 'Unknown'),
-            node_count=session.context_json.get('node_count', 0),
-            edge_count=session.context_json.get('edge_count', 0)
-        )
+        def events():
+            yield _sse('start', {'session_id': session.id, 'message_id': assistant_msg.id, 'query_type': query_type})
+            try:
+                for event in stream:
+                    if 'delta' in event:
+                        yield _sse('token', {'text': event['delta']})
+                    else:
+                        yield _sse('done', {
+                            'success': True,
+                            **chat.reply_summary(assistant_msg, event),
+                            'session_id': session.id,
+                            'message_count': session.messages.count()
+                        })
+            except Exception as e:
+                yield _sse('error', {
+                    'success': False,
+                    'error': str(e),
+                    'detail': 'LLM stream interrupted. The partial answer was saved.'
+                })
+                return
+            # Summarizing may call the LLM again; keep it off the response
+            job_runner.compact_later(session)
         
-        # Call LLM
-        try:
-            client = GroqLLMClient()
-            result = client.query(
-                message=message,
-                context=context,
-                query_type=query_type,
-                stream=False
-            )
-            
-            # Save assistant response
-            assistant_msg = LLMMessage.objects.create(
-                session=session,
-                role='assistant',
-                content=result['response'],
-                query_type=query_type,
-                prompt_tokens=result['usage']['prompt_tokens'],
-                completion_tokens=result['usage']['completion_tokens'],
-                total_tokens=result['usage']['total_tokens'],
-                model=result['model']
-            )
-            
-            # Update session timestamp
-            session.save(update_fields=['updated_at'])
-            
-            logger.info(f"LLM response saved: session={session.id}, tokens={result['usage']['total_tokens']}")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"LLM query failed: {str(e)}")
-            
-            # Save error as system message
-            LLMMessage.objects.create(
-                session=session,
-                role='system',
-                content=f'Error: {str(e)}',
-                query_type='error'
-            )
-            raise
+        return events()
     
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
         """
         Send message to existing chat session.
         POST /api/chats/{id}/send_message/
+        
+        With FEAST_LLM_BACKGROUND (default) the turn runs as a job: 202 with
+        the job id, poll_url and stream_url; 429/503 when the user or the
+        queue is at its limit. Otherwise the answer is returned directly,
+        or with "stream": true as server-sent events (start, token...,
+        done | error) as it is generated.
         """
         session = self.get_object()
         serializer = LLMQuerySerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        message = serializer.validated_data['message']
+        query_type = serializer.validated_data.get('query_type', 'default')
+        use_cache = serializer.validated_data['cache']
+        
+        if getattr(settings, 'FEAST_LLM_BACKGROUND', True):
+            job = job_runner.submit(session, message, query_type, use_cache)
+            return Response(LLMJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
         
         try:
-            result = self._send_to_llm(
-                session,
-                serializer.validated_data['message'],
-                serializer.validated_data.get('query_type', 'default')
-            )
+            if serializer.validated_data['stream']:
+                return _sse_response(request, self._stream_events(session, message, query_type, use_cache))
+            
+            user_msg = chat.save_user_message(session, message, query_type)
+            result = chat.send(session, user_msg, query_type, use_cache)
+            job_runner.compact_later(session)
             
             # Return just the response data (not full session)
             return Response({
@@ -703,6 +1407,7 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
                 'usage': result['usage'],
                 'model': result['model'],
                 'query_type': result['query_type'],
+                'cached': result['cached'],
                 'session_id': session.id,
                 'message_count': session.messages.count()
             })
@@ -718,6 +1423,33 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
     
+    @action(detail=True, methods=['get'])
+    def context(self, request, pk=None):
+        """
+        Conversation context the next turn will send: rolling summary and
+        the recent messages that fit FEAST_LLM_CONTEXT_BUDGET.
+        GET /api/chats/{id}/context/
+        """
+        session = self.get_object()
+        history = context_windows.history(session)
+        return Response({
+            'session_id': session.id,
+            'summary': session.summary,
+            'summary_through': session.summary_through,
+            'summary_tokens': session.summary_tokens,
+            'budget': getattr(settings, 'FEAST_LLM_CONTEXT_BUDGET', 3000),
+            'estimated_tokens': sum(estimate_tokens(m['content']) for m in history),
+            'messages': history
+        })
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the LLM response cache (this process).
+        GET /api/chats/cache_stats/
+        """
+        return Response(response_cache.stats())
+    
     @action(detail=True, methods=['post'])
     def archive(self, request, pk=None):
         """Archive (soft delete) chat session."""
@@ -734,6 +1466,202 @@ class LLMChatSessionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class LLMJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Background chat turns of the current user (see llm_jobs.py).
+    GET /api/jobs/?status=running
+    GET /api/jobs/{id}/   (poll; content is the answer so far)
+    """
+    serializer_class = LLMJobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = LLMJobPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'session']
+    
+    def get_queryset(self):
+        # A job whose worker died would otherwise stay queued/running forever
+        job_runner.reap_stale(user=self.request.user)
+        return LLMJob.objects.filter(user=self.request.user).select_related('assistant_message')
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Worker pool counters (this process).
+        GET /api/jobs/stats/
+        """
+        return Response(job_runner.stats())
+
+
+
+
+def _sse(event, data, event_id=None):
+    """Format one server-sent event."""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def _aiter_sync(iterator):
+    """Drive a blocking iterator from the event loop, one item at a time."""
+    sentinel = object()
+    while True:
+        item = await sync_to_async(next)(iterator, sentinel)
+        if item is sentinel:
+            return
+        yield item
+
+
+def _sse_response(request, events):
+    """
+    StreamingHttpResponse for SSE. Under ASGI a plain iterator would be
+    buffered completely by Django, so it is wrapped to yield as it goes.
+    """
+    if not hasattr(events, '__aiter__') and 'wsgi.version' not in request.META:
+        events = _aiter_sync(events)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def repository_events(request, pk):
+    """
+    Server-sent change feed for one repository.
+    GET /api/repositories/{id}/events/
+    
+    Sends the current hash as a 'status' event, then a 'change' event
+    ({action, hash, previous_hash, updated_at, user}) after every committed
+    update, force_update, patch or sync. Needs an ASGI server
+    (DataSenseHub.asgi:application); under WSGI the endpoint answers 501.
+    """
+    if 'wsgi.version' in request.META:
+        return JsonResponse({
+            'error': 'Not supported',
+            'detail': 'The change feed needs an ASGI server (DataSenseHub.asgi:application)'
+        }, status=501)
+    
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+    
+    repo = await sync_to_async(
+        FeastRepository.objects.filter(pk=pk, created_by=user).only('id', 'json_hash', 'updated_at').first
+    )()
+    if repo is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    
+    subscription = broker.subscribe(repo.id)
+    keepalive = getattr(settings, 'FEAST_CHANGE_FEED_KEEPALIVE', 15)
+    max_age = getattr(settings, 'FEAST_CHANGE_FEED_MAX_AGE', 300)
+    
+    async def stream():
+        # Django's ASGI handler does not report client disconnects, so each
+        # stream ends after max_age and EventSource reconnects on its own.
+        deadline = asyncio.get_running_loop().time() + max_age
+        try:
+            yield 'retry: 2000\n' + _sse('status', {
+                'repository_id': repo.id,
+                'hash': repo.json_hash,
+                'updated_at': repo.updated_at
+            })
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await subscription.get(timeout=min(keepalive, remaining))
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield _sse('change', event, event.get('seq'))
+        finally:
+            subscription.close()
+    
+    return _sse_response(request, stream())
+
+
+def _job_state(job_id):
+    """(status, content so far, result, error) of a job from the database."""
+    job_runner.reap_stale(pk=job_id)
+    job = LLMJob.objects.select_related('assistant_message').get(pk=job_id)
+    content = job.assistant_message.content if job.assistant_message_id else ''
+    return job.status, content, job.result, job.error
+
+
+async def job_events(request, pk):
+    """
+    Server-sent progress of a background chat turn.
+    GET /api/jobs/{id}/stream/
+    
+    Sends 'status', then 'token' events with the answer text as it is
+    generated, then 'done' (job result) or 'error'. In the process running
+    the job tokens are relayed live; elsewhere the job row is polled every
+    FEAST_LLM_JOB_POLL_INTERVAL seconds. Needs an ASGI server, like the
+    repository change feed, and likewise ends after
+    FEAST_CHANGE_FEED_MAX_AGE seconds; a reconnect starts over with the
+    answer so far.
+    """
+    if 'wsgi.version' in request.META:
+        return JsonResponse({
+            'error': 'Not supported',
+            'detail': 'Job streams need an ASGI server (DataSenseHub.asgi:application); poll /api/jobs/{id}/ instead'
+        }, status=501)
+    
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+    
+    job = await sync_to_async(LLMJob.objects.filter(pk=pk, user=user).only('id', 'status', 'session_id').first)()
+    if job is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    
+    keepalive = getattr(settings, 'FEAST_CHANGE_FEED_KEEPALIVE', 15)
+    max_age = getattr(settings, 'FEAST_CHANGE_FEED_MAX_AGE', 300)
+    poll_interval = getattr(settings, 'FEAST_LLM_JOB_POLL_INTERVAL', 0.25)
+    
+    async def stream():
+        # Disconnects go unnoticed under Django's ASGI handler (see repository_events)
+        deadline = asyncio.get_running_loop().time() + max_age
+        yield 'retry: 2000\n' + _sse('status', {'job_id': job.id, 'session_id': job.session_id, 'status': job.status})
+        sent = 0
+        last_event = asyncio.get_running_loop().time()
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return
+            live = job_runner.stream(job.id)
+            if live is not None:
+                text, finished = await live.wait(sent, timeout=min(keepalive, remaining))
+                if text:
+                    sent += len(text)
+                    last_event = asyncio.get_running_loop().time()
+                    yield _sse('token', {'text': text})
+                if not finished:
+                    if not text:
+                        yield ': keepalive\n\n'
+                    continue
+            
+            # Finished, or running in another process: read the database
+            job_status, content, result, error = await sync_to_async(_job_state)(job.id)
+            if len(content) > sent:
+                yield _sse('token', {'text': content[sent:]})
+                sent = len(content)
+                last_event = asyncio.get_running_loop().time()
+            if job_status == 'succeeded':
+                yield _sse('done', {'success': True, 'job_id': job.id, 'session_id': job.session_id, **result})
+                return
+            if job_status == 'failed':
+                yield _sse('error', {'success': False, 'job_id': job.id, 'error': error,
+                                     'detail': 'LLM request failed. Any partial answer was saved.'})
+                return
+            if asyncio.get_running_loop().time() - last_event >= keepalive:
+                last_event = asyncio.get_running_loop().time()
+                yield ': keepalive\n\n'
+            await asyncio.sleep(poll_interval)
+    
+    return _sse_response(request, stream())
 
 
 @login_required